@@ -0,0 +1,68 @@
+from hashlib import sha1
+from typing import Any
+
+from fastapi import Request, Response, status
+from orjson import dumps
+
+from app.core.metrics import metrics
+
+
+# 管理端数据需鉴权，只允许浏览器私有缓存，且每次使用前都要重新验证
+CACHE_CONTROL_REVALIDATE = "private, no-cache"
+
+
+def make_etag(*parts: Any) -> str:
+    """
+    由版本号等组成部分生成强 ETag
+
+    :param parts: 组成部分（版本号、摘要等）
+    :return: 带引号的 ETag
+    """
+    digest = sha1(dumps(parts)).hexdigest()[:20]
+    return f'"{digest}"'
+
+
+def etag_matches(request: Request, etag: str | None) -> bool:
+    """
+    判断请求的 If-None-Match 是否与当前 ETag 匹配（GET 使用弱比较）
+
+    :param request: 请求对象
+    :param etag: 当前 ETag，None 表示无法生成
+    :return: 是否匹配
+    """
+    if etag is None:
+        return False
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return any(
+        tag.strip().removeprefix("W/") == etag for tag in header.split(",")
+    )
+
+
+def set_validators(response: Response, etag: str | None) -> None:
+    """
+    写入 ETag 与 Cache-Control 响应头
+
+    :param response: 响应对象
+    :param etag: ETag，None 时只写 Cache-Control
+    """
+    response.headers["Cache-Control"] = CACHE_CONTROL_REVALIDATE
+    if etag is not None:
+        response.headers["ETag"] = etag
+
+
+def not_modified(etag: str, name: str) -> Response:
+    """
+    构造 304 响应
+
+    :param etag: 当前 ETag
+    :param name: 接口名（指标）
+    :return: 304 响应
+    """
+    metrics.incr(f"http.not_modified.{name}")
+    response = Response(status_code=status.HTTP_304_NOT_MODIFIED)
+    set_validators(response, etag)
+    return response
@@ -1,7 +1,12 @@
-from fastapi import Depends, HTTPException, status
+from functools import lru_cache
+from ipaddress import IPv4Network, IPv6Network, ip_address, ip_network
+
+from fastapi import Depends, HTTPException, Query, Request, status
 from fastapi.security import OAuth2PasswordBearer
 
-from app.core.security import SecurityCore
+from app.core.config import cfg
+from app.core.logger import logger
+from app.core.security import STREAM_TOKEN_SCOPE, SecurityCore
 from app.models.user import User
 from app.services.user import UserService
 
@@ -9,25 +14,25 @@ from app.services.user import UserService
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
 
-async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
+async def _resolve_user(token: str, scope: str | None) -> User:
     """
-    解码 JWT 并返回当前用户文档
+    解码 JWT、校验用途并返回对应的启用用户
 
     :param token: 令牌
-
-    :return: 当前用户文档
+    :param scope: 要求的令牌用途，None 表示普通访问令牌
+    :return: 用户文档
     """
     try:
         payload = SecurityCore.decode_access_token(token)
         user_id = payload.get("sub")
-        if not user_id:
+        if not user_id or payload.get("scope") != scope:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED, detail="无效令牌"
             )
     except Exception:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="无效令牌")
 
-    user = await UserService.get_user_by_id(user_id)
+    user = await UserService.get_principal(user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="用户不存在"
@@ -39,6 +44,17 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
     return user
 
 
+async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
+    """
+    解码 JWT 并返回当前用户文档
+
+    :param token: 令牌
+
+    :return: 当前用户文档
+    """
+    return await _resolve_user(token, None)
+
+
 async def get_current_admin(current_user: User = Depends(get_current_user)) -> User:
     """
     要求当前用户为管理员，否则返回 403。
@@ -51,3 +67,67 @@ async def get_current_admin(current_user: User = Depends(get_current_user)) -> U
             status_code=status.HTTP_403_FORBIDDEN, detail="需要管理员权限"
         )
     return current_user
+
+
+async def get_stream_admin(
+    token: str = Query(..., description="SSE 令牌（POST /auth/stream-token 签发）"),
+) -> User:
+    """
+    从查询参数读取 SSE 令牌并要求管理员（EventSource 无法携带 Authorization 头）
+
+    :param token: 短期 SSE 令牌
+    :return: 管理员用户文档
+    """
+    user = await _resolve_user(token, STREAM_TOKEN_SCOPE)
+    if user.role != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="需要管理员权限"
+        )
+    return user
+
+
+@lru_cache(maxsize=8)
+def _trusted_networks(
+    proxies: tuple[str, ...],
+) -> tuple[IPv4Network | IPv6Network, ...]:
+    networks = []
+    for proxy in proxies:
+        try:
+            networks.append(ip_network(proxy, strict=False))
+        except ValueError:
+            logger.warning(f"【Auth】忽略无效的可信代理地址: {proxy}")
+    return tuple(networks)
+
+
+def _is_trusted(host: str) -> bool:
+    try:
+        addr = ip_address(host)
+    except ValueError:
+        return False
+    return any(
+        addr in network
+        for network in _trusted_networks(tuple(cfg.auth.trusted_proxies))
+    )
+
+
+def get_client_ip(request: Request) -> str | None:
+    """
+    解析客户端 IP：直连对端为可信代理时，从 X-Forwarded-For 自右向左跳过可信代理，
+    取第一个不可信地址；无 X-Forwarded-For 时使用 X-Real-IP。对端不可信时忽略转发头，
+    避免客户端伪造 IP 绕过按 IP 的限制
+
+    :param request: 请求对象
+    :return: 客户端 IP，无法确定时为 None
+    """
+    peer = request.client.host if request.client else None
+    if peer is None or not _is_trusted(peer):
+        return peer
+    forwarded = request.headers.get("x-forwarded-for")
+    if forwarded:
+        hops = [hop.strip() for hop in forwarded.split(",") if hop.strip()]
+        for hop in reversed(hops):
+            if not _is_trusted(hop):
+                return hop
+        return hops[0] if hops else peer
+    real_ip = request.headers.get("x-real-ip", "").strip()
+    return real_ip or peer
@@ -1,31 +1,112 @@
-from fastapi import APIRouter, HTTPException, status
+from datetime import timedelta
 
-from app.core.security import SecurityCore
-from app.schemas.token import Token
+from fastapi import APIRouter, Depends, HTTPException, status
+
+from app.api.deps import get_client_ip, get_current_user
+from app.core.config import cfg
+from app.core.loginguard import LoginThrottled, login_guard
+from app.core.security import STREAM_TOKEN_SCOPE, SecurityCore
+from app.models.user import User
+from app.schemas.token import RefreshTokenRequest, StreamToken, Token
 from app.schemas.user import UserLogin
+from app.services.token import RefreshTokenService
 from app.services.user import UserService
 
 router = APIRouter()
 
 
 @router.post("/login", response_model=Token)
-async def login(data: UserLogin) -> Token:
+async def login(
+    data: UserLogin, client_ip: str | None = Depends(get_client_ip)
+) -> Token:
     """
-    用户登录（用户名 + 密码），返回 JWT 访问令牌。
+    用户登录（用户名 + 密码），返回 JWT 访问令牌与刷新令牌。
+
+    按用户名与 IP 限制尝试次数，超出时在校验密码前直接返回 429；
+    位于反向代理之后时客户端 IP 取自可信代理的转发头（AUTH_TRUSTED_PROXIES）。
 
     :param data: 登录表单（用户名、密码）
-    :return: 包含 access_token 的令牌响应
+    :param client_ip: 客户端 IP（由依赖注入）
+    :return: 包含 access_token、refresh_token 的令牌响应
     """
+    try:
+        await login_guard.check(data.username, client_ip)
+    except LoginThrottled as exc:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=str(exc),
+            headers={"Retry-After": str(int(exc.retry_after + 0.999))},
+        )
     user = await UserService.get_user_by_username(data.username)
     if not user or not user.is_active:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="用户名或密码错误",
         )
-    if not SecurityCore.verify_password(data.password, user.hashed_password):
+    if not await SecurityCore.verify_password_async(
+        data.password, user.hashed_password
+    ):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="用户名或密码错误",
         )
+    await login_guard.reset(data.username)
     access_token = SecurityCore.create_access_token(subject=str(user.id))
-    return Token(access_token=access_token)
+    refresh_token = await RefreshTokenService.issue(str(user.id))
+    return Token(access_token=access_token, refresh_token=refresh_token)
+
+
+@router.post("/refresh", response_model=Token)
+async def refresh(data: RefreshTokenRequest) -> Token:
+    """
+    使用刷新令牌换取新的访问令牌，刷新令牌同时轮换（旧令牌作废）。
+
+    :param data: 刷新令牌
+    :return: 新的令牌响应
+    """
+    rotated = await RefreshTokenService.rotate(data.refresh_token)
+    if rotated is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="刷新令牌无效或已过期",
+        )
+    user_id, refresh_token = rotated
+    user = await UserService.get_principal(user_id)
+    if not user or not user.is_active:
+        await RefreshTokenService.revoke(refresh_token)
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="用户不存在或已禁用",
+        )
+    access_token = SecurityCore.create_access_token(subject=user_id)
+    return Token(access_token=access_token, refresh_token=refresh_token)
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(data: RefreshTokenRequest) -> None:
+    """
+    退出登录，吊销刷新令牌。
+
+    :param data: 刷新令牌
+    :return: None
+    """
+    await RefreshTokenService.revoke(data.refresh_token)
+
+
+@router.post("/stream-token", response_model=StreamToken)
+async def stream_token(current_user: User = Depends(get_current_user)) -> StreamToken:
+    """
+    签发短期 SSE 令牌，供 EventSource 以查询参数传入（无法携带 Authorization 头）。
+
+    令牌只能用于 SSE 接口，有效期仅约束建立连接的时刻。
+
+    :param current_user: 当前登录用户（由依赖注入）
+    :return: 令牌与有效期
+    """
+    expires_in = cfg.auth.stream_token_expire_seconds
+    token = SecurityCore.create_access_token(
+        subject=str(current_user.id),
+        expires_delta=timedelta(seconds=expires_in),
+        scope=STREAM_TOKEN_SCOPE,
+    )
+    return StreamToken(token=token, expires_in=expires_in)
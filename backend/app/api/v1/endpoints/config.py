@@ -1,7 +1,8 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request, Response
 
+from app.api.conditional import etag_matches, not_modified, set_validators
 from app.api.deps import get_current_admin
-from app.db.config import get_config, set_config
+from app.db.config import db_config
 from app.models.user import User
 from app.schemas.config import ConfigResponseSchema, ConfigUpdateSchema
 
@@ -9,11 +10,18 @@ router = APIRouter()
 
 
 @router.get("", response_model=ConfigResponseSchema)
-async def get_app_config(_: User = Depends(get_current_admin)) -> ConfigResponseSchema:
+async def get_app_config(
+    request: Request,
+    response: Response,
+    _: User = Depends(get_current_admin),
+) -> ConfigResponseSchema:
     """
-    获取应用配置（仅管理员）
+    获取应用配置（仅管理员），支持 If-None-Match 条件请求
     """
-    cfg = await get_config()
+    if etag_matches(request, db_config.etag):
+        return not_modified(db_config.etag, "config")
+    cfg = await db_config.get()
+    set_validators(response, db_config.etag)
     return ConfigResponseSchema(
         base=cfg.base, storage=cfg.storage, full_sync=cfg.full_sync
     )
@@ -22,12 +30,13 @@ async def get_app_config(_: User = Depends(get_current_admin)) -> ConfigResponse
 @router.patch("", response_model=ConfigResponseSchema)
 async def update_app_config(
     body: ConfigUpdateSchema,
+    response: Response,
     _: User = Depends(get_current_admin),
 ) -> ConfigResponseSchema:
     """
     更新应用配置（仅管理员，支持部分更新）
     """
-    cfg = await get_config()
+    cfg = (await db_config.get()).model_copy()
     if body.base is not None:
         update = body.base.model_dump(exclude_unset=True)
         if update:
@@ -40,7 +49,8 @@ async def update_app_config(
         update = body.full_sync.model_dump(exclude_unset=True)
         if update:
             cfg.full_sync = cfg.full_sync.model_copy(update=update)
-    await set_config(cfg)
+    await db_config.set(cfg)
+    set_validators(response, db_config.etag)
     return ConfigResponseSchema(
         base=cfg.base, storage=cfg.storage, full_sync=cfg.full_sync
     )
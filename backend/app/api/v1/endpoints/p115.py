@@ -1,45 +1,155 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from fastapi.responses import Response
+from typing import Any
 
-from app.api.deps import get_current_admin
-from app.core.p115 import p115_manager
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import Response, StreamingResponse
+from orjson import dumps
+
+from app.api.conditional import (
+    etag_matches,
+    make_etag,
+    not_modified,
+    set_validators,
+)
+from app.api.deps import get_current_admin, get_stream_admin
+from app.core.p115 import ACCOUNT_PATTERN, p115_cache, p115_manager
+from app.core.p115health import cookie_health
+from app.core.p115pool import p115_pool
+from app.core.qrlogin import qrcode_watcher
+from app.core.ratelimit import DEFAULT_ACCOUNT
 from app.models.user import User
 from app.schemas.p115 import (
     P115ConfirmResponse,
     P115DashboardResponse,
+    P115HealthResponse,
     P115LogoutResponse,
     P115PollResponse,
     P115QrcodeTokenResponse,
     P115StatusResponse,
 )
+from app.utils.timezone import TimezoneUtils
 
 router = APIRouter()
 
+DASHBOARD_CACHE_KEYS = ("user_info", "storage_info:0")
+
+
+async def _dashboard_etag() -> str | None:
+    """
+    由登入状态版本与仪表盘缓存条目版本生成 ETag（只读版本号，不读缓存值）
+
+    :return: ETag，缓存条目缺失或已过新鲜期时为 None
+    """
+    if not p115_manager.logged_in:
+        return make_etag("p115.dashboard", p115_manager.version, False)
+    versions = await p115_cache.versions(*DASHBOARD_CACHE_KEYS)
+    if None in versions:
+        return None
+    return make_etag("p115.dashboard", p115_manager.version, *versions)
+
+
+def _status_etag(pool: list[dict[str, Any]]) -> str:
+    """
+    由登入状态版本与各账号隔离截止时刻生成 ETag（不构建响应体）
+
+    隔离剩余秒数随时间递减，换算为截止时刻（取整到秒）后在隔离期间保持不变
+
+    :param pool: p115_pool.stats() 的结果
+    :return: ETag
+    """
+    now = TimezoneUtils.now_utc().timestamp()
+    return make_etag(
+        "p115.status",
+        p115_manager.version,
+        [
+            (
+                item["account"],
+                round(now + item["quarantined_seconds"])
+                if item["quarantined_seconds"]
+                else 0,
+            )
+            for item in pool
+        ],
+    )
+
 
 @router.get("/dashboard", response_model=P115DashboardResponse)
-async def get_dashboard(_: User = Depends(get_current_admin)) -> P115DashboardResponse:
+async def get_dashboard(
+    request: Request,
+    response: Response,
+    _: User = Depends(get_current_admin),
+) -> P115DashboardResponse:
     """
-    获取 115 仪表盘数据（用户信息 + 存储信息）
+    获取 115 仪表盘数据（用户信息 + 存储信息），支持 If-None-Match 条件请求
 
+    :param request: 请求对象
+    :param response: 响应对象（写入 ETag）
     :param _: 当前管理员用户（由依赖注入）
     :return: logged_in、user_info、storage_info
     """
+    etag = await _dashboard_etag()
+    if etag_matches(request, etag):
+        return not_modified(etag, "p115_dashboard")
     data = await p115_manager.get_dashboard_info()
+    if etag is None:
+        # 缓存条目刚由本次请求加载，此时才有版本号可用
+        etag = await _dashboard_etag()
+    set_validators(response, etag)
     return P115DashboardResponse(**data)
 
 
 @router.get("/status", response_model=P115StatusResponse)
-async def get_status(_: User = Depends(get_current_admin)) -> P115StatusResponse:
+async def get_status(
+    request: Request,
+    response: Response,
+    _: User = Depends(get_current_admin),
+) -> P115StatusResponse:
     """
-    获取 115 登入状态。
+    获取 115 登入状态，支持 If-None-Match 条件请求
 
+    :param request: 请求对象
+    :param response: 响应对象（写入 ETag）
     :param _: 当前管理员用户（由依赖注入）
-    :return: 登入状态信息（含 logged_in、app、updated_at 等）
+    :return: 登入状态信息（含 logged_in、app、updated_at 及各账号调度状态）
     """
+    pool = await p115_pool.stats()
+    etag = _status_etag(pool)
+    if etag_matches(request, etag):
+        return not_modified(etag, "p115_status")
     data = await p115_manager.get_status()
+    by_account = {item["account"]: item for item in pool}
+    data["accounts"] = [
+        {**account, **by_account.get(account["account"], {})}
+        for account in data.get("accounts", [])
+    ]
+    set_validators(response, etag)
     return P115StatusResponse(**data)
 
 
+@router.get("/health", response_model=list[P115HealthResponse])
+async def get_health(_: User = Depends(get_current_admin)) -> list[P115HealthResponse]:
+    """
+    获取各 115 账号 cookies 的健康状态与最近失败历史。
+
+    :param _: 当前管理员用户（由依赖注入）
+    :return: 各账号健康状态
+    """
+    return [P115HealthResponse(**item) for item in await cookie_health.status()]
+
+
+@router.post("/health/check", response_model=list[P115HealthResponse])
+async def check_health(
+    _: User = Depends(get_current_admin),
+) -> list[P115HealthResponse]:
+    """
+    立即探测全部 115 账号的 cookies。
+
+    :param _: 当前管理员用户（由依赖注入）
+    :return: 探测后的各账号健康状态
+    """
+    items = await cookie_health.check_all(force=True)
+    return [P115HealthResponse(**item) for item in items]
+
+
 @router.post("/qrcode/token", response_model=P115QrcodeTokenResponse)
 async def get_qrcode_token(
     app: str = Query(default="qandroid"),
@@ -111,10 +221,52 @@ async def poll_qrcode_status(
         )
 
 
+@router.get("/qrcode/stream")
+async def stream_qrcode_status(
+    uid: str = Query(...),
+    time: int = Query(...),
+    sign: str = Query(...),
+    app: str = Query(default="qandroid"),
+    account: str = Query(default=DEFAULT_ACCOUNT, pattern=ACCOUNT_PATTERN),
+    _: User = Depends(get_stream_admin),
+) -> StreamingResponse:
+    """
+    以 SSE 推送 115 扫码状态，扫码确认后由服务端自动完成登入。
+
+    每次状态变化发送一条 status 事件（data 为 status、msg、logged_in），
+    进入终态（已确认、已过期、已取消）后结束；空闲时发送注释行保持连接。
+    EventSource 无法携带 Authorization 头，鉴权使用 token 查询参数中的 SSE 令牌
+    （POST /auth/stream-token 签发）。
+
+    :param uid: 二维码 token 中的 uid
+    :param time: 二维码 token 中的 time
+    :param sign: 二维码 token 中的 sign
+    :param app: 客户端类型，默认 qandroid
+    :param account: 登入到的账号标识，默认账号之外的账号须为同一 115 用户
+    :param _: 当前管理员用户（由 SSE 令牌解析）
+    :return: text/event-stream 响应
+    """
+    payload = {"uid": uid, "time": time, "sign": sign}
+
+    async def events():
+        async for state in qrcode_watcher.watch(payload, app, account):
+            if state is None:
+                yield ": keepalive\n\n"
+            else:
+                yield f"event: status\ndata: {dumps(state).decode()}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.post("/qrcode/confirm", response_model=P115ConfirmResponse)
 async def confirm_qrcode(
     uid: str = Query(...),
     app: str = Query(default="qandroid"),
+    account: str = Query(default=DEFAULT_ACCOUNT, pattern=ACCOUNT_PATTERN),
     _: User = Depends(get_current_admin),
 ) -> P115ConfirmResponse:
     """
@@ -122,12 +274,17 @@ async def confirm_qrcode(
 
     :param uid: 二维码 token 中的 uid
     :param app: 客户端类型，默认 qandroid
+    :param account: 登入到的账号标识，默认账号之外的账号须为同一 115 用户
     :param _: 当前管理员用户（由依赖注入）
     :return: ok 与 cookies_str
     """
     try:
-        cookies_str = await p115_manager.confirm_qrcode(uid, app=app)
+        cookies_str = await p115_manager.confirm_qrcode(
+            uid, app=app, account=account
+        )
         return P115ConfirmResponse(ok=True, cookies_str=cookies_str)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
     except Exception as exc:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -136,12 +293,16 @@ async def confirm_qrcode(
 
 
 @router.post("/logout", response_model=P115LogoutResponse)
-async def logout(_: User = Depends(get_current_admin)) -> P115LogoutResponse:
+async def logout(
+    account: str = Query(default=DEFAULT_ACCOUNT, pattern=ACCOUNT_PATTERN),
+    _: User = Depends(get_current_admin),
+) -> P115LogoutResponse:
     """
     退出 115 登录，清除已保存的 cookies。
 
+    :param account: 退出的账号标识，默认为默认账号
     :param _: 当前管理员用户（由依赖注入）
     :return: ok 表示成功
     """
-    await p115_manager.logout()
+    await p115_manager.logout(account)
     return P115LogoutResponse(ok=True)
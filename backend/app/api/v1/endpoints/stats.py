@@ -0,0 +1,52 @@
+from fastapi import APIRouter, Depends, Query
+
+from app.api.deps import get_current_admin
+from app.models.user import User
+from app.schemas.stats import StatsOverviewResponse, StatsSnapshot
+from app.services.stats import StatsService
+
+router = APIRouter()
+
+
+@router.get("", response_model=StatsOverviewResponse)
+async def get_stats_overview(
+    dir_depth: int | None = Query(default=None, ge=1),
+    dir_limit: int = Query(default=10, ge=1, le=100),
+    _: User = Depends(get_current_admin),
+) -> StatsOverviewResponse:
+    """
+    获取媒体库统计概览（只读预计算汇总，不扫描 files 集合）。
+
+    :param dir_depth: 最大目录的层级过滤，不传则不限制
+    :param dir_limit: 返回的最大目录数
+    :param _: 当前管理员用户（由依赖注入）
+    :return: 总量、扩展名分布、大小直方图与最大目录
+    """
+    data = await StatsService.get_overview(dir_depth=dir_depth, dir_limit=dir_limit)
+    return StatsOverviewResponse(**data)
+
+
+@router.get("/growth", response_model=list[StatsSnapshot])
+async def get_stats_growth(
+    days: int = Query(default=30, ge=1, le=366),
+    _: User = Depends(get_current_admin),
+) -> list[StatsSnapshot]:
+    """
+    获取最近 days 天的每日快照，用于展示增长趋势。
+
+    :param days: 天数
+    :param _: 当前管理员用户（由依赖注入）
+    :return: 按日期升序的快照列表
+    """
+    return [StatsSnapshot(**s) for s in await StatsService.get_growth(days)]
+
+
+@router.post("/rebuild")
+async def rebuild_stats(_: User = Depends(get_current_admin)) -> dict[str, bool]:
+    """
+    立即从 files 集合重建统计汇总。
+
+    :param _: 当前管理员用户（由依赖注入）
+    :return: ok 表示本进程完成了重建（其他进程正在写入文件索引时为 False）
+    """
+    return {"ok": await StatsService.rebuild() is not None}
@@ -0,0 +1,104 @@
+from typing import Literal
+
+from fastapi import APIRouter, HTTPException, Path, Query, Request, status
+from fastapi.responses import RedirectResponse, Response, StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+from app.core.bloom import file_filter
+from app.core.config import cfg
+from app.core.logger import logger
+from app.core.metrics import metrics
+from app.core.ratelimit import RateLimitExceeded
+from app.core.strm import (
+    P115NotLoggedInError,
+    StrmProxyBusyError,
+    download_url_prefetcher,
+    download_url_resolver,
+    ProxyStream,
+    strm_proxy,
+)
+
+router = APIRouter()
+
+
+class ProxyStreamingResponse(StreamingResponse):
+    """
+    代理播放响应：无论正常结束、客户端断开（包括首个分块前断开、响应体从未迭代）
+    还是发送异常，都关闭上游流并释放流数名额
+    """
+
+    def __init__(self, stream: ProxyStream) -> None:
+        super().__init__(
+            stream.iter_bytes(), status_code=stream.status_code, headers=stream.headers
+        )
+        self.stream = stream
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            await self.stream.close()
+
+
+@router.api_route("/{pick_code}", methods=["GET", "HEAD"])
+async def play_strm(
+    request: Request,
+    pick_code: str = Path(..., pattern=r"^[a-zA-Z0-9]{1,50}$"),
+    mode: Literal["redirect", "proxy"] | None = Query(default=None),
+) -> Response:
+    """
+    STRM 播放入口（无需登录）：解析 115 下载链接并 302 跳转，
+    同时在后台预取同目录后续媒体文件的下载链接。
+
+    开启 STRM_REQUIRE_INDEXED 时，过滤器判定未入库的提取码直接返回 404，不请求 115。
+
+    代理模式下由后端回源并透传 Range/206 响应，供无法跟随 302 的播放器使用。
+
+    :param request: 请求对象（用于读取 User-Agent、Range）
+    :param pick_code: 115 提取码
+    :param mode: redirect 或 proxy，不传则按配置 STRM_PROXY_MODE
+    :return: 302 跳转或代理的文件流
+    """
+    if cfg.strm.require_indexed and not await file_filter.might_contain_pick_code(
+        pick_code
+    ):
+        metrics.incr("strm.unknown_pick_code")
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="文件不存在")
+    user_agent = request.headers.get("user-agent", "")
+    proxy = mode == "proxy" or (mode is None and cfg.strm.proxy_mode)
+    try:
+        if proxy:
+            stream = await strm_proxy.open(
+                pick_code,
+                user_agent,
+                method=request.method,
+                range_header=request.headers.get("range"),
+            )
+        else:
+            url = await download_url_resolver.resolve(pick_code, user_agent)
+    except P115NotLoggedInError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(exc)
+        )
+    except RateLimitExceeded as exc:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=str(exc),
+            headers={"Retry-After": str(max(1, round(exc.retry_after)))},
+        )
+    except StrmProxyBusyError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail=str(exc)
+        )
+    except Exception as exc:
+        logger.warning(f"【STRM】解析下载链接失败 {pick_code}: {exc}")
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail=f"获取下载链接失败: {exc}",
+        )
+    download_url_prefetcher.schedule(pick_code, user_agent)
+    if not proxy:
+        return RedirectResponse(url, status_code=status.HTTP_302_FOUND)
+    if request.method == "HEAD":
+        return Response(status_code=stream.status_code, headers=stream.headers)
+    return ProxyStreamingResponse(stream)
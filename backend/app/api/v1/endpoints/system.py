@@ -0,0 +1,69 @@
+from os import getpid
+
+from fastapi import APIRouter, Depends
+
+from app.api.deps import get_current_admin
+from app.core.bloom import file_filter
+from app.core.metrics import metrics
+from app.core.p115 import p115_cache
+from app.core.strm import download_url_prefetcher, download_url_resolver
+from app.helpers.strmsync import strm_sync_helper
+from app.models.user import User
+from app.schemas.system import FilterStatsResponse, MetricsResponse
+from app.services.user import user_cache
+
+router = APIRouter()
+
+
+@router.get("/filters", response_model=list[FilterStatsResponse])
+async def get_filter_stats(
+    _: User = Depends(get_current_admin),
+) -> list[FilterStatsResponse]:
+    """
+    获取 sha1 / pick_code 存在性过滤器的误判率与内存占用。
+
+    :param _: 当前管理员用户（由依赖注入）
+    :return: 过滤器统计列表
+    """
+    return [FilterStatsResponse(**s) for s in await file_filter.stats()]
+
+
+@router.post("/filters/rebuild")
+async def rebuild_filters(_: User = Depends(get_current_admin)) -> dict[str, bool]:
+    """
+    立即从 files 集合重建存在性过滤器。
+
+    :param _: 当前管理员用户（由依赖注入）
+    :return: ok 表示本进程完成了重建（其他进程正在重建时为 False）
+    """
+    return {"ok": await file_filter.rebuild()}
+
+
+@router.post("/sync")
+async def start_full_sync(_: User = Depends(get_current_admin)) -> dict[str, bool]:
+    """
+    在后台启动全量同步：生成 STRM 文件并写入文件索引。
+
+    :param _: 当前管理员用户（由依赖注入）
+    :return: ok 表示已启动（本进程已有同步在执行时为 False）
+    """
+    return {"ok": strm_sync_helper.start()}
+
+
+@router.get("/metrics", response_model=MetricsResponse)
+async def get_metrics(_: User = Depends(get_current_admin)) -> MetricsResponse:
+    """
+    获取处理本次请求的 worker 进程的运行指标。
+
+    :param _: 当前管理员用户（由依赖注入）
+    :return: 计数器、耗时分布与各子系统统计
+    """
+    return MetricsResponse(
+        pid=getpid(),
+        **metrics.snapshot(),
+        strm={**download_url_resolver.stats(), **download_url_prefetcher.stats()},
+        caches={
+            p115_cache.namespace: p115_cache.stats(),
+            user_cache.namespace: user_cache.stats(),
+        },
+    )
@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 
-from app.api.v1.endpoints import auth, config, p115, users
+from app.api.v1.endpoints import auth, config, p115, stats, strm, system, users
 
 v1_router = APIRouter()
 
@@ -8,3 +8,6 @@ v1_router.include_router(auth.router, prefix="/auth", tags=["Auth"])
 v1_router.include_router(config.router, prefix="/config", tags=["Config"])
 v1_router.include_router(users.router, prefix="/users", tags=["Users"])
 v1_router.include_router(p115.router, prefix="/p115", tags=["P115"])
+v1_router.include_router(stats.router, prefix="/stats", tags=["Stats"])
+v1_router.include_router(strm.router, prefix="/strm", tags=["STRM"])
+v1_router.include_router(system.router, prefix="/system", tags=["System"])
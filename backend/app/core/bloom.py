@@ -0,0 +1,342 @@
+import asyncio
+import secrets
+from hashlib import blake2b
+from math import ceil, exp, log
+from typing import Any, Iterable
+
+from app.core.config import cfg
+from app.core.lock import release_lock
+from app.core.logger import logger
+from app.db.database import db
+from app.utils.timezone import TimezoneUtils
+
+
+FILES_COLLECTION_NAME = "files"
+REDIS_KEY_BLOOM_PREFIX = "files:bloom"
+REDIS_KEY_BLOOM_REBUILD_LOCK = "files:bloom:rebuild"
+REBUILD_LOCK_TTL_SECONDS = 3600
+
+# 写入位并在重建期间记录偏移量日志，保证重建窗口内新增的元素不会丢失
+_ADD_SCRIPT = """
+local args = {}
+for i = 1, #ARGV do
+    args[#args + 1] = 'SET'
+    args[#args + 1] = 'u1'
+    args[#args + 1] = ARGV[i]
+    args[#args + 1] = 1
+end
+redis.call('BITFIELD', KEYS[1], unpack(args))
+redis.call('HINCRBY', KEYS[4], 'added', 1)
+if redis.call('EXISTS', KEYS[2]) == 1 then
+    redis.call('RPUSH', KEYS[3], unpack(ARGV))
+end
+return 1
+"""
+
+# 回放重建期间的日志到新位图，原子替换线上位图
+_FINALIZE_SCRIPT = """
+local offsets = redis.call('LRANGE', KEYS[3], 0, -1)
+local step = 1000
+for i = 1, #offsets, step do
+    local args = {}
+    for j = i, math.min(i + step - 1, #offsets) do
+        args[#args + 1] = 'SET'
+        args[#args + 1] = 'u1'
+        args[#args + 1] = offsets[j]
+        args[#args + 1] = 1
+    end
+    redis.call('BITFIELD', KEYS[1], unpack(args))
+end
+redis.call('RENAME', KEYS[1], KEYS[2])
+redis.call('DEL', KEYS[3])
+redis.call('HSET', KEYS[4],
+    'ready', 1,
+    'count', ARGV[1] + math.floor(#offsets / ARGV[3]),
+    'added', 0,
+    'size', ARGV[2],
+    'hashes', ARGV[3],
+    'built_at', ARGV[4])
+return #offsets
+"""
+
+
+class BloomFilter:
+    """
+    基于 Redis 位图的布隆过滤器，所有 worker 共享同一份位图
+
+    否定结果一定准确；肯定结果存在 error_rate 左右的误判，需要回源确认。
+    """
+
+    __slots__ = ("name", "capacity", "error_rate", "size", "hashes")
+
+    def __init__(self, name: str, capacity: int, error_rate: float) -> None:
+        self.name = name
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(8, ceil(-capacity * log(error_rate) / (log(2) ** 2)))
+        self.hashes = max(1, round(self.size / capacity * log(2)))
+
+    @property
+    def key(self) -> str:
+        return f"{REDIS_KEY_BLOOM_PREFIX}:{self.name}"
+
+    @property
+    def meta_key(self) -> str:
+        return f"{self.key}:meta"
+
+    @property
+    def tmp_key(self) -> str:
+        return f"{self.key}:tmp"
+
+    @property
+    def journal_key(self) -> str:
+        return f"{self.key}:journal"
+
+    def offsets(self, item: str) -> list[int]:
+        """
+        计算元素对应的位偏移（双重哈希）
+
+        :param item: 元素
+        :return: 长度为 hashes 的偏移量列表
+        """
+        digest = blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        size = self.size
+        return [(h1 + i * h2) % size for i in range(self.hashes)]
+
+    async def contains(self, item: str) -> bool:
+        """
+        判断元素是否可能存在（一次 Redis 往返）
+
+        过滤器尚未构建完成或 Redis 不可用时返回 True，由调用方回源确认。
+
+        :param item: 元素
+        :return: False 表示一定不存在
+        """
+        ops: list[Any] = []
+        for offset in self.offsets(item):
+            ops.extend(("GET", "u1", offset))
+        try:
+            pipe = db.get_redis().pipeline(transaction=False)
+            pipe.hget(self.meta_key, "ready")
+            pipe.execute_command("BITFIELD", self.key, *ops)
+            ready, bits = await pipe.execute()
+        except Exception as exc:
+            logger.debug(f"【BloomFilter】{self.name} 查询失败: {exc}")
+            return True
+        if not ready:
+            return True
+        return all(bits)
+
+    async def add(self, item: str) -> None:
+        """
+        增量加入元素
+
+        :param item: 元素
+        """
+        await db.get_redis().eval(
+            _ADD_SCRIPT,
+            4,
+            self.key,
+            REDIS_KEY_BLOOM_REBUILD_LOCK,
+            self.journal_key,
+            self.meta_key,
+            *self.offsets(item),
+        )
+
+    def fill(self, bits: bytearray, items: Iterable[str]) -> int:
+        """
+        将元素写入本地位图（与 Redis 位序一致：偏移 0 为首字节最高位）
+
+        :param bits: 本地位图
+        :param items: 元素
+        :return: 写入的元素数
+        """
+        count = 0
+        for item in items:
+            if not item:
+                continue
+            for offset in self.offsets(item):
+                bits[offset >> 3] |= 0x80 >> (offset & 7)
+            count += 1
+        return count
+
+    async def publish(self, bits: bytearray, count: int) -> int:
+        """
+        上传重建好的位图并原子替换线上位图
+
+        :param bits: 本地位图
+        :param count: 位图中的元素数
+        :return: 回放的日志偏移量数
+        """
+        redis_client = db.get_redis()
+        await redis_client.set(self.tmp_key, bytes(bits))
+        return await redis_client.eval(
+            _FINALIZE_SCRIPT,
+            4,
+            self.tmp_key,
+            self.key,
+            self.journal_key,
+            self.meta_key,
+            count,
+            self.size,
+            self.hashes,
+            TimezoneUtils.now_utc().isoformat(),
+        )
+
+    async def stats(self) -> dict[str, Any]:
+        """
+        返回过滤器状态：元素数、内存占用、当前与目标误判率
+
+        :return: 统计信息字典
+        """
+        redis_client = db.get_redis()
+        pipe = redis_client.pipeline(transaction=False)
+        pipe.hgetall(self.meta_key)
+        pipe.bitcount(self.key)
+        pipe.strlen(self.key)
+        meta, ones, memory_bytes = await pipe.execute()
+        fill_ratio = ones / self.size
+        estimated_count = (
+            round(-self.size / self.hashes * log(1 - fill_ratio))
+            if fill_ratio < 1
+            else None
+        )
+        count = int(meta.get("count", 0)) + int(meta.get("added", 0))
+        return {
+            "name": self.name,
+            "ready": bool(meta.get("ready")),
+            "capacity": self.capacity,
+            "count": count,
+            "estimated_count": estimated_count,
+            "size_bits": self.size,
+            "hashes": self.hashes,
+            "memory_bytes": memory_bytes,
+            "fill_ratio": fill_ratio,
+            "target_error_rate": self.error_rate,
+            "false_positive_rate": fill_ratio**self.hashes,
+            "expected_false_positive_rate": (
+                1 - exp(-self.hashes * count / self.size)
+            )
+            ** self.hashes,
+            "built_at": meta.get("built_at"),
+        }
+
+
+class FileIndexFilter:
+    """
+    files 集合的 sha1 / pick_code 存在性过滤器
+    """
+
+    __slots__ = ("sha1", "pick_code", "_rebuild_task")
+
+    def __init__(self) -> None:
+        self._rebuild_task: asyncio.Task | None = None
+        self.sha1 = BloomFilter("sha1", cfg.filter.capacity, cfg.filter.error_rate)
+        self.pick_code = BloomFilter(
+            "pick_code", cfg.filter.capacity, cfg.filter.error_rate
+        )
+
+    async def might_contain_sha1(self, sha1: str) -> bool:
+        """
+        sha1 是否可能已存在，False 表示一定不存在
+
+        :param sha1: 文件 SHA1
+        """
+        return await self.sha1.contains(sha1.upper())
+
+    async def might_contain_pick_code(self, pick_code: str) -> bool:
+        """
+        pick_code 是否可能已存在，False 表示一定不存在
+
+        :param pick_code: 115 提取码
+        """
+        return await self.pick_code.contains(pick_code)
+
+    async def add_file(self, sha1: str | None, pick_code: str | None) -> None:
+        """
+        新文件入库后增量写入过滤器
+
+        :param sha1: 文件 SHA1
+        :param pick_code: 115 提取码
+        """
+        try:
+            if sha1:
+                await self.sha1.add(sha1.upper())
+            if pick_code:
+                await self.pick_code.add(pick_code)
+        except Exception as exc:
+            logger.warning(f"【BloomFilter】增量写入失败: {exc}")
+
+    async def ensure(self) -> None:
+        """
+        启动时检查过滤器是否已构建，未构建则后台重建
+        """
+        try:
+            ready = await db.get_redis().hget(self.sha1.meta_key, "ready")
+        except Exception as exc:
+            logger.warning(f"【BloomFilter】检查过滤器状态失败: {exc}")
+            return
+        if not ready:
+            self._rebuild_task = asyncio.create_task(self.rebuild())
+
+    async def rebuild(self) -> bool:
+        """
+        从 files 集合全量重建过滤器（多 worker 间通过 Redis 锁互斥）
+
+        :return: 是否由当前进程完成重建
+        """
+        redis_client = db.get_redis()
+        token = secrets.token_hex(8)
+        acquired = await redis_client.set(
+            REDIS_KEY_BLOOM_REBUILD_LOCK, token, nx=True, ex=REBUILD_LOCK_TTL_SECONDS
+        )
+        if not acquired:
+            logger.info("【BloomFilter】其他进程正在重建，跳过")
+            return False
+        try:
+            await redis_client.delete(self.sha1.journal_key, self.pick_code.journal_key)
+            sha1_bits = bytearray((self.sha1.size + 7) // 8)
+            pick_code_bits = bytearray((self.pick_code.size + 7) // 8)
+            sha1_count = pick_code_count = 0
+            batch_size = cfg.filter.rebuild_batch_size
+            coll = db.get_mongo_client()[cfg.mongodb.db_name][FILES_COLLECTION_NAME]
+            cursor = coll.find(
+                {"is_dir": False}, {"_id": 0, "sha1": 1, "pick_code": 1}
+            ).batch_size(batch_size)
+            while batch := await cursor.to_list(length=batch_size):
+                sha1_count += await asyncio.to_thread(
+                    self.sha1.fill,
+                    sha1_bits,
+                    [(d.get("sha1") or "").upper() for d in batch],
+                )
+                pick_code_count += await asyncio.to_thread(
+                    self.pick_code.fill,
+                    pick_code_bits,
+                    [d.get("pick_code") or "" for d in batch],
+                )
+            replayed = await self.sha1.publish(sha1_bits, sha1_count)
+            replayed += await self.pick_code.publish(pick_code_bits, pick_code_count)
+            logger.info(
+                f"【BloomFilter】重建完成: sha1={sha1_count} pick_code={pick_code_count} "
+                f"回放={replayed}"
+            )
+            return True
+        except Exception as exc:
+            logger.error(f"【BloomFilter】重建失败: {exc}")
+            return False
+        finally:
+            try:
+                await release_lock(REDIS_KEY_BLOOM_REBUILD_LOCK, token)
+            except Exception as exc:
+                logger.debug(f"【BloomFilter】释放重建锁失败: {exc}")
+
+    async def stats(self) -> list[dict[str, Any]]:
+        """
+        返回两个过滤器的统计信息
+        """
+        return [await self.sha1.stats(), await self.pick_code.stats()]
+
+
+file_filter = FileIndexFilter()
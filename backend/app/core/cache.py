@@ -0,0 +1,351 @@
+import asyncio
+from functools import wraps
+from math import log
+from random import random
+from time import monotonic, time
+from typing import Any, Awaitable, Callable, Generic, TypeVar
+
+from orjson import dumps, loads
+
+from app.core.lock import redis_lock
+from app.core.logger import logger
+from app.core.metrics import metrics
+from app.db.database import db
+from app.utils.cache import TTLCache
+from app.utils.singleflight import SingleFlight
+
+
+V = TypeVar("V")
+
+REDIS_KEY_CACHE_PREFIX = "cache"
+REDIS_KEY_CACHE_LOCK_PREFIX = "cache:lock"
+REDIS_KEY_CACHE_VERSION_PREFIX = "cache:ver"
+REDIS_CHANNEL_CACHE_INVALIDATE_PREFIX = "cache:invalidate"
+CACHE_REFRESH_LOCK_TTL_SECONDS = 30
+CACHE_LISTENER_RETRY_SECONDS = 1.0
+
+
+class TwoTierCache(Generic[V]):
+    """
+    两级缓存：进程内 LRU 在前，Redis 在后，按命名空间隔离
+
+    - 未命中时进程内单飞，同一键只有一个加载任务
+    - 临近过期时按 XFetch 算法以一定概率提前在后台刷新，避免集中失效
+    - 过期后 stale_ttl 内仍返回旧值，并在 Redis 锁保护下后台刷新（全集群一个刷新者）
+    - 加载结果为 None 时不缓存
+    - 失效经 Redis pub/sub 广播，订阅了的 worker 立即清除本进程条目
+    - 每次写入递增条目版本号（仅在新鲜期内存在），供 ETag 等判断内容是否变化
+    """
+
+    __slots__ = (
+        "namespace",
+        "ttl",
+        "stale_ttl",
+        "beta",
+        "_local",
+        "_flight",
+        "_refresh_tasks",
+        "_listener",
+    )
+
+    def __init__(
+        self,
+        namespace: str,
+        *,
+        ttl: float,
+        stale_ttl: float = 0,
+        local_ttl: float = 0,
+        local_size: int = 256,
+        beta: float = 1.0,
+    ) -> None:
+        self.namespace = namespace
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.beta = beta
+        self._local: TTLCache[V] | None = (
+            TTLCache(local_size, local_ttl) if local_ttl > 0 else None
+        )
+        self._flight: SingleFlight[V | None] = SingleFlight()
+        self._refresh_tasks: set[asyncio.Task] = set()
+        self._listener: asyncio.Task | None = None
+
+    @property
+    def channel(self) -> str:
+        return f"{REDIS_CHANNEL_CACHE_INVALIDATE_PREFIX}:{self.namespace}"
+
+    def redis_key(self, key: str) -> str:
+        return f"{REDIS_KEY_CACHE_PREFIX}:{self.namespace}:{key}"
+
+    def version_key(self, key: str) -> str:
+        return f"{REDIS_KEY_CACHE_VERSION_PREFIX}:{self.namespace}:{key}"
+
+    async def get_or_load(
+        self, key: str, loader: Callable[[], Awaitable[V | None]]
+    ) -> V | None:
+        """
+        读取缓存，未命中时调用 loader 加载并写入
+
+        :param key: 命名空间内的键
+        :param loader: 无参 async 加载函数
+        :return: 值；无缓存且加载结果为 None 时返回 None
+        :raises Exception: 无任何缓存可用且加载失败时，原样抛出
+        """
+        name = f"cache.{self.namespace}"
+        if self._local is not None:
+            value = self._local.get(key)
+            if value is not None:
+                metrics.incr(f"{name}.local_hit")
+                return value
+        entry = await self._read(key)
+        if entry is not None:
+            now = time()
+            expires_at = entry["e"]
+            if now < expires_at:
+                if self.beta > 0 and (
+                    now - entry["d"] * self.beta * log(1.0 - random()) >= expires_at
+                ):
+                    metrics.incr(f"{name}.early_refresh")
+                    self._schedule_refresh(key, loader)
+                metrics.incr(f"{name}.redis_hit")
+                self._store_local(key, entry["v"], expires_at - now)
+                return entry["v"]
+            metrics.incr(f"{name}.stale_hit")
+            self._schedule_refresh(key, loader)
+            return entry["v"]
+        metrics.incr(f"{name}.miss")
+        value, _ = await self._flight.do(key, lambda: self._load(key, loader))
+        return value
+
+    def cached(
+        self, key: Callable[..., str]
+    ) -> Callable[
+        [Callable[..., Awaitable[V | None]]], Callable[..., Awaitable[V | None]]
+    ]:
+        """
+        装饰 async 函数，以 key(*args, **kwargs) 为键缓存其返回值
+
+        被装饰函数附带 refresh(*args, **kwargs)，用于跳过缓存强制加载并写入。
+
+        :param key: 由被装饰函数的参数生成命名空间内键的函数
+        :return: 装饰器
+        """
+
+        def decorator(
+            func: Callable[..., Awaitable[V | None]],
+        ) -> Callable[..., Awaitable[V | None]]:
+            @wraps(func)
+            async def wrapper(*args: Any, **kwargs: Any) -> V | None:
+                return await self.get_or_load(
+                    key(*args, **kwargs), lambda: func(*args, **kwargs)
+                )
+
+            async def refresh(*args: Any, **kwargs: Any) -> V | None:
+                return await self.refresh(
+                    key(*args, **kwargs), lambda: func(*args, **kwargs)
+                )
+
+            wrapper.refresh = refresh  # type: ignore[attr-defined]
+            return wrapper
+
+        return decorator
+
+    async def refresh(
+        self, key: str, loader: Callable[[], Awaitable[V | None]]
+    ) -> V | None:
+        """
+        跳过缓存强制加载并写入（预热）
+
+        :param key: 命名空间内的键
+        :param loader: 无参 async 加载函数
+        :return: 加载结果
+        """
+        value, _ = await self._flight.do(key, lambda: self._load(key, loader))
+        return value
+
+    async def put(self, key: str, value: V) -> None:
+        """
+        直接写入已获取的值
+
+        :param key: 命名空间内的键
+        :param value: 值
+        """
+
+        async def loader() -> V:
+            return value
+
+        await self._load(key, loader)
+
+    async def versions(self, *keys: str) -> list[int | None]:
+        """
+        读取条目版本号（一次 Redis 往返，不读取缓存值）
+
+        :param keys: 命名空间内的键
+        :return: 各键版本号；条目不存在、已过新鲜期或读取失败时为 None
+        """
+        try:
+            values = await db.get_redis().mget([self.version_key(k) for k in keys])
+        except Exception as exc:
+            logger.debug(f"【Cache】读取 {self.namespace} 版本号失败: {exc}")
+            return [None] * len(keys)
+        return [int(v) if v is not None else None for v in values]
+
+    async def invalidate(self, key: str | None = None) -> None:
+        """
+        删除缓存；不传 key 时清空整个命名空间
+
+        已调用 start_listener 的 worker 会收到广播并立即清除进程内条目，
+        其他 worker 的进程内缓存最多在 local_ttl 后失效。
+
+        :param key: 命名空间内的键
+        """
+        if self._local is not None:
+            if key is None:
+                self._local.clear()
+            else:
+                self._local.pop(key)
+        try:
+            redis_client = db.get_redis()
+            if key is not None:
+                await redis_client.delete(self.redis_key(key), self.version_key(key))
+            else:
+                keys = [
+                    k
+                    for prefix in (
+                        REDIS_KEY_CACHE_PREFIX,
+                        REDIS_KEY_CACHE_VERSION_PREFIX,
+                    )
+                    async for k in redis_client.scan_iter(
+                        match=f"{prefix}:{self.namespace}:*"
+                    )
+                ]
+                if keys:
+                    await redis_client.delete(*keys)
+            await redis_client.publish(self.channel, "*" if key is None else key)
+        except Exception as exc:
+            logger.warning(f"【Cache】清除 {self.namespace} 缓存失败: {exc}")
+
+    async def start_listener(self) -> None:
+        """
+        订阅本命名空间的失效广播
+        """
+        if self._listener is None and self._local is not None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop_listener(self) -> None:
+        """
+        停止订阅失效广播
+        """
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+    def invalidate_local(self) -> None:
+        """
+        仅清空本进程的缓存（收到其他 worker 的失效通知时使用）
+        """
+        if self._local is not None:
+            self._local.clear()
+
+    def stats(self) -> dict[str, Any]:
+        """
+        返回缓存统计
+
+        :return: 命中率与进程内条目数
+        """
+        name = f"cache.{self.namespace}"
+        return {
+            "hit_ratio": metrics.ratio(
+                [f"{name}.local_hit", f"{name}.redis_hit", f"{name}.stale_hit"],
+                [f"{name}.miss"],
+            ),
+            "local_size": len(self._local) if self._local is not None else 0,
+        }
+
+    async def _listen(self) -> None:
+        """
+        接收失效广播并清除进程内条目，断线后自动重连
+        """
+        while True:
+            pubsub = None
+            try:
+                pubsub = db.get_redis().pubsub()
+                await pubsub.subscribe(self.channel)
+                # 断线期间可能错过广播，重连后清空进程内缓存
+                self.invalidate_local()
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    if message["data"] == "*":
+                        self.invalidate_local()
+                    elif self._local is not None:
+                        self._local.pop(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning(f"【Cache】{self.namespace} 失效订阅中断，稍后重连: {exc}")
+            finally:
+                if pubsub is not None:
+                    try:
+                        await pubsub.aclose()
+                    except Exception:
+                        pass
+            await asyncio.sleep(CACHE_LISTENER_RETRY_SECONDS)
+
+    async def _read(self, key: str) -> dict[str, Any] | None:
+        try:
+            raw = await db.get_redis().get(self.redis_key(key))
+        except Exception as exc:
+            logger.debug(f"【Cache】读取 {self.redis_key(key)} 失败: {exc}")
+            return None
+        return loads(raw) if raw is not None else None
+
+    async def _load(
+        self, key: str, loader: Callable[[], Awaitable[V | None]]
+    ) -> V | None:
+        start = monotonic()
+        value = await loader()
+        elapsed = monotonic() - start
+        metrics.observe(f"cache.{self.namespace}.load_seconds", elapsed)
+        if value is None:
+            return None
+        self._store_local(key, value, self.ttl)
+        entry = {"v": value, "e": time() + self.ttl, "d": elapsed}
+        try:
+            pipe = db.get_redis().pipeline(transaction=False)
+            pipe.set(
+                self.redis_key(key),
+                dumps(entry).decode(),
+                ex=max(1, int(self.ttl + self.stale_ttl)),
+            )
+            pipe.incr(self.version_key(key))
+            pipe.expire(self.version_key(key), max(1, int(self.ttl)))
+            await pipe.execute()
+        except Exception as exc:
+            logger.debug(f"【Cache】写入 {self.redis_key(key)} 失败: {exc}")
+        return value
+
+    def _store_local(self, key: str, value: V, remaining: float) -> None:
+        if self._local is not None:
+            self._local.set(key, value, min(self._local.ttl, remaining))
+
+    def _schedule_refresh(
+        self, key: str, loader: Callable[[], Awaitable[V | None]]
+    ) -> None:
+        task = asyncio.create_task(self._refresh(key, loader))
+        self._refresh_tasks.add(task)
+        task.add_done_callback(self._refresh_tasks.discard)
+
+    async def _refresh(
+        self, key: str, loader: Callable[[], Awaitable[V | None]]
+    ) -> None:
+        lock_key = f"{REDIS_KEY_CACHE_LOCK_PREFIX}:{self.namespace}:{key}"
+        try:
+            async with redis_lock(lock_key, CACHE_REFRESH_LOCK_TTL_SECONDS) as acquired:
+                if acquired:
+                    await self._flight.do(key, lambda: self._load(key, loader))
+        except Exception as exc:
+            logger.warning(f"【Cache】后台刷新 {self.redis_key(key)} 失败: {exc}")
@@ -0,0 +1,246 @@
+import asyncio
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from time import monotonic
+from typing import Any, AsyncIterator, Callable, TypeVar
+
+from app.core.metrics import metrics
+
+
+T = TypeVar("T")
+
+THROTTLE_STATUS_CODES = (405, 429)
+
+
+def is_throttle_error(exc: BaseException) -> bool:
+    """
+    判断异常是否为 115 风控/限流响应（405、429）
+
+    :param exc: 调用 115 时抛出的异常
+    :return: 是否为限流类错误
+    """
+    for attr in ("status_code", "status", "code", "errno"):
+        if getattr(exc, attr, None) in THROTTLE_STATUS_CODES:
+            return True
+    response = getattr(exc, "response", None)
+    if getattr(response, "status_code", None) in THROTTLE_STATUS_CODES:
+        return True
+    return any(
+        isinstance(arg, dict)
+        and (
+            arg.get("errno") in THROTTLE_STATUS_CODES
+            or arg.get("code") in THROTTLE_STATUS_CODES
+        )
+        for arg in getattr(exc, "args", ())
+    )
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    AIMD 自适应并发控制
+
+    每积累 window 个样本评估一次：P95 延迟与错误率健康时并发上限加 1；
+    遇到限流响应时立即按 decrease_factor 乘性下调，并丢弃当前窗口。
+    """
+
+    __slots__ = (
+        "name",
+        "min_limit",
+        "max_limit",
+        "latency_target",
+        "error_threshold",
+        "decrease_factor",
+        "window",
+        "_limit",
+        "_inflight",
+        "_latencies",
+        "_errors",
+        "_cond",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        initial: int,
+        min_limit: int,
+        max_limit: int,
+        latency_target: float,
+        error_threshold: float,
+        decrease_factor: float = 0.5,
+        window: int = 20,
+    ) -> None:
+        self.name = name
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_target = latency_target
+        self.error_threshold = error_threshold
+        self.decrease_factor = decrease_factor
+        self.window = window
+        self._limit = max(min_limit, min(initial, max_limit))
+        self._inflight = 0
+        self._latencies: list[float] = []
+        self._errors = 0
+        self._cond = asyncio.Condition()
+        self._publish()
+
+    @property
+    def limit(self) -> int:
+        return self._limit
+
+    @property
+    def inflight(self) -> int:
+        return self._inflight
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """
+        占用一个并发槽位，并按执行结果调整并发上限
+
+        块内抛出的异常会计入错误率，限流类异常会触发乘性下调。
+        """
+        async with self._cond:
+            await self._cond.wait_for(lambda: self._inflight < self._limit)
+            self._inflight += 1
+        start = monotonic()
+        try:
+            yield
+        except BaseException as exc:
+            if not isinstance(exc, asyncio.CancelledError):
+                self.record(
+                    monotonic() - start,
+                    error=True,
+                    throttled=is_throttle_error(exc),
+                )
+            raise
+        else:
+            self.record(monotonic() - start)
+        finally:
+            async with self._cond:
+                self._inflight -= 1
+                self._cond.notify_all()
+
+    def record(
+        self, latency: float, *, error: bool = False, throttled: bool = False
+    ) -> None:
+        """
+        记录一次调用结果
+
+        :param latency: 耗时秒数
+        :param error: 是否失败
+        :param throttled: 是否为限流响应
+        """
+        metrics.observe(f"{self.name}.latency_seconds", latency)
+        if throttled:
+            metrics.incr(f"{self.name}.throttled")
+            self._limit = max(self.min_limit, int(self._limit * self.decrease_factor))
+            self._latencies.clear()
+            self._errors = 0
+            self._publish()
+            return
+        self._latencies.append(latency)
+        if error:
+            self._errors += 1
+        if len(self._latencies) < self.window:
+            return
+        ordered = sorted(self._latencies)
+        p95 = ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))]
+        error_rate = self._errors / len(self._latencies)
+        if p95 <= self.latency_target and error_rate <= self.error_threshold:
+            self._limit = min(self.max_limit, self._limit + 1)
+        elif error_rate > self.error_threshold:
+            self._limit = max(self.min_limit, int(self._limit * self.decrease_factor))
+        self._latencies.clear()
+        self._errors = 0
+        self._publish()
+
+    def _publish(self) -> None:
+        metrics.set_gauge(f"{self.name}.concurrency_limit", self._limit)
+
+
+class ExecutorSaturatedError(RuntimeError):
+    """
+    有界线程池已满（执行中与排队任务数达到上限）
+    """
+
+    def __init__(self, name: str) -> None:
+        super().__init__(f"{name} 繁忙，请稍后重试")
+        self.name = name
+
+
+class BoundedExecutor:
+    """
+    有界专用线程池：把阻塞型 CPU 任务移出事件循环
+
+    执行中与排队的任务总数达到 max_workers + max_queue 时立即拒绝，
+    避免突发请求在队列中无限堆积。
+    """
+
+    __slots__ = ("name", "max_workers", "max_queue", "_executor", "_pending")
+
+    def __init__(self, name: str, *, max_workers: int, max_queue: int) -> None:
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor: ThreadPoolExecutor | None = None
+        self._pending = 0
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    async def run(self, op: str, func: Callable[..., T], *args: Any) -> T:
+        """
+        在线程池中执行函数
+
+        :param op: 操作名（用于指标）
+        :param func: 阻塞函数
+        :param args: 位置参数
+        :return: 函数返回值
+        :raises ExecutorSaturatedError: 线程池已满时
+        """
+        if self._pending >= self.max_workers + self.max_queue:
+            metrics.incr(f"{self.name}.rejected")
+            raise ExecutorSaturatedError(self.name)
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix=self.name
+            )
+        self._pending += 1
+        metrics.set_gauge(f"{self.name}.pending", self._pending)
+        submitted = monotonic()
+
+        def timed() -> T:
+            metrics.observe(f"{self.name}.queue_seconds", monotonic() - submitted)
+            start = monotonic()
+            try:
+                return func(*args)
+            finally:
+                metrics.observe(f"{self.name}.{op}_seconds", monotonic() - start)
+
+        loop = asyncio.get_running_loop()
+
+        def release(_: Future) -> None:
+            # 名额在线程真正结束（或排队中被取消）时才归还：调用方被取消时
+            # 线程仍可能在运行，提前归还会让实际占用超出上限
+            try:
+                loop.call_soon_threadsafe(self._release)
+            except RuntimeError:
+                # 事件循环已关闭（应用退出），无需再维护指标
+                self._pending -= 1
+
+        future = self._executor.submit(timed)
+        future.add_done_callback(release)
+        return await asyncio.wrap_future(future, loop=loop)
+
+    def _release(self) -> None:
+        self._pending -= 1
+        metrics.set_gauge(f"{self.name}.pending", self._pending)
+
+    def shutdown(self) -> None:
+        """
+        关闭线程池
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -1,4 +1,5 @@
 from pathlib import Path
+from typing import Callable
 
 from pydantic import BaseModel, Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -62,6 +63,40 @@ class AuthConfig(BaseModel):
         default=30, description="访问令牌过期分钟数"
     )
     refresh_token_expire_days: int = Field(default=7, description="刷新令牌过期天数")
+    hash_workers: int = Field(default=2, ge=1, description="bcrypt 专用线程数")
+    hash_queue_size: int = Field(
+        default=16, ge=0, description="bcrypt 排队上限，超出时立即返回 503"
+    )
+    login_user_limit: int = Field(
+        default=5, ge=1, description="单个用户名在窗口内允许的登录尝试次数"
+    )
+    login_ip_limit: int = Field(
+        default=20, ge=1, description="单个 IP 在窗口内允许的登录尝试次数"
+    )
+    login_window_seconds: float = Field(
+        default=60.0, gt=0, description="登录尝试滑动窗口（秒）"
+    )
+    login_lockout_seconds: float = Field(
+        default=30.0, gt=0, description="首次锁定时长（秒），之后每次翻倍"
+    )
+    login_lockout_max_seconds: float = Field(
+        default=3600.0, gt=0, description="最长锁定时长（秒）"
+    )
+    trusted_proxies: list[str] = Field(
+        default_factory=lambda: ["127.0.0.1", "::1"],
+        description="可信反向代理（IP 或 CIDR），仅直连对端在其中时才读取转发头中的客户端 IP",
+    )
+    user_cache_ttl_seconds: int = Field(
+        default=60, ge=1, description="已认证用户缓存有效期（秒），即权限变更最长生效时间"
+    )
+    user_cache_local_ttl_seconds: float = Field(
+        default=5.0, ge=0, description="已认证用户进程内缓存有效期（秒）"
+    )
+    stream_token_expire_seconds: int = Field(
+        default=60,
+        ge=1,
+        description="SSE 令牌有效期（秒），仅在建立连接时校验",
+    )
 
 
 class LogConfig(BaseModel):
@@ -83,6 +118,176 @@ class LogConfig(BaseModel):
     async_workers: int = Field(default=2, description="异步写入线程数")
     batch_size: int = Field(default=50, description="批量写入条数")
     write_timeout: float = Field(default=3.0, description="批量写入超时（秒）")
+    fsync_interval: float = Field(
+        default=0.0, ge=0, description="批量写入后 fsync 的最小间隔（秒），0 表示不 fsync"
+    )
+
+
+class P115Config(BaseModel):
+    """
+    115 接口调用配置（超时、熔断、对冲请求、多账号调度、健康检查、缓存）
+    """
+
+    call_timeout: float = Field(default=10.0, gt=0, description="单次调用超时（秒）")
+    breaker_failure_threshold: int = Field(
+        default=5, ge=1, description="连续失败多少次后熔断"
+    )
+    breaker_reset_timeout: float = Field(
+        default=30.0, gt=0, description="熔断后多久允许试探请求（秒）"
+    )
+    hedge_enabled: bool = Field(default=True, description="幂等读请求是否启用对冲")
+    hedge_min_delay: float = Field(
+        default=0.2, ge=0, description="发出对冲请求的最短等待（秒）"
+    )
+    hedge_default_delay: float = Field(
+        default=1.0, ge=0, description="无延迟样本时发出对冲请求的等待（秒）"
+    )
+    health_check_minutes: float = Field(
+        default=10.0, gt=0, description="cookies 健康检查间隔（分钟）"
+    )
+    pool_quarantine_seconds: float = Field(
+        default=120.0, gt=0, description="账号被限流后暂停调度的秒数"
+    )
+    cache_ttl_seconds: int = Field(
+        default=1800, ge=1, description="账号信息缓存有效期（秒）"
+    )
+    cache_local_ttl_seconds: float = Field(
+        default=10.0, ge=0, description="进程内缓存有效期（秒），0 表示仅使用 Redis"
+    )
+    stale_ttl_seconds: int = Field(
+        default=7 * 86400,
+        ge=0,
+        description="缓存过期后继续保留的秒数（后台刷新期间先行返回、熔断或失败时兜底）",
+    )
+
+
+class FilterConfig(BaseModel):
+    """
+    文件存在性过滤器（布隆过滤器）配置
+    """
+
+    capacity: int = Field(
+        default=2_000_000, ge=1000, description="预期元素数量（单个过滤器）"
+    )
+    error_rate: float = Field(default=0.001, gt=0, lt=1, description="目标误判率")
+    rebuild_batch_size: int = Field(
+        default=5000, ge=100, description="重建时每批读取的文档数"
+    )
+
+
+class RateLimitConfig(BaseModel):
+    """
+    115 出站请求限流配置（Redis 令牌桶，所有 worker 共享）
+    """
+
+    enabled: bool = Field(default=True, description="是否启用限流")
+    info_rate: float = Field(default=1.0, gt=0, description="信息类接口每秒令牌数")
+    info_burst: int = Field(default=5, ge=1, description="信息类接口桶容量")
+    list_rate: float = Field(default=2.0, gt=0, description="目录列表接口每秒令牌数")
+    list_burst: int = Field(default=4, ge=1, description="目录列表接口桶容量")
+    download_rate: float = Field(
+        default=4.0, gt=0, description="下载链接接口每秒令牌数"
+    )
+    download_burst: int = Field(default=8, ge=1, description="下载链接接口桶容量")
+    max_wait: float = Field(default=30.0, ge=0, description="等待令牌的最长秒数")
+
+
+class SyncConfig(BaseModel):
+    """
+    同步流程配置
+    """
+
+    list_page_size: int = Field(
+        default=1150, ge=1, le=1150, description="目录列表每页条数"
+    )
+    list_concurrency_initial: int = Field(
+        default=4, ge=1, description="目录列表初始并发数"
+    )
+    list_concurrency_min: int = Field(default=1, ge=1, description="目录列表最小并发数")
+    list_concurrency_max: int = Field(
+        default=16, ge=1, description="目录列表最大并发数"
+    )
+    list_latency_target: float = Field(
+        default=2.0, gt=0, description="目录列表 P95 延迟健康阈值（秒）"
+    )
+    list_error_threshold: float = Field(
+        default=0.1, ge=0, le=1, description="目录列表错误率健康阈值"
+    )
+
+
+class HttpConfig(BaseModel):
+    """
+    出站 HTTP 连接池配置
+    """
+
+    max_connections: int = Field(default=200, ge=1, description="最大连接数")
+    max_keepalive_connections: int = Field(
+        default=50, ge=0, description="最大保持空闲连接数"
+    )
+    keepalive_expiry: float = Field(
+        default=60.0, ge=0, description="空闲连接保持秒数"
+    )
+    connect_timeout: float = Field(default=10.0, gt=0, description="建连超时（秒）")
+    read_timeout: float = Field(default=30.0, gt=0, description="读取超时（秒）")
+    http2: bool = Field(default=False, description="是否启用 HTTP/2")
+    stream_max_connections: int = Field(
+        default=100, ge=1, description="STRM 代理流连接池最大连接数"
+    )
+    stream_max_keepalive_connections: int = Field(
+        default=20, ge=0, description="STRM 代理流连接池最大保持空闲连接数"
+    )
+
+
+class StrmConfig(BaseModel):
+    """
+    STRM 播放配置
+    """
+
+    url_cache_size: int = Field(
+        default=4096, ge=16, description="进程内下载链接缓存条目数"
+    )
+    url_cache_default_ttl: int = Field(
+        default=900, ge=10, description="无法从链接解析过期时间时的缓存秒数"
+    )
+    url_cache_max_ttl: int = Field(
+        default=3600, ge=10, description="下载链接缓存最长秒数"
+    )
+    url_expire_margin: int = Field(
+        default=60, ge=0, description="提前于链接过期时间失效的秒数"
+    )
+    resolve_lock_ttl: float = Field(
+        default=10.0, gt=0, description="跨进程解析锁超时（秒）"
+    )
+    resolve_wait_timeout: float = Field(
+        default=8.0, gt=0, description="等待其他进程解析结果的最长秒数"
+    )
+    prefetch_count: int = Field(
+        default=2, ge=0, le=20, description="播放时预取后续同目录媒体文件数，0 关闭"
+    )
+    prefetch_concurrency: int = Field(
+        default=2, ge=1, description="预取并发请求数（单进程）"
+    )
+    prefetch_max_pending: int = Field(
+        default=32, ge=1, description="排队中的预取任务上限，超出则丢弃"
+    )
+    prefetch_dedupe_seconds: int = Field(
+        default=300, ge=0, description="同一文件重复触发预取的最小间隔（秒）"
+    )
+    proxy_mode: bool = Field(
+        default=False, description="默认以代理方式回源播放（不跳转 302）"
+    )
+    proxy_max_streams_per_file: int = Field(
+        default=4, ge=1, description="单个文件同时代理的最大流数"
+    )
+    proxy_stream_lease_seconds: int = Field(
+        default=60,
+        ge=10,
+        description="代理流名额租约秒数，传输中定期续期，进程崩溃后到期自动回收",
+    )
+    require_indexed: bool = Field(
+        default=False,
+        description="只接受已入库的提取码，过滤器判定不存在时直接 404（不请求 115）",
+    )
 
 
 class _EnvSettings(BaseSettings):
@@ -113,11 +318,46 @@ class _EnvSettings(BaseSettings):
 
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    USER_CACHE_TTL_SECONDS: int = 60
+    AUTH_HASH_WORKERS: int = 2
+    LOGIN_USER_LIMIT: int = 5
+    LOGIN_IP_LIMIT: int = 20
+    AUTH_TRUSTED_PROXIES: str = "127.0.0.1,::1"
 
     LOG_LEVEL: str = "INFO"
     LOG_DIR: str = "logs"
     LOG_MAX_FILE_SIZE: int = 5
     LOG_BACKUP_COUNT: int = 5
+    LOG_FSYNC_INTERVAL: float = 0.0
+
+    P115_CALL_TIMEOUT: float = 10.0
+    P115_HEDGE_ENABLED: bool = True
+    P115_CACHE_TTL_SECONDS: int = 1800
+    P115_HEALTH_CHECK_MINUTES: float = 10.0
+
+    FILTER_CAPACITY: int = 2_000_000
+    FILTER_ERROR_RATE: float = 0.001
+
+    STRM_URL_CACHE_SIZE: int = 4096
+    STRM_URL_CACHE_MAX_TTL: int = 3600
+    STRM_PREFETCH_COUNT: int = 2
+    STRM_PROXY_MODE: bool = False
+    STRM_PROXY_MAX_STREAMS_PER_FILE: int = 4
+    STRM_PROXY_STREAM_LEASE_SECONDS: int = 60
+    STRM_REQUIRE_INDEXED: bool = False
+
+    RATELIMIT_ENABLED: bool = True
+    RATELIMIT_INFO_RATE: float = 1.0
+    RATELIMIT_LIST_RATE: float = 2.0
+    RATELIMIT_DOWNLOAD_RATE: float = 4.0
+
+    SYNC_LIST_CONCURRENCY_INITIAL: int = 4
+    SYNC_LIST_CONCURRENCY_MAX: int = 16
+
+    HTTP_MAX_CONNECTIONS: int = 200
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 50
+    HTTP_HTTP2: bool = False
+    HTTP_STREAM_MAX_CONNECTIONS: int = 100
 
 
 class ConfigManager:
@@ -125,7 +365,21 @@ class ConfigManager:
     配置管理器
     """
 
-    __slots__ = ("app", "mongodb", "redis", "auth", "log", "_runtime_secret_key")
+    __slots__ = (
+        "app",
+        "mongodb",
+        "redis",
+        "auth",
+        "log",
+        "p115",
+        "filter",
+        "ratelimit",
+        "sync",
+        "http",
+        "strm",
+        "_runtime_secret_key",
+        "_secret_key_listeners",
+    )
 
     def __init__(self) -> None:
         env = _EnvSettings()
@@ -155,14 +409,58 @@ class ConfigManager:
         self.auth = AuthConfig(
             access_token_expire_minutes=env.ACCESS_TOKEN_EXPIRE_MINUTES,
             refresh_token_expire_days=env.REFRESH_TOKEN_EXPIRE_DAYS,
+            user_cache_ttl_seconds=env.USER_CACHE_TTL_SECONDS,
+            hash_workers=env.AUTH_HASH_WORKERS,
+            login_user_limit=env.LOGIN_USER_LIMIT,
+            login_ip_limit=env.LOGIN_IP_LIMIT,
+            trusted_proxies=[
+                p.strip() for p in env.AUTH_TRUSTED_PROXIES.split(",") if p.strip()
+            ],
         )
         self.log = LogConfig(
             level=env.LOG_LEVEL,
             log_dir=Path(env.LOG_DIR),
             max_file_size=env.LOG_MAX_FILE_SIZE,
             backup_count=env.LOG_BACKUP_COUNT,
+            fsync_interval=env.LOG_FSYNC_INTERVAL,
+        )
+        self.p115 = P115Config(
+            call_timeout=env.P115_CALL_TIMEOUT,
+            hedge_enabled=env.P115_HEDGE_ENABLED,
+            cache_ttl_seconds=env.P115_CACHE_TTL_SECONDS,
+            health_check_minutes=env.P115_HEALTH_CHECK_MINUTES,
+        )
+        self.filter = FilterConfig(
+            capacity=env.FILTER_CAPACITY,
+            error_rate=env.FILTER_ERROR_RATE,
+        )
+        self.ratelimit = RateLimitConfig(
+            enabled=env.RATELIMIT_ENABLED,
+            info_rate=env.RATELIMIT_INFO_RATE,
+            list_rate=env.RATELIMIT_LIST_RATE,
+            download_rate=env.RATELIMIT_DOWNLOAD_RATE,
+        )
+        self.sync = SyncConfig(
+            list_concurrency_initial=env.SYNC_LIST_CONCURRENCY_INITIAL,
+            list_concurrency_max=env.SYNC_LIST_CONCURRENCY_MAX,
+        )
+        self.http = HttpConfig(
+            max_connections=env.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=env.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            http2=env.HTTP_HTTP2,
+            stream_max_connections=env.HTTP_STREAM_MAX_CONNECTIONS,
+        )
+        self.strm = StrmConfig(
+            url_cache_size=env.STRM_URL_CACHE_SIZE,
+            url_cache_max_ttl=env.STRM_URL_CACHE_MAX_TTL,
+            prefetch_count=env.STRM_PREFETCH_COUNT,
+            proxy_mode=env.STRM_PROXY_MODE,
+            proxy_max_streams_per_file=env.STRM_PROXY_MAX_STREAMS_PER_FILE,
+            proxy_stream_lease_seconds=env.STRM_PROXY_STREAM_LEASE_SECONDS,
+            require_indexed=env.STRM_REQUIRE_INDEXED,
         )
         self._runtime_secret_key: str | None = None
+        self._secret_key_listeners: list[Callable[[], None]] = []
 
     def get_secret_key(self) -> str:
         """
@@ -180,6 +478,17 @@ class ConfigManager:
         :return: None
         """
         self._runtime_secret_key = key
+        for listener in self._secret_key_listeners:
+            listener()
+
+    def on_secret_key_change(self, listener: Callable[[], None]) -> None:
+        """
+        注册密钥变更回调（如清空依赖旧密钥的缓存）。
+
+        :param listener: 无参回调
+        :return: None
+        """
+        self._secret_key_listeners.append(listener)
 
 
 cfg = ConfigManager()
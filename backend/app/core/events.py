@@ -1,9 +1,16 @@
+from app.core.bloom import file_filter
 from app.core.config import cfg
+from app.core.http import http_transport
 from app.core.logger import LoggerManager, logger
 from app.core.p115 import p115_manager
+from app.core.qrlogin import qrcode_watcher
+from app.core.security import password_executor
+from app.db.config import db_config
 from app.db.database import db
 from app.db.secret_key import ensure_secret_key
-from app.services.user import UserService
+from app.helpers.strmsync import strm_sync_helper
+from app.services.stats import StatsService
+from app.services.user import UserService, user_cache
 from app.tasks.runner import task_runner
 
 
@@ -12,10 +19,18 @@ async def on_startup():
     应用启动
     """
     await db.connect()
+    await http_transport.open()
     secret_key = await ensure_secret_key(db.get_mongo_client())
     cfg.set_secret_key(secret_key)
     await UserService.ensure_default_admin()
+    await db_config.reload()
+    await db_config.start_listener()
     await p115_manager.load_from_db()
+    await p115_manager.start_listener()
+    await user_cache.start_listener()
+    await file_filter.ensure()
+    await StatsService.ensure_indexes()
+    await StatsService.ensure_rollups()
     logger.info("应用启动完成")
 
 
@@ -25,5 +40,12 @@ async def on_shutdown():
     """
     logger.info("应用关闭中...")
     await task_runner.stop()
+    await strm_sync_helper.stop()
+    await qrcode_watcher.stop()
+    await p115_manager.stop_listener()
+    await user_cache.stop_listener()
+    await db_config.stop_listener()
+    await http_transport.close()
+    password_executor.shutdown()
     await db.close()
     LoggerManager.shutdown()
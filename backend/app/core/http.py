@@ -0,0 +1,190 @@
+from http.cookiejar import CookieJar
+from http.cookies import BaseCookie
+from inspect import isawaitable, signature
+from typing import Any, Callable
+
+from httpx import AsyncClient, Cookies, Limits, Response, Timeout
+from orjson import loads
+
+from app.core.config import cfg
+
+
+def _build_client(
+    max_connections: int, max_keepalive_connections: int
+) -> AsyncClient:
+    return AsyncClient(
+        limits=Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=cfg.http.keepalive_expiry,
+        ),
+        timeout=Timeout(cfg.http.read_timeout, connect=cfg.http.connect_timeout),
+        follow_redirects=True,
+        http2=cfg.http.http2,
+    )
+
+
+class HttpTransport:
+    """
+    进程级出站 HTTP 连接池（keep-alive 复用），启动时打开、关闭时释放
+
+    115 接口调用与 STRM 代理长连接流使用两个独立连接池，
+    长时间占用连接的播放流不会耗尽接口调用的连接。
+    """
+
+    __slots__ = ("_client", "_stream_client")
+
+    def __init__(self) -> None:
+        self._client: AsyncClient | None = None
+        self._stream_client: AsyncClient | None = None
+
+    async def open(self) -> None:
+        """
+        创建连接池
+        """
+        if self._client is None:
+            self._client = _build_client(
+                cfg.http.max_connections, cfg.http.max_keepalive_connections
+            )
+        if self._stream_client is None:
+            self._stream_client = _build_client(
+                cfg.http.stream_max_connections,
+                cfg.http.stream_max_keepalive_connections,
+            )
+
+    async def close(self) -> None:
+        """
+        关闭连接池
+        """
+        for client in (self._client, self._stream_client):
+            if client is not None:
+                await client.aclose()
+        self._client = self._stream_client = None
+
+    @property
+    def client(self) -> AsyncClient:
+        """
+        获取共享的 httpx 异步客户端
+
+        :raises RuntimeError: 未打开时
+        """
+        if self._client is None:
+            raise RuntimeError("HTTP 连接池未打开，请先调用 HttpTransport.open()")
+        return self._client
+
+    @property
+    def stream_client(self) -> AsyncClient:
+        """
+        获取 STRM 代理流专用的 httpx 异步客户端
+
+        :raises RuntimeError: 未打开时
+        """
+        if self._stream_client is None:
+            raise RuntimeError("HTTP 连接池未打开，请先调用 HttpTransport.open()")
+        return self._stream_client
+
+    async def request(
+        self,
+        *,
+        url: str,
+        method: str = "GET",
+        params: Any = None,
+        data: Any = None,
+        json: Any = None,
+        files: Any = None,
+        headers: Any = None,
+        follow_redirects: bool = True,
+        raise_for_status: bool = True,
+        cookies: CookieJar | BaseCookie | None = None,
+        parse: Any = None,
+        async_: bool = True,
+        **_: Any,
+    ) -> Any:
+        """
+        p115client 的 request 适配器：所有 115 请求复用本连接池
+
+        参数约定见 P115Client.request 的 request 参数说明，未用到的参数会被忽略。
+
+        :param url: 请求链接
+        :param method: 请求方法
+        :param params: 查询参数
+        :param data: 请求体
+        :param json: JSON 请求体
+        :param files: multipart 上传文件
+        :param headers: 请求头
+        :param follow_redirects: 是否跟随重定向
+        :param raise_for_status: 响应码 >= 400 时是否抛出异常
+        :param cookies: CookieJar 时会随响应的 set-cookie 更新
+        :param parse: 响应解析方式（None / ... / True / False / Callable）
+        :param async_: 仅支持异步调用
+        :return: 按 parse 处理后的结果
+        """
+        if not async_:
+            raise RuntimeError("HttpTransport 仅支持异步请求")
+        content = None
+        if isinstance(data, (str, bytes, bytearray, memoryview)):
+            content, data = data if isinstance(data, str) else bytes(data), None
+        request = self.client.build_request(
+            method,
+            url,
+            params=params,
+            data=data,
+            content=content,
+            json=json,
+            files=files,
+            headers=headers,
+        )
+        jar = None
+        if isinstance(cookies, CookieJar):
+            # 与 P115Client 共享同一个 jar，响应的 set-cookie 会写回客户端
+            jar = Cookies(cookies)
+            jar.set_cookie_header(request)
+        elif cookies:
+            request.headers["cookie"] = "; ".join(
+                f"{k}={m.value}" for k, m in cookies.items()
+            )
+        response = await self.client.send(
+            request, follow_redirects=follow_redirects, stream=parse is None
+        )
+        if jar is not None:
+            jar.extract_cookies(response)
+        if raise_for_status and response.is_error:
+            await response.aclose()
+            response.raise_for_status()
+        if parse is None:
+            return response
+        if parse is ...:
+            await response.aclose()
+            return response
+        if parse is False:
+            return response.content
+        if parse is True:
+            return _parse_by_content_type(response)
+        result = (
+            parse(response, response.content)
+            if _positional_count(parse) >= 2
+            else parse(response)
+        )
+        return await result if isawaitable(result) else result
+
+
+def _parse_by_content_type(response: Response) -> Any:
+    content_type = response.headers.get("content-type", "")
+    if "json" in content_type:
+        return loads(response.content)
+    if content_type.startswith("text/"):
+        return response.text
+    return response.content
+
+
+def _positional_count(func: Callable) -> int:
+    try:
+        params = signature(func).parameters.values()
+    except (TypeError, ValueError):
+        return 1
+    return sum(
+        p.kind in (p.POSITIONAL_ONLY, p.POSITIONAL_OR_KEYWORD) for p in params
+    )
+
+
+http_transport = HttpTransport()
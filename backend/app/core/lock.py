@@ -0,0 +1,71 @@
+import secrets
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from app.core.logger import logger
+from app.db.database import db
+
+
+# files 集合批量写入（全量同步、统计重建）的跨进程互斥锁
+REDIS_KEY_FILES_WRITE_LOCK = "files:write:lock"
+FILES_WRITE_LOCK_TTL_SECONDS = 6 * 3600
+
+# 仅当锁仍由自己持有时才释放
+_RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+# 仅当锁仍由自己持有时才续期
+_RENEW_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('EXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+
+async def release_lock(key: str, token: str) -> bool:
+    """
+    比较令牌后释放锁，避免锁超时后误删其他进程持有的锁
+
+    :param key: 锁键
+    :param token: 加锁时写入的令牌
+    :return: 是否释放成功（锁已过期或被他人持有时为 False）
+    """
+    return bool(await db.get_redis().eval(_RELEASE_LOCK_SCRIPT, 1, key, token))
+
+
+async def renew_lock(key: str, token: str, ttl: int) -> bool:
+    """
+    比较令牌后续期锁
+
+    :param key: 锁键
+    :param token: 加锁时写入的令牌
+    :param ttl: 新的超时秒数
+    :return: 是否仍持有锁
+    """
+    return bool(await db.get_redis().eval(_RENEW_LOCK_SCRIPT, 1, key, token, ttl))
+
+
+@asynccontextmanager
+async def redis_lock(key: str, ttl: int) -> AsyncIterator[bool]:
+    """
+    跨进程互斥锁：以随机令牌 SET NX 加锁，退出时比较令牌后释放
+
+    :param key: 锁键
+    :param ttl: 锁超时秒数（持有进程崩溃时自动释放）
+    :return: 是否获得锁，未获得时调用方应跳过临界区
+    """
+    token = secrets.token_hex(8)
+    acquired = bool(await db.get_redis().set(key, token, nx=True, ex=ttl))
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            try:
+                await release_lock(key, token)
+            except Exception as exc:
+                logger.debug(f"释放锁 {key} 失败: {exc}")
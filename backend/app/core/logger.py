@@ -1,19 +1,21 @@
 import asyncio
 import logging
+import os
 import queue
 import sys
 import threading
 import time
 from concurrent.futures import ThreadPoolExecutor
 from contextvars import ContextVar
-from datetime import datetime
 from logging.handlers import RotatingFileHandler
 from pathlib import Path
+from types import CodeType
 from typing import Dict, Final
 
 import click
 
 from app.core.config import cfg
+from app.core.metrics import metrics
 
 # 请求 ID 上下文变量，用于链路追踪
 REQUEST_ID_CTX_VAR: Final[ContextVar[str]] = ContextVar("request_id", default="N/A")
@@ -38,24 +40,66 @@ class ColorFormatter(logging.Formatter):
         return super().format(record)
 
 
+# 可安全延迟到写入线程格式化的参数类型（不可变），其余类型在调用时立即格式化
+_DEFERRABLE_ARG_TYPES = frozenset((str, int, float, bool, bytes, type(None)))
+
+
+class LogMessage:
+    """
+    延迟格式化的日志消息：首次 str() 时才拼接（通常在写入线程中）
+
+    消息或参数含可变对象（列表、字典、模型等）时在构造时立即格式化，
+    避免写入线程读到调用方之后修改的状态，或与调用方并发读写同一对象。
+    """
+
+    __slots__ = ("msg", "args", "request_id", "caller", "_text")
+
+    def __init__(self, msg: object, args: tuple, request_id: str, caller: str):
+        self.msg = msg
+        self.args = args
+        self.request_id = request_id
+        self.caller = caller
+        self._text: str | None = None
+        if type(msg) is not str or any(
+            type(a) not in _DEFERRABLE_ARG_TYPES for a in args
+        ):
+            str(self)
+
+    def __str__(self) -> str:
+        text = self._text
+        if text is None:
+            msg = self.msg
+            if self.args:
+                try:
+                    message = msg % self.args
+                except (TypeError, ValueError):
+                    message = f"{msg} {' '.join(str(a) for a in self.args)}"
+            else:
+                message = msg
+            text = self._text = f"[{self.request_id}] {self.caller} - {message}"
+        return text
+
+
 class LogEntry:
     """日志条目"""
 
-    __slots__ = ("level", "message", "file_path", "timestamp", "kwargs")
+    __slots__ = ("level", "message", "file_path", "timestamp", "exc_info", "extra")
 
     def __init__(
         self,
-        level: str,
-        message: str,
+        level: int,
+        message: LogMessage | str,
         file_path: Path,
-        timestamp: datetime | None = None,
-        **kwargs,
+        timestamp: float | None = None,
+        exc_info=None,
+        extra: dict | None = None,
     ):
         self.level = level
         self.message = message
         self.file_path = file_path
-        self.timestamp = timestamp or datetime.now()
-        self.kwargs = kwargs
+        self.timestamp = time.time() if timestamp is None else timestamp
+        self.exc_info = exc_info
+        self.extra = extra
 
 
 class NonBlockingFileHandler:
@@ -82,6 +126,8 @@ class NonBlockingFileHandler:
             max_workers=cfg.log.async_workers, thread_name_prefix="LogWriter"
         )
         self._rotating_handlers: Dict[Path, RotatingFileHandler] = {}
+        self._last_fsync: Dict[Path, float] = {}
+        self.console: logging.Handler | None = None
         self._running = True
         self._write_thread = threading.Thread(target=self._batch_writer, daemon=True)
         self._write_thread.start()
@@ -102,31 +148,27 @@ class NonBlockingFileHandler:
 
     @staticmethod
     def _create_log_record(entry: LogEntry) -> logging.LogRecord:
-        """根据 LogEntry 创建 LogRecord"""
-        record_kwargs = dict(entry.kwargs)
-        extra_data = record_kwargs.pop("extra", None)
-        exc_info_value = record_kwargs.pop("exc_info", None)
-        if exc_info_value is True:
-            exc_info_value = sys.exc_info()
-
+        """根据 LogEntry 创建 LogRecord（在写入线程中执行）"""
         record = logging.LogRecord(
             name="",
-            level=getattr(logging, entry.level.upper(), logging.INFO),
+            level=entry.level,
             pathname="",
             lineno=0,
             msg=entry.message,
             args=(),
-            exc_info=exc_info_value,
+            exc_info=entry.exc_info,
         )
-        if extra_data and isinstance(extra_data, dict):
-            for key, value in extra_data.items():
+        # 使用调用时的时间而非写入时间
+        record.created = entry.timestamp
+        record.msecs = (entry.timestamp - int(entry.timestamp)) * 1000
+        if entry.extra and isinstance(entry.extra, dict):
+            for key, value in entry.extra.items():
                 if key not in record.__dict__:
                     setattr(record, key, value)
         return record
 
-    def write_log(self, level: str, message: str, file_path: Path, **kwargs):
+    def write_log(self, entry: LogEntry):
         """写入日志 - 自动检测协程环境选择写入方式"""
-        entry = LogEntry(level=level, message=message, file_path=file_path, **kwargs)
         if self._is_in_event_loop():
             self._write_non_blocking(entry)
         else:
@@ -146,31 +188,39 @@ class NonBlockingFileHandler:
             self._write_queue.put_nowait(entry)
         except queue.Full:
             # 队列满时回退到线程池同步写入
+            metrics.incr("log.queue_full")
             self._executor.submit(self._write_sync, entry)
 
     def _write_sync(self, entry: LogEntry):
         """同步写入单条日志"""
         try:
-            handler = self._get_rotating_handler(entry.file_path)
             record = self._create_log_record(entry)
-            handler.emit(record)
+            self._emit_console(record)
+            self._get_rotating_handler(entry.file_path).emit(record)
         except Exception as e:
             print(f"日志写入失败 {entry.file_path}: {e}")
 
+    def _emit_console(self, record: logging.LogRecord):
+        """输出到控制台（不等待批量，取出即输出）"""
+        if self.console is not None:
+            self.console.handle(record)
+
     def _batch_writer(self):
-        """后台批量写入线程"""
-        while self._running:
+        """后台批量写入线程（停止后写完队列中剩余的日志再退出）"""
+        while self._running or not self._write_queue.empty():
             try:
-                batch: list[LogEntry] = []
+                batch: list[tuple[Path, logging.LogRecord]] = []
                 end_time = time.time() + cfg.log.write_timeout
 
                 while len(batch) < cfg.log.batch_size and time.time() < end_time:
                     try:
                         remaining = max(0.01, end_time - time.time())
                         entry = self._write_queue.get(timeout=remaining)
-                        batch.append(entry)
                     except queue.Empty:
                         break
+                    record = self._create_log_record(entry)
+                    self._emit_console(record)
+                    batch.append((entry.file_path, record))
 
                 if batch:
                     self._write_batch(batch)
@@ -178,35 +228,101 @@ class NonBlockingFileHandler:
                 print(f"批量写入线程错误: {e}")
                 time.sleep(0.1)
 
-    def _write_batch(self, batch: list[LogEntry]):
-        """按文件分组批量写入"""
-        file_groups: Dict[Path, list[LogEntry]] = {}
-        for entry in batch:
-            file_groups.setdefault(entry.file_path, []).append(entry)
+    def _write_batch(self, batch: list[tuple[Path, logging.LogRecord]]):
+        """按文件分组，每个文件整批格式化后一次写入、一次 flush"""
+        start = time.time()
+        file_groups: Dict[Path, list[logging.LogRecord]] = {}
+        for file_path, record in batch:
+            file_groups.setdefault(file_path, []).append(record)
 
-        for file_path, entries in file_groups.items():
+        for file_path, records in file_groups.items():
             try:
-                handler = self._get_rotating_handler(file_path)
-                for entry in entries:
-                    record = self._create_log_record(entry)
-                    handler.emit(record)
+                self._write_records(file_path, records)
             except Exception as e:
-                print(f"批量写入失败 {file_path}: {e}")
-                for entry in entries:
-                    self._write_sync(entry)
+                metrics.incr("log.batch_write_failed")
+                print(f"批量写入失败，逐条重试 {file_path}: {e}", file=sys.stderr)
+                self._retry_records(file_path, records)
+
+        end = time.time()
+        metrics.observe("log.batch_size", len(batch))
+        metrics.observe("log.batch_write_seconds", end - start)
+        # 最早一条从调用到落盘的耗时
+        metrics.observe("log.batch_latency_seconds", end - batch[0][1].created)
+        metrics.set_gauge("log.queue_depth", self._write_queue.qsize())
+
+    def _retry_records(self, file_path: Path, records: list[logging.LogRecord]):
+        """整批写入失败后重新打开文件逐条重试，仍失败的记录输出到 stderr，避免整批丢失"""
+        handler = self._rotating_handlers.pop(file_path, None)
+        if handler is not None:
+            try:
+                handler.close()
+            except Exception:
+                pass
+        for record in records:
+            try:
+                self._write_records(file_path, [record])
+            except Exception:
+                metrics.incr("log.record_write_failed")
+                try:
+                    text = logging.Formatter(cfg.log.file_format).format(record)
+                except Exception:
+                    text = str(record.msg)
+                sys.stderr.write(f"{text}\n")
+
+    def _write_records(self, file_path: Path, records: list[logging.LogRecord]):
+        """格式化多条记录为一个缓冲区写入文件，滚动检查每批只做一次"""
+        handler = self._get_rotating_handler(file_path)
+        terminator = handler.terminator
+        text = "".join(handler.format(record) + terminator for record in records)
+        with handler.lock:
+            if handler.stream is None:
+                handler.stream = handler._open()
+            if handler.maxBytes > 0:
+                size = len(text.encode(handler.encoding or "utf-8"))
+                position = handler.stream.tell()
+                if position and position + size >= handler.maxBytes:
+                    handler.doRollover()
+            handler.stream.write(text)
+            handler.stream.flush()
+            interval = cfg.log.fsync_interval
+            if interval > 0:
+                now = time.monotonic()
+                if now - self._last_fsync.get(file_path, 0.0) >= interval:
+                    os.fsync(handler.stream.fileno())
+                    self._last_fsync[file_path] = now
 
     def shutdown(self):
-        """关闭文件处理器，清理资源"""
+        """关闭文件处理器：等待写入线程写完队列，再同步写入之后入队的剩余日志"""
         self._running = False
         if hasattr(self, "_write_thread"):
             self._write_thread.join(timeout=5)
         if self._executor:
             self._executor.shutdown(wait=True)
+        while True:
+            try:
+                entry = self._write_queue.get_nowait()
+            except queue.Empty:
+                break
+            self._write_sync(entry)
         for handler in self._rotating_handlers.values():
             handler.close()
         self._rotating_handlers.clear()
 
 
+def _effective_level() -> int:
+    """根据配置计算日志级别"""
+    if cfg.app.debug:
+        return logging.DEBUG
+    return getattr(logging, cfg.log.level.upper(), logging.INFO)
+
+
+def _create_console_handler() -> logging.Handler:
+    """创建彩色控制台处理器"""
+    console = logging.StreamHandler()
+    console.setFormatter(ColorFormatter(cfg.log.console_format))
+    return console
+
+
 class LoggerManager:
     """日志管理器 - 统一日志入口
 
@@ -215,106 +331,77 @@ class LoggerManager:
     - 非阻塞异步文件写入（RotatingFileHandler 自动滚动）
     - 请求 ID 链路追踪
     - 自动识别调用者模块
+
+    热路径：级别预先计算，被过滤的日志只做一次整数比较；调用者模块名按代码对象缓存；
+    消息拼接、LogRecord 创建与控制台/文件输出均延迟到写入线程
     """
 
-    _loggers: Dict[str, logging.Logger] = {}
+    _level: int = _effective_level()
+    _caller_names: Dict[CodeType, str] = {}
     _default_log_file = "app.log"
-    _lock = threading.Lock()
+    _log_file: Path = cfg.log.log_dir / _default_log_file
     _file_handler = NonBlockingFileHandler()
+    _file_handler.console = _create_console_handler()
 
-    @staticmethod
-    def _get_caller_name() -> str:
-        """获取调用者模块名"""
-        try:
-            frame = sys._getframe(3)
-            filepath = Path(frame.f_code.co_filename)
+    @classmethod
+    def _caller_name(cls, code: CodeType) -> str:
+        """获取调用者模块名（按代码对象缓存）"""
+        name = cls._caller_names.get(code)
+        if name is None:
+            filepath = Path(code.co_filename)
             name = filepath.stem
             if name == "__init__" and len(filepath.parts) >= 2:
                 name = filepath.parts[-2]
-            return name
-        except (AttributeError, ValueError):
-            return "unknown"
-
-    def _get_or_create_console_logger(self, name: str) -> logging.Logger:
-        """获取或创建控制台日志实例"""
-        if name in self._loggers:
-            return self._loggers[name]
-
-        with self._lock:
-            if name in self._loggers:
-                return self._loggers[name]
-
-            _logger = logging.getLogger(f"loofcloud.{name}")
-            _logger.setLevel(self._get_log_level())
-            _logger.handlers.clear()
-
-            console = logging.StreamHandler()
-            console.setFormatter(ColorFormatter(cfg.log.console_format))
-            _logger.addHandler(console)
-            _logger.propagate = False
-
-            self._loggers[name] = _logger
-            return _logger
-
-    @staticmethod
-    def _get_log_level() -> int:
-        """获取当前日志级别"""
-        if cfg.app.debug:
-            return logging.DEBUG
-        return getattr(logging, cfg.log.level.upper(), logging.INFO)
-
-    def _log(self, method: str, msg: str, *args, **kwargs):
-        """核心日志方法"""
-        method_level = getattr(logging, method.upper(), logging.INFO)
-        if method_level < self._get_log_level():
-            return
-
-        caller_name = self._get_caller_name()
-        request_id = REQUEST_ID_CTX_VAR.get()
-
-        # 格式化消息
-        if args:
-            try:
-                message = msg % args
-            except (TypeError, ValueError):
-                message = f"{msg} {' '.join(str(a) for a in args)}"
-        else:
-            message = msg
-
-        formatted = f"[{request_id}] {caller_name} - {message}"
+            cls._caller_names[code] = name
+        return name
 
-        # 异步文件写入
-        log_file = cfg.log.log_dir / self._default_log_file
-        self._file_handler.write_log(method.upper(), formatted, log_file, **kwargs)
-
-        # 控制台输出
-        _logger = self._get_or_create_console_logger(caller_name)
-        if hasattr(_logger, method):
-            getattr(_logger, method)(formatted, **kwargs)
+    def _log(self, level: int, msg: str, args: tuple, kwargs: dict):
+        """核心日志方法（调用方已完成级别判断）"""
+        try:
+            caller_name = self._caller_name(sys._getframe(2).f_code)
+        except (AttributeError, ValueError):
+            caller_name = "unknown"
+        exc_info = kwargs.get("exc_info")
+        if exc_info is True:
+            # 异常信息需在调用线程中获取
+            exc_info = sys.exc_info()
+        self._file_handler.write_log(
+            LogEntry(
+                level,
+                LogMessage(msg, args, REQUEST_ID_CTX_VAR.get(), caller_name),
+                self._log_file,
+                exc_info=exc_info,
+                extra=kwargs.get("extra"),
+            )
+        )
 
     def info(self, msg: str, *args, **kwargs):
         """信息级别"""
-        self._log("info", msg, *args, **kwargs)
+        if self._level <= logging.INFO:
+            self._log(logging.INFO, msg, args, kwargs)
 
     def debug(self, msg: str, *args, **kwargs):
         """调试级别"""
-        self._log("debug", msg, *args, **kwargs)
+        if self._level <= logging.DEBUG:
+            self._log(logging.DEBUG, msg, args, kwargs)
 
     def warning(self, msg: str, *args, **kwargs):
         """警告级别"""
-        self._log("warning", msg, *args, **kwargs)
+        if self._level <= logging.WARNING:
+            self._log(logging.WARNING, msg, args, kwargs)
 
-    def warn(self, msg: str, *args, **kwargs):
-        """警告级别（兼容别名）"""
-        self.warning(msg, *args, **kwargs)
+    # 警告级别（兼容别名），直接指向 warning 以保持调用栈深度一致
+    warn = warning
 
     def error(self, msg: str, *args, **kwargs):
         """错误级别"""
-        self._log("error", msg, *args, **kwargs)
+        if self._level <= logging.ERROR:
+            self._log(logging.ERROR, msg, args, kwargs)
 
     def critical(self, msg: str, *args, **kwargs):
         """严重错误级别"""
-        self._log("critical", msg, *args, **kwargs)
+        if self._level <= logging.CRITICAL:
+            self._log(logging.CRITICAL, msg, args, kwargs)
 
     @classmethod
     def shutdown(cls):
@@ -0,0 +1,126 @@
+import secrets
+
+from app.core.config import cfg
+from app.core.logger import logger
+from app.core.metrics import metrics
+from app.db.database import db
+
+
+REDIS_KEY_LOGIN_PREFIX = "auth:login"
+
+# 滑动窗口 + 指数锁定，KEYS 为 (窗口有序集合, 锁定键, 锁定次数键) 三个一组（用户名、IP）；
+# 任一主体处于锁定中则直接拒绝，窗口内尝试次数达到上限时按 base * 2^次数 锁定，
+# 否则记录本次尝试。返回需要等待的毫秒数，0 表示放行
+_CHECK_SCRIPT = """
+local window = tonumber(ARGV[1])
+local base = tonumber(ARGV[2])
+local max_lock = tonumber(ARGV[3])
+local member = ARGV[4]
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local retry = 0
+for i = 1, #KEYS, 3 do
+    local ttl = redis.call('PTTL', KEYS[i + 1])
+    if ttl > retry then
+        retry = ttl
+    end
+end
+if retry > 0 then
+    return retry
+end
+for i = 1, #KEYS, 3 do
+    local limit = tonumber(ARGV[5 + (i - 1) / 3])
+    redis.call('ZREMRANGEBYSCORE', KEYS[i], '-inf', now - window)
+    if redis.call('ZCARD', KEYS[i]) >= limit then
+        local strikes = redis.call('INCR', KEYS[i + 2])
+        redis.call('PEXPIRE', KEYS[i + 2], max_lock * 2)
+        local lock = math.floor(math.min(max_lock, base * 2 ^ (strikes - 1)))
+        redis.call('SET', KEYS[i + 1], '1', 'PX', lock)
+        redis.call('DEL', KEYS[i])
+        if lock > retry then
+            retry = lock
+        end
+    end
+end
+if retry > 0 then
+    return retry
+end
+for i = 1, #KEYS, 3 do
+    redis.call('ZADD', KEYS[i], now, member)
+    redis.call('PEXPIRE', KEYS[i], window)
+end
+return 0
+"""
+
+
+class LoginThrottled(RuntimeError):
+    """
+    登录尝试过于频繁，暂时锁定
+    """
+
+    def __init__(self, retry_after: float) -> None:
+        super().__init__(f"登录尝试过于频繁，请 {retry_after:.0f}s 后重试")
+        self.retry_after = retry_after
+
+
+class LoginGuard:
+    """
+    登录限流：按用户名与 IP 的滑动窗口限制尝试次数，超出后指数延长锁定时间。
+    在校验密码（bcrypt）之前执行，单次检查只需一次 Redis 往返
+    """
+
+    __slots__ = ()
+
+    @staticmethod
+    def _keys(subject: str) -> list[str]:
+        return [
+            f"{REDIS_KEY_LOGIN_PREFIX}:window:{subject}",
+            f"{REDIS_KEY_LOGIN_PREFIX}:lock:{subject}",
+            f"{REDIS_KEY_LOGIN_PREFIX}:strikes:{subject}",
+        ]
+
+    async def check(self, username: str, ip: str | None) -> None:
+        """
+        记录一次登录尝试，超出限制时拒绝
+
+        :param username: 用户名
+        :param ip: 客户端 IP，未知时仅按用户名限制
+        :raises LoginThrottled: 用户名或 IP 处于锁定中时
+        """
+        keys = self._keys(f"user:{username}")
+        limits = [cfg.auth.login_user_limit]
+        if ip:
+            keys += self._keys(f"ip:{ip}")
+            limits.append(cfg.auth.login_ip_limit)
+        try:
+            retry_ms = await db.get_redis().eval(
+                _CHECK_SCRIPT,
+                len(keys),
+                *keys,
+                int(cfg.auth.login_window_seconds * 1000),
+                int(cfg.auth.login_lockout_seconds * 1000),
+                int(cfg.auth.login_lockout_max_seconds * 1000),
+                secrets.token_hex(8),
+                *limits,
+            )
+        except Exception as exc:
+            logger.debug(f"【LoginGuard】登录限流不可用，放行: {exc}")
+            metrics.incr("auth.login.throttle_redis_error")
+            return
+        if retry_ms > 0:
+            metrics.incr("auth.login.throttled")
+            raise LoginThrottled(max(1.0, retry_ms / 1000))
+
+    async def reset(self, username: str) -> None:
+        """
+        登录成功后清除该用户名的尝试记录与锁定次数
+
+        :param username: 用户名
+        """
+        try:
+            await db.get_redis().delete(*self._keys(f"user:{username}"))
+        except Exception as exc:
+            logger.debug(f"【LoginGuard】清除登录尝试记录失败: {exc}")
+
+
+login_guard = LoginGuard()
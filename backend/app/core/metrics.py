@@ -0,0 +1,140 @@
+import threading
+from collections import deque
+from typing import Any
+
+
+def _pick(ordered: list[float], q: float) -> float | None:
+    if not ordered:
+        return None
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class _Timing:
+    """
+    耗时/数值分布统计，保留最近 window 个样本用于分位数计算
+    """
+
+    __slots__ = ("count", "total", "max", "samples")
+
+    def __init__(self, window: int) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples: deque[float] = deque(maxlen=window)
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+        self.samples.append(value)
+
+    def percentile(self, q: float) -> float | None:
+        return _pick(sorted(self.samples), q)
+
+    def snapshot(self) -> dict[str, Any]:
+        ordered = sorted(self.samples)
+        return {
+            "count": self.count,
+            "avg": self.total / self.count if self.count else None,
+            "max": self.max if self.count else None,
+            "p50": _pick(ordered, 0.5),
+            "p95": _pick(ordered, 0.95),
+            "p99": _pick(ordered, 0.99),
+        }
+
+
+class MetricsRegistry:
+    """
+    进程内指标：计数器与数值分布（每个 worker 独立统计）
+    """
+
+    __slots__ = ("_counters", "_gauges", "_timings", "_window", "_lock")
+
+    def __init__(self, window: int = 1024) -> None:
+        self._counters: dict[str, int] = {}
+        self._gauges: dict[str, float] = {}
+        self._timings: dict[str, _Timing] = {}
+        self._window = window
+        self._lock = threading.Lock()
+
+    def incr(self, name: str, value: int = 1) -> None:
+        """
+        计数器累加
+
+        :param name: 指标名
+        :param value: 增量
+        """
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def set_gauge(self, name: str, value: float) -> None:
+        """
+        设置瞬时值
+
+        :param name: 指标名
+        :param value: 当前值
+        """
+        self._gauges[name] = value
+
+    def observe(self, name: str, value: float) -> None:
+        """
+        记录一个样本（如耗时秒数）
+
+        :param name: 指标名
+        :param value: 样本值
+        """
+        with self._lock:
+            timing = self._timings.get(name)
+            if timing is None:
+                timing = self._timings[name] = _Timing(self._window)
+            timing.add(value)
+
+    def counter(self, name: str) -> int:
+        """
+        读取计数器
+
+        :param name: 指标名
+        :return: 当前计数
+        """
+        return self._counters.get(name, 0)
+
+    def percentile(self, name: str, q: float) -> float | None:
+        """
+        读取最近样本的分位数
+
+        :param name: 指标名
+        :param q: 分位（0~1）
+        :return: 分位数，无样本时为 None
+        """
+        with self._lock:
+            timing = self._timings.get(name)
+            return timing.percentile(q) if timing else None
+
+    def ratio(self, hits: list[str], misses: list[str]) -> float | None:
+        """
+        计算命中率：sum(hits) / (sum(hits) + sum(misses))
+
+        :param hits: 命中计数器名
+        :param misses: 未命中计数器名
+        :return: 命中率，无样本时为 None
+        """
+        hit = sum(self.counter(n) for n in hits)
+        total = hit + sum(self.counter(n) for n in misses)
+        return hit / total if total else None
+
+    def snapshot(self) -> dict[str, Any]:
+        """
+        导出全部指标
+
+        :return: 含 counters、gauges、timings 的字典
+        """
+        with self._lock:
+            return {
+                "counters": dict(self._counters),
+                "gauges": dict(self._gauges),
+                "timings": {k: v.snapshot() for k, v in self._timings.items()},
+            }
+
+
+metrics = MetricsRegistry()
@@ -1,20 +1,45 @@
+import asyncio
 from datetime import timezone
 from typing import Any, Literal
 
-from orjson import loads, dumps
 from p115client import P115Client, check_response
 
+from app.core.cache import TwoTierCache
 from app.core.config import cfg
+from app.core.http import http_transport
 from app.core.logger import logger
+from app.core.ratelimit import DEFAULT_ACCOUNT, rate_limiter
+from app.core.resilience import p115_guard
 from app.db.database import db
 from app.utils.timezone import TimezoneUtils
 
 
 COLLECTION_NAME = "system_settings"
 DOC_ID = "p115_cookies"
-REDIS_KEY_P115_USER_INFO = "p115:user_info"
-REDIS_KEY_P115_STORAGE_INFO = "p115:storage_info"
-P115_CACHE_TTL_SECONDS = 1800
+ACCOUNT_PATTERN = r"^[A-Za-z0-9_-]{1,32}$"
+REDIS_KEY_P115_INVALID_PREFIX = "p115:pool:invalid"
+REDIS_KEY_P115_LOGIN_VERSION = "p115:login:version"
+REDIS_CHANNEL_P115_LOGIN = "p115:login"
+LOGIN_LISTENER_RETRY_SECONDS = 1.0
+
+# 账号相关的 115 读接口缓存，登入/登出时整体失效
+p115_cache: TwoTierCache[dict[str, Any]] = TwoTierCache(
+    "p115",
+    ttl=cfg.p115.cache_ttl_seconds,
+    stale_ttl=cfg.p115.stale_ttl_seconds,
+    local_ttl=cfg.p115.cache_local_ttl_seconds,
+)
+
+
+class PooledP115Client(P115Client):
+    """
+    异步请求默认复用进程级 HTTP 连接池的 115 客户端
+    """
+
+    def request(self, /, *args: Any, async_: bool = False, **request_kwargs: Any):
+        if async_:
+            request_kwargs.setdefault("request", http_transport.request)
+        return super().request(*args, async_=async_, **request_kwargs)
 
 
 class P115Manager:
@@ -22,34 +47,93 @@ class P115Manager:
     115 网盘客户端管理
     """
 
-    __slots__ = ("_client",)
+    __slots__ = ("_clients", "_cookies", "_status", "_version", "_listener")
 
     def __init__(self) -> None:
-        self._client: P115Client | None = None
+        self._clients: dict[str, PooledP115Client] = {}
+        self._cookies: dict[str, str] = {}
+        self._status: dict[str, dict[str, Any]] = {}
+        self._version = 0
+        self._listener: asyncio.Task | None = None
 
     @property
     def logged_in(self) -> bool:
-        return self._client is not None
+        return DEFAULT_ACCOUNT in self._clients
+
+    @property
+    def client(self) -> PooledP115Client | None:
+        """
+        默认账号的客户端（仪表盘等账号信息接口使用）
+        """
+        return self._clients.get(DEFAULT_ACCOUNT)
 
     @property
-    def client(self) -> P115Client | None:
-        return self._client
+    def clients(self) -> dict[str, PooledP115Client]:
+        """
+        全部已登入账号的客户端（多账号调度使用）
+        """
+        return dict(self._clients)
+
+    @property
+    def version(self) -> int:
+        """
+        本进程已同步的登入状态版本号
+        """
+        return self._version
+
+    @staticmethod
+    def doc_id(account: str) -> str:
+        """
+        账号 cookies 在 system_settings 中的文档 ID（默认账号沿用 p115_cookies）
+
+        :param account: 账号标识
+        """
+        return DOC_ID if account == DEFAULT_ACCOUNT else f"{DOC_ID}:{account}"
 
     async def load_from_db(self) -> None:
         """
-        加载已存储的 cookies，初始化客户端
+        加载已存储的全部账号 cookies，初始化（或热替换）客户端
         """
+        version = await self._remote_version()
         try:
             coll = db.get_mongo_client()[cfg.mongodb.db_name][COLLECTION_NAME]
-            doc = await coll.find_one({"_id": DOC_ID})
-            if doc and doc.get("value"):
-                self._client = P115Client(doc["value"])
-                logger.info("【P115Core】从数据库加载 cookies 成功")
+            docs = await coll.find({"_id": {"$regex": f"^{DOC_ID}(:|$)"}}).to_list(
+                None
+            )
+            accounts = {self._account_of(doc["_id"]): doc for doc in docs}
+            for account in set(self._clients) - set(accounts):
+                self._apply_doc(account, None)
+            for account, doc in accounts.items():
+                self._apply_doc(account, doc)
+            self._version = max(self._version, version)
+            if self._clients:
+                logger.info(
+                    f"【P115Core】从数据库加载 cookies 成功，账号: {sorted(self._clients)}"
+                )
             else:
                 logger.warning("【P115Core】数据库中无已保存的 cookies")
         except Exception as exc:
             logger.error(f"【P115Core】加载 cookies 失败 - {exc}")
 
+    async def start_listener(self) -> None:
+        """
+        订阅登入状态广播，其他 worker 登入或登出后热替换本进程的客户端
+        """
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop_listener(self) -> None:
+        """
+        停止订阅登入状态广播
+        """
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
     @staticmethod
     async def get_qrcode_token(app: str = "qandroid") -> dict[str, Any]:
         """
@@ -58,7 +142,9 @@ class P115Manager:
         :param app: 客户端类型，默认 qandroid
         :return: 包含 uid、time、sign、qrcode_content 的字典
         """
-        resp = await P115Client.login_qrcode_token(app=app, async_=True)
+        resp = await P115Client.login_qrcode_token(
+            app=app, request=http_transport.request, async_=True
+        )
         data = resp["data"]
         return {
             "uid": data["uid"],
@@ -75,7 +161,9 @@ class P115Manager:
         :param uid: 二维码 token 中的 uid
         :return: PNG 图片字节
         """
-        return await P115Client.login_qrcode(uid, async_=True)
+        return await P115Client.login_qrcode(
+            uid, request=http_transport.request, async_=True
+        )
 
     @staticmethod
     async def poll_qrcode_status(payload: dict[str, Any]) -> dict[str, Any]:
@@ -85,99 +173,89 @@ class P115Manager:
         :param payload: 需包含 uid、time、sign
         :return: 包含 status、msg 的字典
         """
-        resp = await P115Client.login_qrcode_scan_status(payload, async_=True)
+        resp = await P115Client.login_qrcode_scan_status(
+            payload, request=http_transport.request, async_=True
+        )
         return {
             "status": resp.get("data", {}).get("status", resp.get("status")),
             "msg": resp.get("data", {}).get("msg", resp.get("msg", "")),
         }
 
-    async def confirm_qrcode(self, uid: str, app: str = "qandroid") -> str:
+    async def confirm_qrcode(
+        self, uid: str, app: str = "qandroid", account: str = DEFAULT_ACCOUNT
+    ) -> str:
         """
         确认扫码，获取 cookies 并保存到数据库
 
+        附加账号须与默认账号为同一 115 用户（不同设备登入），
+        因为提取码、目录 ID 只在同一用户下有效。
+
         :param uid: 二维码 token 中的 uid
         :param app: 客户端类型，默认 qandroid
+        :param account: 账号标识，默认账号之外的账号用于分摊接口调用
         :return: 拼接后的 cookies 字符串
+        :raises ValueError: 附加账号与默认账号不是同一 115 用户时
         """
-        result = await P115Client.login_qrcode_scan_result(uid, app=app, async_=True)
+        result = await P115Client.login_qrcode_scan_result(
+            uid, app=app, request=http_transport.request, async_=True
+        )
         cookie_dict: dict[str, str] = result["data"]["cookie"]
         cookies_str = "; ".join(f"{k}={v}" for k, v in cookie_dict.items())
-        self._client = P115Client(cookies_str)
-        await self._save_cookies(cookies_str, app)
+        primary = self._cookies.get(DEFAULT_ACCOUNT)
+        if account != DEFAULT_ACCOUNT and (
+            primary is None or self._user_id(primary) != self._user_id(cookies_str)
+        ):
+            raise ValueError("附加账号必须与默认账号为同一 115 用户")
+        self._apply_doc(account, await self._save_cookies(account, cookies_str, app))
         try:
-            await db.get_redis().delete(
-                REDIS_KEY_P115_USER_INFO, REDIS_KEY_P115_STORAGE_INFO
-            )
+            await db.get_redis().delete(f"{REDIS_KEY_P115_INVALID_PREFIX}:{account}")
         except Exception as exc:
-            logger.debug(f"【P115Core】登入后清除缓存失败: {exc}")
-        logger.info("【P115Core】扫码登入成功")
+            logger.debug(f"【P115Core】清除账号 {account} 失效标记失败: {exc}")
+        if account == DEFAULT_ACCOUNT:
+            await p115_cache.invalidate()
+        await self._broadcast()
+        logger.info(f"【P115Core】账号 {account} 扫码登入成功")
         return cookies_str
 
-    async def logout(self) -> None:
+    async def logout(self, account: str = DEFAULT_ACCOUNT) -> None:
         """
-        清除已保存的 cookies、客户端实例与 Redis 缓存
+        清除账号已保存的 cookies、客户端实例与 Redis 缓存，并通知其他 worker
+
+        :param account: 账号标识
         """
-        self._client = None
+        self._apply_doc(account, None)
         coll = db.get_mongo_client()[cfg.mongodb.db_name][COLLECTION_NAME]
-        await coll.delete_one({"_id": DOC_ID})
-        try:
-            redis_client = db.get_redis()
-            await redis_client.delete(
-                REDIS_KEY_P115_USER_INFO, REDIS_KEY_P115_STORAGE_INFO
-            )
-        except Exception as exc:
-            logger.warning(f"【P115Core】清除 Redis 缓存失败: {exc}")
-        logger.info("【P115Core】已退出登录，cookies 已清除")
+        await coll.delete_one({"_id": self.doc_id(account)})
+        if account == DEFAULT_ACCOUNT:
+            await p115_cache.invalidate()
+        await self._broadcast()
+        logger.info(f"【P115Core】账号 {account} 已退出登录，cookies 已清除")
 
     async def get_status(self) -> dict[str, Any]:
         """
-        返回当前登入状态信息
+        返回当前登入状态信息（读内存，由登入状态广播保持各 worker 一致）
 
-        :return: 含 logged_in、app、updated_at 的字典，未登录时为 {"logged_in": False}
+        :return: 默认账号的 logged_in、app、updated_at 及全部账号列表 accounts
         """
-        coll = db.get_mongo_client()[cfg.mongodb.db_name][COLLECTION_NAME]
-        doc = await coll.find_one({"_id": DOC_ID})
-        if doc and doc.get("value"):
-            updated_at = doc.get("updated_at")
-            if updated_at is not None and updated_at.tzinfo is None:
-                updated_at = updated_at.replace(tzinfo=timezone.utc)
-            return {
-                "logged_in": self.logged_in,
-                "app": doc.get("app"),
-                "updated_at": updated_at,
-            }
-        return {"logged_in": False}
+        accounts = [
+            {"account": account, **status}
+            for account, status in sorted(self._status.items())
+        ]
+        default = self._status.get(DEFAULT_ACCOUNT)
+        if default is None:
+            return {"logged_in": False, "accounts": accounts}
+        return {"logged_in": self.logged_in, **default, "accounts": accounts}
 
     async def get_user_my_info(self) -> dict[str, Any] | None:
         """
-        获取当前 115 用户信息。优先读 Redis 缓存，未命中再请求 115 API。
+        获取当前 115 用户信息（两级缓存，过期后先返回旧值并在后台刷新）
 
         :return: 用户信息字典，未登入或失败时返回 None
         """
-        if self._client is None:
+        if self.client is None:
             return None
         try:
-            redis_client = db.get_redis()
-            cached = await redis_client.get(REDIS_KEY_P115_USER_INFO)
-            if cached is not None:
-                return loads(cached)
-        except Exception as exc:
-            logger.debug(f"【P115Core】读取 user_info 缓存失败: {exc}")
-        try:
-            result = await self._client.user_my_info(async_=True)
-            check_response(result)
-            data = result.get("data")
-            if not isinstance(data, dict):
-                return None
-            try:
-                await db.get_redis().setex(
-                    REDIS_KEY_P115_USER_INFO,
-                    P115_CACHE_TTL_SECONDS,
-                    dumps(data).decode(),
-                )
-            except Exception as exc:
-                logger.debug(f"【P115Core】写入 user_info 缓存失败: {exc}")
-            return data
+            return await self._load_user_my_info()
         except Exception as exc:
             logger.warning(f"【P115Core】user_my_info 失败: {exc}")
             return None
@@ -186,81 +264,229 @@ class P115Manager:
         self, payload: Literal[0, 1] = 0
     ) -> dict[str, Any] | None:
         """
-        获取 115 网盘存储/索引信息。优先读 Redis 缓存，未命中再请求 115 API。
+        获取 115 网盘存储/索引信息（两级缓存，过期后先返回旧值并在后台刷新）
 
         :param payload: 通常传 0
         :return: 存储信息字典，未登入或失败时返回 None
         """
-        if self._client is None:
+        if self.client is None:
             return None
-        cache_key = (
-            REDIS_KEY_P115_STORAGE_INFO
-            if payload == 0
-            else f"p115:storage_info:{payload}"
-        )
         try:
-            redis_client = db.get_redis()
-            cached = await redis_client.get(cache_key)
-            if cached is not None:
-                return loads(cached)
-        except Exception as exc:
-            logger.debug(f"【P115Core】读取 storage_info 缓存失败: {exc}")
-        try:
-            result = await self._client.fs_index_info(payload, async_=True)
-            check_response(result)
-            data = result.get("data")
-            if not isinstance(data, dict):
-                return None
-            try:
-                await db.get_redis().setex(
-                    cache_key,
-                    P115_CACHE_TTL_SECONDS,
-                    dumps(data).decode(),
-                )
-            except Exception as exc:
-                logger.debug(f"【P115Core】写入 storage_info 缓存失败: {exc}")
-            return data
+            return await self._load_fs_index_info(payload)
         except Exception as exc:
             logger.warning(f"【P115Core】fs_index_info 失败: {exc}")
             return None
 
     async def get_dashboard_info(self) -> dict[str, Any]:
         """
-        获取仪表盘所需数据：用户信息 + 存储信息
+        获取仪表盘所需数据：用户信息 + 存储信息（三项并发获取）
 
         :return: { logged_in, user_info?, storage_info? }
         """
-        status = await self.get_status()
+        status, user_info, storage_info = await asyncio.gather(
+            self.get_status(),
+            self.get_user_my_info(),
+            self.get_fs_index_info(payload=0),
+        )
         if not status.get("logged_in"):
             return {"logged_in": False, "user_info": None, "storage_info": None}
-        user_info = await self.get_user_my_info()
-        storage_info = await self.get_fs_index_info(payload=0)
         return {
             "logged_in": True,
             "user_info": user_info,
             "storage_info": storage_info,
         }
 
+    async def probe(self, account: str = DEFAULT_ACCOUNT) -> None:
+        """
+        以 user_my_info 验证账号 cookies 是否有效；
+        默认账号验证通过后顺带预热用户信息与存储信息缓存
+
+        :param account: 账号标识
+        :raises RuntimeError: 账号未登入时
+        :raises P115AuthenticationError: cookies 已失效时
+        """
+        client = self._clients.get(account)
+        if client is None:
+            raise RuntimeError(f"账号 {account} 未登入")
+
+        async def fetch() -> dict[str, Any]:
+            await rate_limiter.acquire("info", account=account)
+            result = await client.user_my_info(async_=True)
+            check_response(result)
+            return result
+
+        result = await p115_guard.call("user_my_info", fetch, idempotent=True)
+        if account != DEFAULT_ACCOUNT:
+            return
+        data = result.get("data")
+        if isinstance(data, dict):
+            await p115_cache.put("user_info", data)
+        try:
+            await P115Manager._load_fs_index_info.refresh(self, 0)
+        except Exception as exc:
+            logger.debug(f"【P115Core】预热 storage_info 缓存失败: {exc}")
+
+    @p115_cache.cached(lambda self: "user_info")
+    async def _load_user_my_info(self) -> dict[str, Any] | None:
+        client = self.client
+        if client is None:
+            return None
+
+        async def fetch() -> dict[str, Any]:
+            await rate_limiter.acquire("info")
+            result = await client.user_my_info(async_=True)
+            check_response(result)
+            return result
+
+        result = await p115_guard.call("user_my_info", fetch, idempotent=True)
+        data = result.get("data")
+        return data if isinstance(data, dict) else None
+
+    @p115_cache.cached(lambda self, payload: f"storage_info:{payload}")
+    async def _load_fs_index_info(self, payload: int) -> dict[str, Any] | None:
+        client = self.client
+        if client is None:
+            return None
+
+        async def fetch() -> dict[str, Any]:
+            await rate_limiter.acquire("info")
+            result = await client.fs_index_info(payload, async_=True)
+            check_response(result)
+            return result
+
+        result = await p115_guard.call("fs_index_info", fetch, idempotent=True)
+        data = result.get("data")
+        return data if isinstance(data, dict) else None
+
+    def _apply_doc(self, account: str, doc: dict[str, Any] | None) -> None:
+        """
+        按 system_settings 中的 cookies 文档更新账号客户端与状态，cookies 未变时复用客户端
+
+        :param account: 账号标识
+        :param doc: cookies 文档，None 表示已登出
+        """
+        if not doc or not doc.get("value"):
+            self._clients.pop(account, None)
+            self._cookies.pop(account, None)
+            self._status.pop(account, None)
+            return
+        if doc["value"] != self._cookies.get(account) or account not in self._clients:
+            self._clients[account] = PooledP115Client(doc["value"])
+            self._cookies[account] = doc["value"]
+        updated_at = doc.get("updated_at")
+        if updated_at is not None and updated_at.tzinfo is None:
+            updated_at = updated_at.replace(tzinfo=timezone.utc)
+        self._status[account] = {"app": doc.get("app"), "updated_at": updated_at}
+
     @staticmethod
-    async def _save_cookies(cookies_str: str, app: str) -> None:
+    def _account_of(doc_id: str) -> str:
+        """
+        由文档 ID 得到账号标识
+
+        :param doc_id: system_settings 文档 ID
         """
-        将 cookies 与 app 写入数据库
+        _, _, account = doc_id.partition(":")
+        return account or DEFAULT_ACCOUNT
 
+    @staticmethod
+    def _user_id(cookies_str: str) -> str | None:
+        """
+        从 cookies 的 UID 字段（形如 {user_id}_{设备}_{时间}）取出 115 用户 ID
+
+        :param cookies_str: cookies 字符串
+        """
+        for item in cookies_str.split(";"):
+            key, _, value = item.strip().partition("=")
+            if key == "UID":
+                return value.split("_", 1)[0]
+        return None
+
+    async def _broadcast(self) -> None:
+        """
+        递增登入状态版本号并广播给所有 worker
+        """
+        try:
+            redis_client = db.get_redis()
+            version = await redis_client.incr(REDIS_KEY_P115_LOGIN_VERSION)
+            self._version = max(self._version, version)
+            await redis_client.publish(REDIS_CHANNEL_P115_LOGIN, version)
+        except Exception as exc:
+            logger.warning(f"【P115Core】广播登入状态失败: {exc}")
+
+    @staticmethod
+    async def _remote_version() -> int:
+        """
+        读取 Redis 中的登入状态版本号
+
+        :return: 版本号，读取失败时为 0
+        """
+        try:
+            version = await db.get_redis().get(REDIS_KEY_P115_LOGIN_VERSION)
+        except Exception as exc:
+            logger.debug(f"【P115Core】读取登入状态版本失败: {exc}")
+            return 0
+        return int(version or 0)
+
+    async def _sync_version(self, version: int) -> None:
+        """
+        版本号比本地新时从数据库重新加载
+
+        :param version: 广播或 Redis 中的版本号
+        """
+        if version <= self._version:
+            return
+        await self.load_from_db()
+        self._version = max(self._version, version)
+        p115_cache.invalidate_local()
+        logger.info(f"【P115Core】登入状态已同步（版本 {version}）")
+
+    async def _listen(self) -> None:
+        """
+        订阅登入状态频道，断线后自动重连
+        """
+        while True:
+            pubsub = None
+            try:
+                pubsub = db.get_redis().pubsub()
+                await pubsub.subscribe(REDIS_CHANNEL_P115_LOGIN)
+                # 订阅建立前（或断线期间）可能错过了广播，按版本号补齐
+                await self._sync_version(await self._remote_version())
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        await self._sync_version(int(message["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning(f"【P115Core】登入状态订阅中断，稍后重连: {exc}")
+            finally:
+                if pubsub is not None:
+                    try:
+                        await pubsub.aclose()
+                    except Exception:
+                        pass
+            await asyncio.sleep(LOGIN_LISTENER_RETRY_SECONDS)
+
+    async def _save_cookies(
+        self, account: str, cookies_str: str, app: str
+    ) -> dict[str, Any]:
+        """
+        将账号的 cookies 与 app 写入数据库
+
+        :param account: 账号标识
         :param cookies_str: 拼接后的 cookies 字符串
         :param app: 客户端类型
+        :return: 写入的文档字段
         """
+        doc = {
+            "value": cookies_str,
+            "app": app,
+            "updated_at": TimezoneUtils.now_utc(),
+        }
         coll = db.get_mongo_client()[cfg.mongodb.db_name][COLLECTION_NAME]
         await coll.update_one(
-            {"_id": DOC_ID},
-            {
-                "$set": {
-                    "value": cookies_str,
-                    "app": app,
-                    "updated_at": TimezoneUtils.now_utc(),
-                }
-            },
-            upsert=True,
+            {"_id": self.doc_id(account)}, {"$set": doc}, upsert=True
         )
+        return doc
 
 
 p115_manager = P115Manager()
@@ -0,0 +1,154 @@
+import asyncio
+from typing import Any, Literal
+
+from orjson import dumps, loads
+from p115client.exception import P115AuthenticationError
+
+from app.core.config import cfg
+from app.core.logger import logger
+from app.core.metrics import metrics
+from app.core.p115 import p115_manager
+from app.core.p115pool import p115_pool
+from app.db.database import db
+from app.utils.timezone import TimezoneUtils
+
+
+REDIS_KEY_HEALTH_PREFIX = "p115:health"
+REDIS_KEY_HEALTH_LOCK = "p115:health:lock"
+HEALTH_HISTORY_SIZE = 20
+
+HealthState = Literal["unknown", "healthy", "degraded", "invalid"]
+
+_STATE_GAUGE: dict[HealthState, int] = {
+    "unknown": -1,
+    "healthy": 0,
+    "degraded": 1,
+    "invalid": 2,
+}
+
+
+class CookieHealthMonitor:
+    """
+    115 cookies 健康检查：定时以轻量接口探测每个账号，记录状态与失败历史（Redis，全集群共享）
+
+    - healthy：探测成功，恢复调度并预热账号信息缓存
+    - degraded：网络错误、超时、熔断等暂时性失败，继续调度
+    - invalid：登入已失效，立即停止调度该账号，直至重新登入或再次探测成功
+    """
+
+    __slots__ = ()
+
+    async def check_all(self, force: bool = False) -> list[dict[str, Any]]:
+        """
+        探测全部账号。定时任务在每个 worker 中触发，同一周期内只有一个 worker 执行
+
+        :param force: 是否忽略周期锁立即探测
+        :return: 各账号健康状态
+        """
+        if not force:
+            try:
+                acquired = await db.get_redis().set(
+                    REDIS_KEY_HEALTH_LOCK,
+                    "1",
+                    nx=True,
+                    ex=max(1, int(cfg.p115.health_check_minutes * 60) - 5),
+                )
+            except Exception as exc:
+                logger.debug(f"【P115Health】获取健康检查锁失败: {exc}")
+                acquired = True
+            if not acquired:
+                return await self.status()
+        accounts = sorted(p115_manager.clients)
+        await asyncio.gather(*(self.probe(account) for account in accounts))
+        return await self.status()
+
+    async def probe(self, account: str) -> HealthState:
+        """
+        探测单个账号并记录结果
+
+        :param account: 账号标识
+        :return: 探测后的健康状态
+        """
+        state: HealthState
+        error = ""
+        try:
+            await p115_manager.probe(account)
+            state = "healthy"
+        except P115AuthenticationError as exc:
+            state, error = "invalid", str(exc) or type(exc).__name__
+        except Exception as exc:
+            state, error = "degraded", str(exc) or type(exc).__name__
+        if state == "healthy":
+            await p115_pool.mark_valid(account)
+        elif state == "invalid":
+            await p115_pool.mark_invalid(account)
+        else:
+            logger.warning(f"【P115Health】账号 {account} 探测失败: {error}")
+        metrics.incr(f"p115.health.{account}.{state}")
+        metrics.set_gauge(f"p115.health.{account}.state", _STATE_GAUGE[state])
+        await self._record(account, state, error)
+        return state
+
+    async def status(self) -> list[dict[str, Any]]:
+        """
+        返回各账号健康状态与最近失败历史
+
+        :return: [{account, state, checked_at, last_ok_at, consecutive_failures,
+            last_error, history}]
+        """
+        accounts = sorted(p115_manager.clients)
+        try:
+            pipe = db.get_redis().pipeline(transaction=False)
+            for account in accounts:
+                pipe.hgetall(f"{REDIS_KEY_HEALTH_PREFIX}:{account}")
+                pipe.lrange(f"{REDIS_KEY_HEALTH_PREFIX}:{account}:history", 0, -1)
+            results = await pipe.execute()
+        except Exception as exc:
+            logger.debug(f"【P115Health】读取健康状态失败: {exc}")
+            results = [{}, []] * len(accounts)
+        items = []
+        for i, account in enumerate(accounts):
+            info, history = results[2 * i], results[2 * i + 1]
+            items.append(
+                {
+                    "account": account,
+                    "state": info.get("state", "unknown"),
+                    "checked_at": info.get("checked_at") or None,
+                    "last_ok_at": info.get("last_ok_at") or None,
+                    "consecutive_failures": int(info.get("failures", 0)),
+                    "last_error": info.get("last_error") or None,
+                    "history": [loads(item) for item in history],
+                }
+            )
+        return items
+
+    @staticmethod
+    async def _record(account: str, state: HealthState, error: str) -> None:
+        """
+        写入探测结果
+
+        :param account: 账号标识
+        :param state: 健康状态
+        :param error: 失败原因，成功时为空
+        """
+        key = f"{REDIS_KEY_HEALTH_PREFIX}:{account}"
+        now = TimezoneUtils.now_utc().isoformat()
+        try:
+            pipe = db.get_redis().pipeline(transaction=False)
+            pipe.hset(key, mapping={"state": state, "checked_at": now})
+            if state == "healthy":
+                pipe.hset(key, mapping={"last_ok_at": now, "failures": 0})
+            else:
+                pipe.hincrby(key, "failures", 1)
+                pipe.hset(key, "last_error", error)
+                pipe.lpush(
+                    f"{key}:history",
+                    dumps({"at": now, "state": state, "error": error}).decode(),
+                )
+                pipe.ltrim(f"{key}:history", 0, HEALTH_HISTORY_SIZE - 1)
+            await pipe.execute()
+        except Exception as exc:
+            logger.debug(f"【P115Health】写入健康状态失败: {exc}")
+
+
+cookie_health = CookieHealthMonitor()
@@ -0,0 +1,238 @@
+from typing import Any, Awaitable, Callable, TypeVar
+
+from p115client.exception import P115AuthenticationError
+
+from app.core.concurrency import is_throttle_error
+from app.core.config import cfg
+from app.core.logger import logger
+from app.core.metrics import metrics
+from app.core.p115 import (
+    REDIS_KEY_P115_INVALID_PREFIX,
+    PooledP115Client,
+    p115_manager,
+)
+from app.core.ratelimit import RateLimitBucket, rate_limiter
+from app.core.resilience import p115_guard
+from app.db.database import db
+
+
+T = TypeVar("T")
+
+REDIS_KEY_POOL_QUARANTINE_PREFIX = "p115:pool:quarantine"
+
+BUDGET_QUARANTINED = -1
+BUDGET_INVALID = -2
+
+# 按 Redis 服务器时间估算每个账号令牌桶的剩余令牌（只读，不预约）；
+# KEYS 为 (令牌桶键, 隔离键, 失效键) 三个一组，cookies 失效的账号返回 -2，
+# 隔离中的账号返回 -1；Lua 数字转为 Redis 整数会截断小数，因此以千分之一令牌为单位返回
+_BUDGET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local result = {}
+for i = 1, #KEYS, 3 do
+    if redis.call('EXISTS', KEYS[i + 2]) == 1 then
+        result[#result + 1] = -2
+    elseif redis.call('EXISTS', KEYS[i + 1]) == 1 then
+        result[#result + 1] = -1
+    else
+        local state = redis.call('HMGET', KEYS[i], 'tokens', 'ts')
+        local tokens = tonumber(state[1]) or burst
+        local ts = tonumber(state[2]) or now
+        tokens = math.min(burst, tokens + (now - ts) * rate / 1000)
+        result[#result + 1] = math.floor(tokens * 1000)
+    end
+end
+return result
+"""
+
+
+class P115NotLoggedInError(RuntimeError):
+    """
+    115 未登入（没有可用账号）
+    """
+
+
+class P115CookieInvalidError(P115NotLoggedInError):
+    """
+    全部账号的 cookies 均已失效，需要重新扫码登入
+    """
+
+
+class P115ClientPool:
+    """
+    多账号调度：读请求分摊到剩余令牌最多的健康账号，
+    被限流的账号隔离一段时间（全集群生效），期间不再被调度；
+    cookies 失效的账号在重新验证通过前完全不被调度
+    """
+
+    __slots__ = ()
+
+    async def pick(
+        self, bucket: RateLimitBucket, exclude: set[str] | None = None
+    ) -> tuple[str, PooledP115Client]:
+        """
+        选择一个账号
+
+        :param bucket: 接口类别
+        :param exclude: 本次调用已尝试过的账号
+        :return: (账号标识, 客户端)
+        :raises P115NotLoggedInError: 没有可用账号时
+        """
+        clients = {
+            account: client
+            for account, client in p115_manager.clients.items()
+            if not exclude or account not in exclude
+        }
+        if not clients:
+            raise P115NotLoggedInError("115 未登入")
+        accounts = sorted(clients)
+        keys: list[str] = []
+        for account in accounts:
+            keys.append(rate_limiter.key(bucket, account))
+            keys.append(f"{REDIS_KEY_POOL_QUARANTINE_PREFIX}:{account}")
+            keys.append(f"{REDIS_KEY_P115_INVALID_PREFIX}:{account}")
+        rate, burst = rate_limiter.bucket_config(bucket)
+        try:
+            budgets = [
+                int(b)
+                for b in await db.get_redis().eval(
+                    _BUDGET_SCRIPT, len(keys), *keys, rate, burst
+                )
+            ]
+        except Exception as exc:
+            logger.debug(f"【P115Pool】读取账号配额失败: {exc}")
+            budgets = [0] * len(accounts)
+        candidates = [i for i, b in enumerate(budgets) if b != BUDGET_INVALID]
+        if not candidates:
+            metrics.incr("p115.pool.all_invalid")
+            raise P115CookieInvalidError("115 cookies 已失效，请重新扫码登入")
+        best = max(candidates, key=lambda i: budgets[i])
+        if budgets[best] == BUDGET_QUARANTINED:
+            # 全部账号都在隔离中，仍选一个以免调用方彻底失败
+            metrics.incr("p115.pool.all_quarantined")
+        account = accounts[best]
+        return account, clients[account]
+
+    async def call(
+        self,
+        bucket: RateLimitBucket,
+        endpoint: str,
+        func: Callable[[PooledP115Client], Awaitable[T]],
+        *,
+        wait: bool = True,
+        idempotent: bool = False,
+    ) -> T:
+        """
+        选择账号、获取该账号令牌，并在熔断/对冲保护下执行调用；
+        遇到限流响应时隔离该账号、遇到登入失效时停用该账号，并换下一个账号重试
+
+        :param bucket: 接口类别
+        :param endpoint: 接口名（熔断与指标）
+        :param func: 接收客户端的 async 函数
+        :param wait: 令牌不足时是否等待
+        :param idempotent: 是否为幂等读请求
+        :return: 调用结果
+        :raises P115NotLoggedInError: 没有可用账号时
+        :raises P115CookieInvalidError: 全部账号 cookies 均已失效时
+        :raises RateLimitExceeded: 不等待且令牌不足时
+        """
+        tried: set[str] = set()
+        while True:
+            account, client = await self.pick(bucket, tried)
+            metrics.incr(f"p115.pool.{account}.calls")
+
+            # 对冲请求同样是一次 115 调用，每次执行都要消耗该账号的令牌
+            async def fetch() -> T:
+                await rate_limiter.acquire(bucket, wait=wait, account=account)
+                return await func(client)
+
+            try:
+                return await p115_guard.call(endpoint, fetch, idempotent=idempotent)
+            except P115AuthenticationError:
+                await self.mark_invalid(account)
+                tried.add(account)
+                if len(tried) >= len(p115_manager.clients):
+                    raise
+            except Exception as exc:
+                if not is_throttle_error(exc):
+                    raise
+                await self.quarantine(account)
+                tried.add(account)
+                if len(tried) >= len(p115_manager.clients):
+                    raise
+
+    @staticmethod
+    async def quarantine(account: str) -> None:
+        """
+        隔离被限流的账号
+
+        :param account: 账号标识
+        """
+        metrics.incr(f"p115.pool.{account}.quarantined")
+        logger.warning(
+            f"【P115Pool】账号 {account} 被限流，"
+            f"暂停调度 {cfg.p115.pool_quarantine_seconds:.0f}s"
+        )
+        try:
+            await db.get_redis().set(
+                f"{REDIS_KEY_POOL_QUARANTINE_PREFIX}:{account}",
+                "1",
+                px=int(cfg.p115.pool_quarantine_seconds * 1000),
+            )
+        except Exception as exc:
+            logger.debug(f"【P115Pool】写入账号隔离状态失败: {exc}")
+
+    @staticmethod
+    async def mark_invalid(account: str) -> None:
+        """
+        标记账号 cookies 已失效，立即停止调度该账号（全集群生效）
+
+        :param account: 账号标识
+        """
+        try:
+            if await db.get_redis().set(
+                f"{REDIS_KEY_P115_INVALID_PREFIX}:{account}", "1", nx=True
+            ):
+                metrics.incr(f"p115.pool.{account}.invalidated")
+                logger.error(f"【P115Pool】账号 {account} cookies 已失效，停止调度")
+        except Exception as exc:
+            logger.debug(f"【P115Pool】写入账号失效状态失败: {exc}")
+
+    @staticmethod
+    async def mark_valid(account: str) -> None:
+        """
+        账号 cookies 重新验证通过（或重新登入）后恢复调度
+
+        :param account: 账号标识
+        """
+        try:
+            await db.get_redis().delete(f"{REDIS_KEY_P115_INVALID_PREFIX}:{account}")
+        except Exception as exc:
+            logger.debug(f"【P115Pool】清除账号失效状态失败: {exc}")
+
+    @staticmethod
+    async def stats() -> list[dict[str, Any]]:
+        """
+        返回各账号的调度状态
+
+        :return: [{account, quarantined_seconds}]
+        """
+        accounts = sorted(p115_manager.clients)
+        try:
+            pipe = db.get_redis().pipeline(transaction=False)
+            for account in accounts:
+                pipe.pttl(f"{REDIS_KEY_POOL_QUARANTINE_PREFIX}:{account}")
+            ttls = await pipe.execute()
+        except Exception as exc:
+            logger.debug(f"【P115Pool】读取账号隔离状态失败: {exc}")
+            ttls = [-2] * len(accounts)
+        return [
+            {"account": account, "quarantined_seconds": max(0, ttl) / 1000}
+            for account, ttl in zip(accounts, ttls)
+        ]
+
+
+p115_pool = P115ClientPool()
@@ -0,0 +1,251 @@
+import asyncio
+import secrets
+from time import monotonic
+from typing import Any, AsyncIterator
+
+from orjson import dumps, loads
+
+from app.core.lock import release_lock, renew_lock
+from app.core.logger import logger
+from app.core.p115 import P115Manager, p115_manager
+from app.core.ratelimit import DEFAULT_ACCOUNT
+from app.db.database import db
+
+
+REDIS_KEY_QRCODE_STATE_PREFIX = "p115:qrcode:state"
+REDIS_KEY_QRCODE_POLLER_PREFIX = "p115:qrcode:poller"
+REDIS_CHANNEL_QRCODE_PREFIX = "p115:qrcode"
+
+# 115 扫码状态：0 待扫码、1 已扫码待确认、2 已确认、-1 已过期、-2 已取消
+QRCODE_STATUS_CONFIRMED = 2
+QRCODE_TERMINAL_STATUSES = (QRCODE_STATUS_CONFIRMED, -1, -2)
+
+QRCODE_WATCH_MAX_SECONDS = 300
+QRCODE_POLLER_LOCK_TTL_SECONDS = 60
+QRCODE_POLL_MIN_INTERVAL_SECONDS = 1.0
+QRCODE_KEEPALIVE_SECONDS = 15.0
+# 无订阅者持续超过该时长后停止轮询（留出客户端重连的间隙）
+QRCODE_IDLE_GRACE_SECONDS = 5.0
+
+
+class QrcodeLoginWatcher:
+    """
+    扫码登入状态推送：每个 uid 全集群只有一个后台轮询者（Redis 锁），
+    状态变化经 Redis pub/sub 推送给所有订阅者（多标签页、多 worker 共享），
+    扫码确认后自动完成登入并保存 cookies
+    """
+
+    __slots__ = ("_pollers",)
+
+    def __init__(self) -> None:
+        self._pollers: dict[str, asyncio.Task] = {}
+
+    async def watch(
+        self,
+        payload: dict[str, Any],
+        app: str = "qandroid",
+        account: str = DEFAULT_ACCOUNT,
+    ) -> AsyncIterator[dict[str, Any] | None]:
+        """
+        订阅扫码状态，直到进入终态或超时
+
+        :param payload: 需包含 uid、time、sign
+        :param app: 客户端类型，确认登入时使用
+        :param account: 登入到的账号标识
+        :return: 状态字典（status、msg、logged_in）异步迭代器，None 表示心跳
+        """
+        uid = payload["uid"]
+        pubsub = db.get_redis().pubsub()
+        try:
+            await pubsub.subscribe(f"{REDIS_CHANNEL_QRCODE_PREFIX}:{uid}")
+            await self.ensure_poller(payload, app, account)
+            last = None
+            # 订阅前已产生的状态（其他标签页先发起了轮询）
+            cached = await db.get_redis().get(
+                f"{REDIS_KEY_QRCODE_STATE_PREFIX}:{uid}"
+            )
+            if cached is not None:
+                state = loads(cached)
+                last = state["status"]
+                yield state
+                if last in QRCODE_TERMINAL_STATUSES:
+                    return
+            deadline = monotonic() + QRCODE_WATCH_MAX_SECONDS
+            while monotonic() < deadline:
+                message = await pubsub.get_message(
+                    ignore_subscribe_messages=True, timeout=QRCODE_KEEPALIVE_SECONDS
+                )
+                if message is None:
+                    # 轮询者所在 worker 退出后锁过期，由当前订阅者接管
+                    await self.ensure_poller(payload, app, account)
+                    yield None
+                    continue
+                if message.get("type") != "message":
+                    continue
+                state = loads(message["data"])
+                if state["status"] == last:
+                    continue
+                last = state["status"]
+                yield state
+                if last in QRCODE_TERMINAL_STATUSES:
+                    return
+        finally:
+            try:
+                await pubsub.aclose()
+            except Exception:
+                pass
+
+    async def ensure_poller(
+        self, payload: dict[str, Any], app: str, account: str
+    ) -> None:
+        """
+        若该 uid 尚无轮询者，则在当前进程启动一个
+
+        :param payload: 需包含 uid、time、sign
+        :param app: 客户端类型
+        :param account: 登入到的账号标识
+        """
+        uid = payload["uid"]
+        if uid in self._pollers:
+            return
+        token = secrets.token_hex(8)
+        try:
+            acquired = await db.get_redis().set(
+                f"{REDIS_KEY_QRCODE_POLLER_PREFIX}:{uid}",
+                token,
+                nx=True,
+                ex=QRCODE_POLLER_LOCK_TTL_SECONDS,
+            )
+        except Exception as exc:
+            logger.debug(f"【P115Core】获取扫码轮询锁失败，本地轮询: {exc}")
+            acquired = True
+        if not acquired:
+            return
+        task = asyncio.create_task(self._poll(dict(payload), app, account, token))
+        self._pollers[uid] = task
+        task.add_done_callback(lambda _: self._pollers.pop(uid, None))
+
+    async def stop(self) -> None:
+        """
+        取消本进程的所有轮询任务并等待其释放轮询锁
+        """
+        tasks = list(self._pollers.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _poll(
+        self, payload: dict[str, Any], app: str, account: str, token: str
+    ) -> None:
+        """
+        轮询 115 扫码状态（115 接口本身为长轮询），状态变化时发布
+
+        :param payload: 需包含 uid、time、sign
+        :param app: 客户端类型
+        :param account: 登入到的账号标识
+        :param token: 轮询锁令牌，续期与释放时校验
+        """
+        uid = payload["uid"]
+        lock_key = f"{REDIS_KEY_QRCODE_POLLER_PREFIX}:{uid}"
+        last = None
+        deadline = monotonic() + QRCODE_WATCH_MAX_SECONDS
+        idle_since: float | None = None
+        try:
+            while monotonic() < deadline:
+                start = monotonic()
+                if await self._has_subscribers(uid):
+                    idle_since = None
+                elif idle_since is None:
+                    idle_since = start
+                elif start - idle_since >= QRCODE_IDLE_GRACE_SECONDS:
+                    logger.debug(f"【P115Core】扫码状态无订阅者，停止轮询: {uid}")
+                    return
+                try:
+                    result = await P115Manager.poll_qrcode_status(payload)
+                except Exception as exc:
+                    logger.debug(f"【P115Core】轮询扫码状态失败: {exc}")
+                    result = None
+                try:
+                    held = await renew_lock(
+                        lock_key, token, QRCODE_POLLER_LOCK_TTL_SECONDS
+                    )
+                except Exception as exc:
+                    logger.debug(f"【P115Core】续期扫码轮询锁失败: {exc}")
+                    held = True
+                if not held:
+                    logger.debug(f"【P115Core】扫码轮询锁已被其他进程持有: {uid}")
+                    return
+                if result is not None and result["status"] != last:
+                    last = result["status"]
+                    state = {**result, "logged_in": False}
+                    if last == QRCODE_STATUS_CONFIRMED:
+                        state = await self._confirm(uid, app, account, state)
+                    await self._publish(uid, state)
+                    if last in QRCODE_TERMINAL_STATUSES:
+                        return
+                elapsed = monotonic() - start
+                if elapsed < QRCODE_POLL_MIN_INTERVAL_SECONDS:
+                    await asyncio.sleep(QRCODE_POLL_MIN_INTERVAL_SECONDS - elapsed)
+        finally:
+            try:
+                await release_lock(lock_key, token)
+            except Exception as exc:
+                logger.debug(f"【P115Core】释放扫码轮询锁失败: {exc}")
+
+    @staticmethod
+    async def _has_subscribers(uid: str) -> bool:
+        """
+        该 uid 的状态频道是否仍有订阅者（全集群）
+
+        :param uid: 二维码 uid
+        :return: 是否有订阅者，Redis 不可用时视为有
+        """
+        channel = f"{REDIS_CHANNEL_QRCODE_PREFIX}:{uid}"
+        try:
+            counts = await db.get_redis().pubsub_numsub(channel)
+        except Exception as exc:
+            logger.debug(f"【P115Core】查询扫码状态订阅数失败: {exc}")
+            return True
+        return any(count > 0 for _, count in counts)
+
+    @staticmethod
+    async def _confirm(
+        uid: str, app: str, account: str, state: dict[str, Any]
+    ) -> dict[str, Any]:
+        """
+        扫码确认后完成登入
+
+        :param uid: 二维码 uid
+        :param app: 客户端类型
+        :param account: 登入到的账号标识
+        :param state: 当前状态
+        :return: 附带登入结果的状态
+        """
+        try:
+            await p115_manager.confirm_qrcode(uid, app=app, account=account)
+            return {**state, "logged_in": True}
+        except Exception as exc:
+            logger.error(f"【P115Core】扫码确认后登入失败: {exc}")
+            return {**state, "msg": f"确认登入失败: {exc}"}
+
+    @staticmethod
+    async def _publish(uid: str, state: dict[str, Any]) -> None:
+        """
+        保存最新状态并推送给订阅者
+
+        :param uid: 二维码 uid
+        :param state: 状态
+        """
+        data = dumps(state).decode()
+        try:
+            pipe = db.get_redis().pipeline(transaction=False)
+            pipe.setex(
+                f"{REDIS_KEY_QRCODE_STATE_PREFIX}:{uid}", QRCODE_WATCH_MAX_SECONDS, data
+            )
+            pipe.publish(f"{REDIS_CHANNEL_QRCODE_PREFIX}:{uid}", data)
+            await pipe.execute()
+        except Exception as exc:
+            logger.warning(f"【P115Core】推送扫码状态失败: {exc}")
+
+
+qrcode_watcher = QrcodeLoginWatcher()
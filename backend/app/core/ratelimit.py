@@ -0,0 +1,133 @@
+import asyncio
+from typing import Literal
+
+from app.core.config import cfg
+from app.core.logger import logger
+from app.core.metrics import metrics
+from app.db.database import db
+
+
+REDIS_KEY_RATELIMIT_PREFIX = "ratelimit:p115"
+
+RateLimitBucket = Literal["info", "list", "download"]
+DEFAULT_ACCOUNT = "default"
+
+# 令牌桶：按 Redis 服务器时间补充令牌并预约一个令牌，返回需要等待的毫秒数；
+# 等待时间超过 max_wait 时不预约，返回负的等待毫秒数
+_ACQUIRE_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local max_wait = tonumber(ARGV[3])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + (now - ts) * rate / 1000)
+local wait = 0
+if tokens < 1 then
+    wait = math.ceil((1 - tokens) * 1000 / rate)
+end
+if wait > max_wait then
+    return -wait
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens - 1), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst * 1000 / rate) + wait + 1000)
+return wait
+"""
+
+
+class RateLimitExceeded(RuntimeError):
+    """
+    令牌不足且不愿等待（或等待超过上限）
+    """
+
+    def __init__(self, bucket: str, retry_after: float) -> None:
+        super().__init__(f"115 {bucket} 接口限流，{retry_after:.1f}s 后重试")
+        self.bucket = bucket
+        self.retry_after = retry_after
+
+
+class RateLimiter:
+    """
+    115 出站请求限流：按接口类别与账号使用 Redis 令牌桶，所有 worker 共享配额
+
+    调用方可选择等待令牌（同步流程据此形成背压）或立即失败。
+    """
+
+    __slots__ = ()
+
+    @staticmethod
+    def key(bucket: RateLimitBucket, account: str = DEFAULT_ACCOUNT) -> str:
+        """
+        令牌桶的 Redis 键（默认账号沿用无账号后缀的键）
+
+        :param bucket: 接口类别
+        :param account: 115 账号标识
+        """
+        if account == DEFAULT_ACCOUNT:
+            return f"{REDIS_KEY_RATELIMIT_PREFIX}:{bucket}"
+        return f"{REDIS_KEY_RATELIMIT_PREFIX}:{bucket}:{account}"
+
+    @staticmethod
+    def bucket_config(bucket: RateLimitBucket) -> tuple[float, int]:
+        """
+        读取令牌桶参数
+
+        :param bucket: 接口类别
+        :return: (每秒令牌数, 桶容量)
+        """
+        return (
+            getattr(cfg.ratelimit, f"{bucket}_rate"),
+            getattr(cfg.ratelimit, f"{bucket}_burst"),
+        )
+
+    async def acquire(
+        self,
+        bucket: RateLimitBucket,
+        *,
+        wait: bool = True,
+        timeout: float | None = None,
+        account: str = DEFAULT_ACCOUNT,
+    ) -> float:
+        """
+        获取一个令牌
+
+        :param bucket: 接口类别（info / list / download）
+        :param wait: 令牌不足时是否等待；False 时立即抛出 RateLimitExceeded
+        :param timeout: 最长等待秒数，默认取配置 max_wait
+        :param account: 115 账号标识，每个账号独立计算配额
+        :return: 实际等待秒数
+        :raises RateLimitExceeded: 不等待或等待时间超过上限时
+        """
+        if not cfg.ratelimit.enabled:
+            return 0.0
+        rate, burst = self.bucket_config(bucket)
+        max_wait = 0.0
+        if wait:
+            max_wait = cfg.ratelimit.max_wait if timeout is None else timeout
+        try:
+            wait_ms = await db.get_redis().eval(
+                _ACQUIRE_SCRIPT,
+                1,
+                self.key(bucket, account),
+                rate,
+                burst,
+                int(max_wait * 1000),
+            )
+        except Exception as exc:
+            logger.debug(f"【RateLimit】令牌桶不可用，放行: {exc}")
+            metrics.incr("ratelimit.redis_error")
+            return 0.0
+        if wait_ms < 0:
+            metrics.incr(f"ratelimit.{bucket}.rejected")
+            raise RateLimitExceeded(bucket, -wait_ms / 1000)
+        metrics.incr(f"ratelimit.{bucket}.acquired")
+        waited = wait_ms / 1000
+        metrics.observe(f"ratelimit.{bucket}.wait_seconds", waited)
+        if waited > 0:
+            await asyncio.sleep(waited)
+        return waited
+
+
+rate_limiter = RateLimiter()
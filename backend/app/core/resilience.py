@@ -0,0 +1,244 @@
+import asyncio
+from time import monotonic
+from typing import Any, Awaitable, Callable, Literal, TypeVar
+
+from httpx import TransportError
+
+from app.core.concurrency import is_throttle_error
+from app.core.config import cfg
+from app.core.metrics import metrics
+
+
+T = TypeVar("T")
+
+CircuitState = Literal["closed", "open", "half_open"]
+
+_STATE_GAUGE: dict[CircuitState, int] = {"closed": 0, "half_open": 1, "open": 2}
+
+
+def is_upstream_failure(exc: BaseException) -> bool:
+    """
+    判断异常是否说明上游不可用：超时、网络/传输错误、5xx 与限流响应
+
+    登入失效、参数错误、文件不存在等说明 115 已正常响应，属于调用方错误。
+
+    :param exc: 调用 115 时抛出的异常
+    :return: 是否应计入熔断失败
+    """
+    if isinstance(
+        exc, (TimeoutError, asyncio.TimeoutError, TransportError, ConnectionError)
+    ):
+        return True
+    if is_throttle_error(exc):
+        return True
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        status = getattr(getattr(exc, "response", None), "status_code", None)
+    return isinstance(status, int) and status >= 500
+
+
+class CircuitOpenError(RuntimeError):
+    """
+    熔断器打开，调用被直接拒绝
+    """
+
+    def __init__(self, endpoint: str) -> None:
+        super().__init__(f"{endpoint} 已熔断，暂停调用")
+        self.endpoint = endpoint
+
+
+class CircuitBreaker:
+    """
+    熔断器：连续失败达到阈值后打开，reset_timeout 后放行一个试探请求（半开），
+    试探成功则关闭，失败则重新打开
+    """
+
+    __slots__ = (
+        "name",
+        "failure_threshold",
+        "reset_timeout",
+        "_state",
+        "_failures",
+        "_opened_at",
+        "_probing",
+    )
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float) -> None:
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._state: CircuitState = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+
+    @property
+    def state(self) -> CircuitState:
+        return self._state
+
+    def allow(self) -> bool:
+        """
+        是否允许本次调用
+
+        :return: False 表示熔断中
+        """
+        if self._state == "closed":
+            return True
+        if self._state == "open":
+            if monotonic() - self._opened_at < self.reset_timeout:
+                return False
+            self._set_state("half_open")
+        if self._probing:
+            return False
+        self._probing = True
+        return True
+
+    def record_success(self) -> None:
+        self._failures = 0
+        self._probing = False
+        if self._state != "closed":
+            self._set_state("closed")
+
+    def record_failure(self) -> None:
+        self._probing = False
+        self._failures += 1
+        if self._state == "half_open" or self._failures >= self.failure_threshold:
+            self._opened_at = monotonic()
+            self._set_state("open")
+
+    def release(self) -> None:
+        """
+        调用被取消时释放试探名额（不计成功或失败）
+        """
+        self._probing = False
+
+    def _set_state(self, state: CircuitState) -> None:
+        self._state = state
+        metrics.set_gauge(f"{self.name}.circuit_state", _STATE_GAUGE[state])
+
+
+class ResilienceGuard:
+    """
+    外部接口调用保护：按接口熔断、超时、幂等读请求对冲，并记录延迟与错误计数
+
+    只有上游不可用类错误（超时、网络、5xx、限流）计入熔断，调用方错误不计入。
+
+    对冲：首个请求在该接口近期 P95 延迟内未返回时，再发一个相同请求，取先成功者。
+    """
+
+    __slots__ = ("prefix", "_breakers")
+
+    def __init__(self, prefix: str) -> None:
+        self.prefix = prefix
+        self._breakers: dict[str, CircuitBreaker] = {}
+
+    def breaker(self, endpoint: str) -> CircuitBreaker:
+        """
+        获取接口对应的熔断器
+
+        :param endpoint: 接口名
+        """
+        breaker = self._breakers.get(endpoint)
+        if breaker is None:
+            breaker = self._breakers[endpoint] = CircuitBreaker(
+                f"{self.prefix}.{endpoint}",
+                cfg.p115.breaker_failure_threshold,
+                cfg.p115.breaker_reset_timeout,
+            )
+        return breaker
+
+    def hedge_delay(self, endpoint: str) -> float:
+        """
+        对冲等待时间：近期成功调用的 P95 延迟（不低于下限）
+
+        :param endpoint: 接口名
+        """
+        p95 = metrics.percentile(f"{self.prefix}.{endpoint}.latency_seconds", 0.95)
+        if p95 is None:
+            return cfg.p115.hedge_default_delay
+        return max(cfg.p115.hedge_min_delay, p95)
+
+    async def call(
+        self,
+        endpoint: str,
+        func: Callable[[], Awaitable[T]],
+        *,
+        idempotent: bool = False,
+    ) -> T:
+        """
+        在熔断、超时与对冲保护下执行调用
+
+        :param endpoint: 接口名（用于熔断器与指标）
+        :param func: 无参 async 函数，对冲时可能被调用两次
+        :param idempotent: 是否为幂等读请求（仅幂等请求会对冲）
+        :return: 调用结果
+        :raises CircuitOpenError: 熔断中
+        """
+        name = f"{self.prefix}.{endpoint}"
+        breaker = self.breaker(endpoint)
+        if not breaker.allow():
+            metrics.incr(f"{name}.short_circuited")
+            raise CircuitOpenError(endpoint)
+        metrics.incr(f"{name}.calls")
+        start = monotonic()
+        try:
+            hedge = idempotent and cfg.p115.hedge_enabled
+            result = await asyncio.wait_for(
+                self._hedged(name, endpoint, func) if hedge else func(),
+                timeout=cfg.p115.call_timeout,
+            )
+        except asyncio.CancelledError:
+            breaker.release()
+            raise
+        except Exception as exc:
+            metrics.incr(f"{name}.errors")
+            if is_upstream_failure(exc):
+                breaker.record_failure()
+            else:
+                # 上游已正常响应（如提取码不存在、账号登入失效），不计入熔断
+                breaker.record_success()
+                metrics.incr(f"{name}.caller_errors")
+            raise
+        breaker.record_success()
+        metrics.observe(f"{name}.latency_seconds", monotonic() - start)
+        return result
+
+    async def _hedged(
+        self, name: str, endpoint: str, func: Callable[[], Awaitable[T]]
+    ) -> T:
+        primary = asyncio.ensure_future(func())
+        done, _ = await asyncio.wait({primary}, timeout=self.hedge_delay(endpoint))
+        if done:
+            return primary.result()
+        metrics.incr(f"{name}.hedged")
+        secondary = asyncio.ensure_future(func())
+        pending = {primary, secondary}
+        error: BaseException | None = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        if task is secondary:
+                            metrics.incr(f"{name}.hedge_wins")
+                        return task.result()
+                    error = task.exception()
+            assert error is not None
+            raise error
+        finally:
+            for task in (primary, secondary):
+                if not task.done():
+                    task.cancel()
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        """
+        返回各接口熔断器状态
+
+        :return: {endpoint: {state}}
+        """
+        return {name: {"state": b.state} for name, b in self._breakers.items()}
+
+
+p115_guard = ResilienceGuard("p115")
@@ -1,14 +1,35 @@
 from datetime import timedelta
 from hashlib import sha256
+from time import time
+from typing import Any
 
 from bcrypt import hashpw, gensalt, checkpw
 from jose import jwt
 
+from app.core.concurrency import BoundedExecutor
 from app.core.config import cfg
+from app.core.metrics import metrics
+from app.utils.cache import TTLCache
 from app.utils.timezone import TimezoneUtils
 
 
 ALGORITHM = "HS256"
+# 限定用途令牌（如 SSE 查询参数令牌），不能当作普通访问令牌使用
+STREAM_TOKEN_SCOPE = "stream"
+VERIFIED_TOKEN_CACHE_SIZE = 1024
+
+# bcrypt 专用线程池（bcrypt 计算期间释放 GIL）
+password_executor = BoundedExecutor(
+    "security.bcrypt",
+    max_workers=cfg.auth.hash_workers,
+    max_queue=cfg.auth.hash_queue_size,
+)
+
+# 已验签令牌的载荷（按令牌摘要），条目在令牌 exp 时过期，密钥轮换时清空
+_verified_tokens: TTLCache[dict[str, Any]] = TTLCache(
+    maxsize=VERIFIED_TOKEN_CACHE_SIZE
+)
+cfg.on_secret_key_change(_verified_tokens.clear)
 
 
 class SecurityCore:
@@ -43,30 +64,75 @@ class SecurityCore:
         hashed_bytes = hashed.encode("utf-8")
         return checkpw(SecurityCore._password_prehash(plain), hashed_bytes)
 
+    @staticmethod
+    async def hash_password_async(password: str) -> str:
+        """
+        在 bcrypt 专用线程池中哈希密码，不阻塞事件循环。
+
+        :param password: 明文密码
+        :return: 哈希后的密码字符串
+        :raises ExecutorSaturatedError: 线程池已满时
+        """
+        return await password_executor.run(
+            "hash", SecurityCore.hash_password, password
+        )
+
+    @staticmethod
+    async def verify_password_async(plain: str, hashed: str) -> bool:
+        """
+        在 bcrypt 专用线程池中验证密码，不阻塞事件循环。
+
+        :param plain: 明文密码
+        :param hashed: 哈希后的密码
+        :return: 是否匹配
+        :raises ExecutorSaturatedError: 线程池已满时
+        """
+        return await password_executor.run(
+            "verify", SecurityCore.verify_password, plain, hashed
+        )
+
     @staticmethod
     def create_access_token(
-        subject: str, expires_delta: timedelta | None = None
+        subject: str,
+        expires_delta: timedelta | None = None,
+        scope: str | None = None,
     ) -> str:
         """
         签发 JWT 访问令牌。
 
         :param subject: 主体标识（如用户 ID）
         :param expires_delta: 可选过期时间间隔，不传则使用配置默认值
+        :param scope: 可选用途限定，带 scope 的令牌只被对应依赖接受
         :return: JWT 字符串
         """
         expire = TimezoneUtils.now_utc() + (
             expires_delta or timedelta(minutes=cfg.auth.access_token_expire_minutes)
         )
-        return jwt.encode(
-            {"sub": subject, "exp": expire}, cfg.get_secret_key(), algorithm=ALGORITHM
-        )
+        claims: dict[str, Any] = {"sub": subject, "exp": expire}
+        if scope is not None:
+            claims["scope"] = scope
+        return jwt.encode(claims, cfg.get_secret_key(), algorithm=ALGORITHM)
 
     @staticmethod
     def decode_access_token(token: str) -> dict:
         """
         解码并验证 JWT 访问令牌。
 
+        同一令牌验签通过后缓存其载荷直至过期，后续请求跳过签名校验与解析。
+
         :param token: JWT 字符串
         :return: 解码后的载荷（包含 sub、exp 等）
         """
-        return jwt.decode(token, cfg.get_secret_key(), algorithms=[ALGORITHM])
+        digest = sha256(token.encode("utf-8")).digest()
+        claims = _verified_tokens.get(digest)
+        if claims is not None:
+            metrics.incr("security.token_cache.hit")
+            return dict(claims)
+        metrics.incr("security.token_cache.miss")
+        claims = jwt.decode(token, cfg.get_secret_key(), algorithms=[ALGORITHM])
+        exp = claims.get("exp")
+        if isinstance(exp, (int, float)):
+            remaining = exp - time()
+            if remaining > 0:
+                _verified_tokens.set(digest, claims, ttl=remaining)
+        return dict(claims)
@@ -0,0 +1,702 @@
+import asyncio
+from hashlib import md5
+from pathlib import PurePosixPath
+from time import monotonic, time
+from typing import AsyncIterator
+from urllib.parse import parse_qs, urlsplit
+from uuid import uuid4
+
+from httpx import Response
+
+from app.core.config import cfg
+from app.core.http import http_transport
+from app.core.lock import release_lock
+from app.core.logger import logger
+from app.core.metrics import metrics
+from app.core.p115pool import P115NotLoggedInError, p115_pool
+from app.core.ratelimit import RateLimitExceeded
+from app.db.config import db_config
+from app.db.database import db
+from app.models.file import File
+from app.utils.cache import TTLCache
+from app.utils.singleflight import SingleFlight
+
+
+REDIS_KEY_STRM_URL_PREFIX = "strm:url"
+REDIS_KEY_STRM_LOCK_PREFIX = "strm:lock"
+REDIS_CHANNEL_STRM_RESOLVED_PREFIX = "strm:resolved"
+REDIS_KEY_STRM_STREAMS_PREFIX = "strm:streams"
+# 持锁进程解析失败时发布的结果前缀（下载链接不会以 ! 开头），格式为 !类型:原因；
+# retry 表示失败只与持锁方自身有关（如不等待令牌的预取被限流），等待方应自行解析
+RESOLVE_FAILED_PREFIX = "!"
+RESOLVE_FAILED_RETRY = "retry"
+RESOLVE_FAILED_LOGIN = "login"
+RESOLVE_FAILED_ERROR = "error"
+
+# 代理模式透传给播放器的上游响应头
+PROXY_PASSTHROUGH_HEADERS = (
+    "content-type",
+    "content-length",
+    "content-range",
+    "content-encoding",
+    "accept-ranges",
+    "etag",
+    "last-modified",
+)
+# 上游返回这些状态码时视为链接失效，刷新后重试一次
+PROXY_URL_EXPIRED_STATUS = (403, 404, 410)
+
+# 代理流租约：有序集合成员为租约标识、分数为到期毫秒时间戳；先清理过期租约
+# （持有进程崩溃或长时间未续期），名额未满时加入新租约。返回 1 表示占用成功
+_ACQUIRE_STREAM_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local lease = tonumber(ARGV[3])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now)
+if redis.call('ZCARD', KEYS[1]) >= tonumber(ARGV[1]) then
+    return 0
+end
+redis.call('ZADD', KEYS[1], now + lease, ARGV[2])
+redis.call('PEXPIRE', KEYS[1], lease)
+return 1
+"""
+
+# 续期仍存在的代理流租约（已被清理的租约不再恢复）
+_RENEW_STREAM_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local lease = tonumber(ARGV[2])
+if redis.call('ZADD', KEYS[1], 'XX', 'CH', now + lease, ARGV[1]) == 1 then
+    redis.call('PEXPIRE', KEYS[1], lease)
+end
+return 1
+"""
+
+
+class StrmProxyBusyError(RuntimeError):
+    """
+    单个文件的代理流数已达上限
+    """
+
+
+class DownloadUrlResolveError(RuntimeError):
+    """
+    其他进程解析同一下载链接失败
+    """
+
+
+class DownloadUrlResolver:
+    """
+    115 下载链接解析：进程内 LRU + Redis 两级缓存，按 pick_code 与 User-Agent 区分
+
+    115 的下载链接与请求时的 User-Agent 绑定，并在 URL 的 t 参数中携带过期时间戳。
+    """
+
+    __slots__ = ("_local", "_flight")
+
+    def __init__(self) -> None:
+        self._local: TTLCache[str] = TTLCache(
+            maxsize=cfg.strm.url_cache_size, ttl=cfg.strm.url_cache_default_ttl
+        )
+        self._flight: SingleFlight[str] = SingleFlight()
+
+    @staticmethod
+    def cache_key(pick_code: str, user_agent: str) -> str:
+        """
+        生成缓存键
+
+        :param pick_code: 115 提取码
+        :param user_agent: 请求方 User-Agent
+        :return: 形如 pick_code:ua_digest 的缓存键
+        """
+        ua_digest = md5(user_agent.encode("utf-8")).hexdigest()[:16]
+        return f"{pick_code}:{ua_digest}"
+
+    @staticmethod
+    def url_ttl(url: str) -> int:
+        """
+        根据链接中的过期时间戳计算缓存秒数
+
+        :param url: 下载链接
+        :return: 缓存秒数，链接即将过期时返回 0
+        """
+        try:
+            expire_at = int(parse_qs(urlsplit(url).query)["t"][0])
+        except (KeyError, IndexError, ValueError):
+            return cfg.strm.url_cache_default_ttl
+        ttl = expire_at - int(time()) - cfg.strm.url_expire_margin
+        return max(0, min(ttl, cfg.strm.url_cache_max_ttl))
+
+    async def get_cached(self, key: str) -> str | None:
+        """
+        依次读取进程内缓存与 Redis 缓存，Redis 命中时回填进程内缓存
+
+        :param key: 缓存键
+        :return: 下载链接或 None
+        """
+        url = self._local.get(key)
+        if url is not None:
+            metrics.incr("strm.url.local_hit")
+            return url
+        try:
+            redis_client = db.get_redis()
+            pipe = redis_client.pipeline(transaction=False)
+            pipe.get(f"{REDIS_KEY_STRM_URL_PREFIX}:{key}")
+            pipe.ttl(f"{REDIS_KEY_STRM_URL_PREFIX}:{key}")
+            url, ttl = await pipe.execute()
+        except Exception as exc:
+            logger.debug(f"【STRM】读取下载链接缓存失败: {exc}")
+            return None
+        if url is not None and ttl > 0:
+            metrics.incr("strm.url.redis_hit")
+            self._local.set(key, url, ttl)
+            return url
+        return None
+
+    async def store(self, key: str, url: str) -> None:
+        """
+        写入两级缓存
+
+        :param key: 缓存键
+        :param url: 下载链接
+        """
+        ttl = self.url_ttl(url)
+        if ttl <= 0:
+            return
+        self._local.set(key, url, ttl)
+        try:
+            await db.get_redis().setex(
+                f"{REDIS_KEY_STRM_URL_PREFIX}:{key}", ttl, url
+            )
+        except Exception as exc:
+            logger.debug(f"【STRM】写入下载链接缓存失败: {exc}")
+
+    async def invalidate(self, pick_code: str, user_agent: str) -> None:
+        """
+        删除两级缓存中的链接（如上游返回链接已失效）
+
+        :param pick_code: 115 提取码
+        :param user_agent: 请求方 User-Agent
+        """
+        key = self.cache_key(pick_code, user_agent)
+        self._local.pop(key)
+        try:
+            await db.get_redis().delete(f"{REDIS_KEY_STRM_URL_PREFIX}:{key}")
+        except Exception as exc:
+            logger.debug(f"【STRM】删除下载链接缓存失败: {exc}")
+
+    async def fetch(self, pick_code: str, user_agent: str, wait: bool = True) -> str:
+        """
+        直接请求 115 获取下载链接（多账号调度，受各账号 download 令牌桶限流）
+
+        :param pick_code: 115 提取码
+        :param user_agent: 请求方 User-Agent
+        :param wait: 令牌不足时是否等待
+        :return: 下载链接
+        :raises P115NotLoggedInError: 未登入时
+        :raises RateLimitExceeded: 不等待且令牌不足时
+        """
+        metrics.incr("strm.url.fetch")
+        url = await p115_pool.call(
+            "download",
+            "download_url",
+            lambda client: client.download_url(
+                pick_code, user_agent=user_agent, async_=True
+            ),
+            wait=wait,
+            idempotent=True,
+        )
+        return str(url)
+
+    async def resolve(
+        self, pick_code: str, user_agent: str = "", *, wait: bool = True
+    ) -> str:
+        """
+        解析下载链接，优先命中缓存；未命中时合并进程内与跨进程的并发解析
+
+        :param pick_code: 115 提取码
+        :param user_agent: 请求方 User-Agent
+        :param wait: 限流时是否等待令牌，False 时立即抛出 RateLimitExceeded
+        :return: 下载链接
+        """
+        key = self.cache_key(pick_code, user_agent)
+        url = await self.get_cached(key)
+        if url is not None:
+            return url
+        # 不等待令牌的预取与需要等待的播放请求分开合并，播放请求不会共享预取的限流失败
+        url, shared = await self._flight.do(
+            (key, wait), lambda: self._resolve_shared(key, pick_code, user_agent, wait)
+        )
+        if shared:
+            metrics.incr("strm.url.coalesced_local")
+        return url
+
+    async def _resolve_shared(
+        self, key: str, pick_code: str, user_agent: str, wait: bool = True
+    ) -> str:
+        """
+        跨进程合并：抢到 Redis 短锁的进程请求 115 并发布结果，其余进程等待结果
+
+        持锁进程失败时发布失败标记，等待方立即结束等待：与持锁方自身相关的失败
+        （限流、取消）由等待方自行请求，其余失败直接抛出。
+        Redis 不可用、持锁方已退出或等待超时时退化为直接请求 115。
+
+        :param key: 缓存键
+        :param pick_code: 115 提取码
+        :param user_agent: 请求方 User-Agent
+        :param wait: 限流时是否等待令牌
+        :return: 下载链接
+        """
+        lock_key = f"{REDIS_KEY_STRM_LOCK_PREFIX}:{key}"
+        channel = f"{REDIS_CHANNEL_STRM_RESOLVED_PREFIX}:{key}"
+        token = uuid4().hex
+        try:
+            redis_client = db.get_redis()
+            acquired = await redis_client.set(
+                lock_key, token, nx=True, px=int(cfg.strm.resolve_lock_ttl * 1000)
+            )
+        except Exception as exc:
+            logger.debug(f"【STRM】获取解析锁失败: {exc}")
+            return await self._fetch_and_store(key, pick_code, user_agent, wait)
+
+        if not acquired:
+            url = await self._wait_published(key, channel, lock_key)
+            if url is not None:
+                metrics.incr("strm.url.coalesced_remote")
+                return url
+            return await self._fetch_and_store(key, pick_code, user_agent, wait)
+
+        try:
+            url = await self._fetch_and_store(key, pick_code, user_agent, wait)
+        except BaseException as exc:
+            await self._publish(channel, self._failure_marker(exc))
+            raise
+        else:
+            await self._publish(channel, url)
+            return url
+        finally:
+            try:
+                await release_lock(lock_key, token)
+            except Exception as exc:
+                logger.debug(f"【STRM】释放解析锁失败: {exc}")
+
+    async def _fetch_and_store(
+        self, key: str, pick_code: str, user_agent: str, wait: bool = True
+    ) -> str:
+        url = await self.fetch(pick_code, user_agent, wait)
+        await self.store(key, url)
+        return url
+
+    @staticmethod
+    def _failure_marker(exc: BaseException) -> str:
+        if isinstance(exc, (RateLimitExceeded, asyncio.CancelledError)):
+            kind = RESOLVE_FAILED_RETRY
+        elif isinstance(exc, P115NotLoggedInError):
+            kind = RESOLVE_FAILED_LOGIN
+        else:
+            kind = RESOLVE_FAILED_ERROR
+        return f"{RESOLVE_FAILED_PREFIX}{kind}:{exc}"
+
+    @staticmethod
+    async def _publish(channel: str, data: str) -> None:
+        try:
+            await db.get_redis().publish(channel, data)
+        except Exception as exc:
+            logger.debug(f"【STRM】发布解析结果失败: {exc}")
+
+    async def _wait_published(
+        self, key: str, channel: str, lock_key: str
+    ) -> str | None:
+        """
+        订阅解析结果频道，等待持锁进程发布
+
+        :param key: 缓存键
+        :param channel: 结果频道
+        :param lock_key: 解析锁键
+        :return: 下载链接；超时、持锁方已退出或需要自行解析时返回 None
+        :raises P115NotLoggedInError: 持锁方发现未登入时
+        :raises DownloadUrlResolveError: 持锁方解析失败时
+        """
+        pubsub = db.get_redis().pubsub()
+        try:
+            await pubsub.subscribe(channel)
+            # 订阅前结果可能已写入缓存，或持锁方已失败退出（错过了失败标记）
+            url = await self.get_cached(key)
+            if url is not None:
+                return url
+            if not await db.get_redis().exists(lock_key):
+                metrics.incr("strm.url.coalesce_missed")
+                return None
+            deadline = monotonic() + cfg.strm.resolve_wait_timeout
+            while (remaining := deadline - monotonic()) > 0:
+                message = await pubsub.get_message(
+                    ignore_subscribe_messages=True, timeout=remaining
+                )
+                if message and message.get("type") == "message":
+                    data = message["data"]
+                    if data.startswith(RESOLVE_FAILED_PREFIX):
+                        self._raise_published_failure(data)
+                        return None
+                    if (ttl := self.url_ttl(data)) > 0:
+                        self._local.set(key, data, ttl)
+                    return data
+            metrics.incr("strm.url.coalesce_timeout")
+            return None
+        except (P115NotLoggedInError, DownloadUrlResolveError):
+            raise
+        except Exception as exc:
+            logger.debug(f"【STRM】等待解析结果失败: {exc}")
+            return None
+        finally:
+            try:
+                await pubsub.aclose()
+            except Exception:
+                pass
+
+    @staticmethod
+    def _raise_published_failure(data: str) -> None:
+        kind, _, reason = data[len(RESOLVE_FAILED_PREFIX) :].partition(":")
+        metrics.incr(f"strm.url.coalesced_failure.{kind}")
+        if kind == RESOLVE_FAILED_RETRY:
+            return
+        if kind == RESOLVE_FAILED_LOGIN:
+            raise P115NotLoggedInError(reason)
+        raise DownloadUrlResolveError(reason)
+
+    def stats(self) -> dict[str, float | int | None]:
+        """
+        返回解析与合并指标（当前进程）
+
+        :return: 含缓存命中率与合并命中率的字典
+        """
+        return {
+            "inflight": len(self._flight),
+            "local_cache_size": len(self._local),
+            "cache_hit_rate": metrics.ratio(
+                ["strm.url.local_hit", "strm.url.redis_hit"],
+                [
+                    "strm.url.fetch",
+                    "strm.url.coalesced_local",
+                    "strm.url.coalesced_remote",
+                ],
+            ),
+            "coalescing_hit_rate": metrics.ratio(
+                ["strm.url.coalesced_local", "strm.url.coalesced_remote"],
+                ["strm.url.fetch"],
+            ),
+        }
+
+
+class DownloadUrlPrefetcher:
+    """
+    播放预取：解析某集后，在后台为同目录按名称排序的后续媒体文件预热下载链接缓存
+    """
+
+    __slots__ = ("_resolver", "_semaphore", "_pending", "_recent")
+
+    def __init__(self, resolver: DownloadUrlResolver) -> None:
+        self._resolver = resolver
+        self._semaphore = asyncio.Semaphore(cfg.strm.prefetch_concurrency)
+        self._pending: set[asyncio.Task] = set()
+        self._recent: TTLCache[bool] = TTLCache(
+            maxsize=cfg.strm.url_cache_size,
+            ttl=cfg.strm.prefetch_dedupe_seconds,
+        )
+
+    def schedule(self, pick_code: str, user_agent: str) -> None:
+        """
+        为 pick_code 的后续兄弟文件安排预取（不阻塞调用方）
+
+        :param pick_code: 刚解析的 115 提取码
+        :param user_agent: 请求方 User-Agent
+        """
+        if cfg.strm.prefetch_count <= 0:
+            return
+        key = self._resolver.cache_key(pick_code, user_agent)
+        if self._recent.get(key):
+            return
+        if len(self._pending) >= cfg.strm.prefetch_max_pending:
+            metrics.incr("strm.prefetch.dropped")
+            return
+        self._recent.set(key, True)
+        task = asyncio.create_task(self._prefetch_siblings(pick_code, user_agent))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    @staticmethod
+    async def next_siblings(pick_code: str, count: int) -> list[str]:
+        """
+        按名称顺序查找同目录中排在 pick_code 之后的媒体文件
+
+        :param pick_code: 当前文件提取码
+        :param count: 返回数量
+        :return: 后续媒体文件的提取码列表
+        """
+        current = await File.find_one(File.pick_code == pick_code)
+        if current is None:
+            return []
+        config = await db_config.get()
+        media_exts = {e.lower().lstrip(".") for e in config.base.user_rmt_mediaext}
+        result: list[str] = []
+        cursor = File.find(
+            {
+                "parent_id": current.parent_id,
+                "is_dir": False,
+                "name": {"$gt": current.name},
+            }
+        ).sort("+name")
+        async for sibling in cursor:
+            suffix = PurePosixPath(sibling.name).suffix.lower().lstrip(".")
+            if suffix in media_exts and sibling.pick_code:
+                result.append(sibling.pick_code)
+                if len(result) >= count:
+                    break
+        return result
+
+    async def _prefetch_siblings(self, pick_code: str, user_agent: str) -> None:
+        try:
+            siblings = await self.next_siblings(pick_code, cfg.strm.prefetch_count)
+        except Exception as exc:
+            logger.debug(f"【STRM】查询预取文件失败 {pick_code}: {exc}")
+            return
+        await asyncio.gather(*(self._prefetch_one(pc, user_agent) for pc in siblings))
+
+    async def _prefetch_one(self, pick_code: str, user_agent: str) -> None:
+        async with self._semaphore:
+            key = self._resolver.cache_key(pick_code, user_agent)
+            if await self._resolver.get_cached(key) is not None:
+                return
+            try:
+                await self._resolver.resolve(pick_code, user_agent, wait=False)
+                metrics.incr("strm.prefetch.resolved")
+            except Exception as exc:
+                metrics.incr("strm.prefetch.failed")
+                logger.debug(f"【STRM】预取下载链接失败 {pick_code}: {exc}")
+
+    def stats(self) -> dict[str, int]:
+        """
+        返回预取统计（当前进程）
+        """
+        return {
+            "prefetch_pending": len(self._pending),
+            "prefetch_resolved": metrics.counter("strm.prefetch.resolved"),
+            "prefetch_failed": metrics.counter("strm.prefetch.failed"),
+            "prefetch_dropped": metrics.counter("strm.prefetch.dropped"),
+        }
+
+
+class ProxyStream:
+    """
+    一次代理播放的上游流：持有上游响应与该文件的流数租约
+
+    close 幂等，响应体迭代结束、客户端断开或响应从未发送时都应调用，保证上游连接
+    与流数租约在所有路径上释放。
+    """
+
+    __slots__ = (
+        "pick_code",
+        "status_code",
+        "headers",
+        "_proxy",
+        "_response",
+        "_lease",
+        "_started",
+        "_sent",
+        "_closed",
+    )
+
+    def __init__(
+        self,
+        proxy: "StrmProxy",
+        pick_code: str,
+        response: Response,
+        lease: str | None,
+        started: float,
+    ) -> None:
+        self.pick_code = pick_code
+        self.status_code = response.status_code
+        self.headers = {
+            name: value
+            for name in PROXY_PASSTHROUGH_HEADERS
+            if (value := response.headers.get(name)) is not None
+        }
+        self._proxy = proxy
+        self._response = response
+        self._lease = lease
+        self._started = started
+        self._sent = 0
+        self._closed = False
+
+    async def iter_bytes(self) -> AsyncIterator[bytes]:
+        """
+        逐块转发上游响应体，并定期续期流数租约
+
+        :return: 原始分块迭代器
+        """
+        renew_at = monotonic() + cfg.strm.proxy_stream_lease_seconds / 3
+        try:
+            async for chunk in self._response.aiter_raw():
+                if not self._sent:
+                    metrics.observe(
+                        "strm.proxy.ttfb_seconds", monotonic() - self._started
+                    )
+                self._sent += len(chunk)
+                yield chunk
+                if self._lease is not None and monotonic() >= renew_at:
+                    renew_at = monotonic() + cfg.strm.proxy_stream_lease_seconds / 3
+                    await self._proxy._renew(self.pick_code, self._lease)
+        finally:
+            await self.close()
+
+    async def close(self) -> None:
+        """
+        关闭上游响应并释放流数租约（可重复调用）
+        """
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            await self._response.aclose()
+        finally:
+            await self._proxy._release(self.pick_code, self._lease)
+            elapsed = monotonic() - self._started
+            metrics.incr("strm.proxy.bytes", self._sent)
+            if self._sent and elapsed > 0:
+                metrics.observe("strm.proxy.throughput_bps", self._sent / elapsed)
+
+
+class StrmProxy:
+    """
+    代理模式：后端回源 115 并逐块转发响应体，支持 Range/206，供无法跟随 302 的播放器使用
+
+    上游连接复用进程级连接池，响应体按原始分块透传，不在内存中缓冲整个文件。
+    单个文件的并发流数通过 Redis 租约在所有 worker 间共同限制，
+    Redis 不可用时退化为进程内计数。
+    """
+
+    __slots__ = ("_resolver", "_streams")
+
+    def __init__(self, resolver: DownloadUrlResolver) -> None:
+        self._resolver = resolver
+        self._streams: dict[str, int] = {}
+
+    async def open(
+        self,
+        pick_code: str,
+        user_agent: str,
+        method: str = "GET",
+        range_header: str | None = None,
+    ) -> ProxyStream:
+        """
+        打开上游流
+
+        GET 时调用方负责在响应结束后调用 close（如作为 StreamingResponse 的后台任务）；
+        HEAD 时返回前已关闭。
+
+        :param pick_code: 115 提取码
+        :param user_agent: 播放器 User-Agent（与解析链接时一致）
+        :param method: GET 或 HEAD
+        :param range_header: 播放器的 Range 请求头
+        :return: 上游流
+        :raises StrmProxyBusyError: 该文件的并发流数已达上限
+        """
+        lease = await self._acquire(pick_code)
+        try:
+            started = monotonic()
+            response = await self._send(pick_code, user_agent, method, range_header)
+        except BaseException:
+            await self._release(pick_code, lease)
+            raise
+        stream = ProxyStream(self, pick_code, response, lease, started)
+        if method == "HEAD":
+            await stream.close()
+        return stream
+
+    async def _send(
+        self,
+        pick_code: str,
+        user_agent: str,
+        method: str,
+        range_header: str | None,
+    ) -> Response:
+        client = http_transport.stream_client
+        headers = {"user-agent": user_agent}
+        if range_header:
+            headers["range"] = range_header
+        url = await self._resolver.resolve(pick_code, user_agent)
+        response = await client.send(
+            client.build_request(method, url, headers=headers), stream=True
+        )
+        if response.status_code in PROXY_URL_EXPIRED_STATUS:
+            await response.aclose()
+            await self._resolver.invalidate(pick_code, user_agent)
+            metrics.incr("strm.proxy.url_refreshed")
+            url = await self._resolver.resolve(pick_code, user_agent)
+            response = await client.send(
+                client.build_request(method, url, headers=headers), stream=True
+            )
+        return response
+
+    async def _acquire(self, pick_code: str) -> str | None:
+        """
+        占用该文件的一个流数名额
+
+        :param pick_code: 115 提取码
+        :return: Redis 租约标识，Redis 不可用时为 None（已按进程内计数限制）
+        :raises StrmProxyBusyError: 名额已满
+        """
+        limit = cfg.strm.proxy_max_streams_per_file
+        lease: str | None = uuid4().hex
+        try:
+            acquired = await db.get_redis().eval(
+                _ACQUIRE_STREAM_SCRIPT,
+                1,
+                f"{REDIS_KEY_STRM_STREAMS_PREFIX}:{pick_code}",
+                limit,
+                lease,
+                int(cfg.strm.proxy_stream_lease_seconds * 1000),
+            )
+        except Exception as exc:
+            logger.debug(f"【STRM】代理流名额检查不可用，按进程内计数: {exc}")
+            lease = None
+            acquired = self._streams.get(pick_code, 0) < limit
+        if not acquired:
+            metrics.incr("strm.proxy.rejected")
+            raise StrmProxyBusyError(f"{pick_code} 代理流数已达上限")
+        self._streams[pick_code] = self._streams.get(pick_code, 0) + 1
+        metrics.incr("strm.proxy.streams")
+        metrics.set_gauge("strm.proxy.active_streams", sum(self._streams.values()))
+        return lease
+
+    async def _renew(self, pick_code: str, lease: str) -> None:
+        try:
+            await db.get_redis().eval(
+                _RENEW_STREAM_SCRIPT,
+                1,
+                f"{REDIS_KEY_STRM_STREAMS_PREFIX}:{pick_code}",
+                lease,
+                int(cfg.strm.proxy_stream_lease_seconds * 1000),
+            )
+        except Exception as exc:
+            logger.debug(f"【STRM】续期代理流租约失败: {exc}")
+
+    async def _release(self, pick_code: str, lease: str | None) -> None:
+        remaining = self._streams.get(pick_code, 1) - 1
+        if remaining > 0:
+            self._streams[pick_code] = remaining
+        else:
+            self._streams.pop(pick_code, None)
+        metrics.set_gauge("strm.proxy.active_streams", sum(self._streams.values()))
+        if lease is None:
+            return
+        try:
+            await db.get_redis().zrem(
+                f"{REDIS_KEY_STRM_STREAMS_PREFIX}:{pick_code}", lease
+            )
+        except Exception as exc:
+            logger.debug(f"【STRM】释放代理流租约失败: {exc}")
+
+
+download_url_resolver = DownloadUrlResolver()
+download_url_prefetcher = DownloadUrlPrefetcher(download_url_resolver)
+strm_proxy = StrmProxy(download_url_resolver)
@@ -1,10 +1,15 @@
+import asyncio
+from copy import deepcopy
+from hashlib import sha1
 from typing import Any
 
 from motor.motor_asyncio import AsyncIOMotorClient
+from orjson import OPT_SORT_KEYS, dumps
 from pydantic import BaseModel, Field
 from pymongo import MongoClient
 
 from app.core.config import cfg
+from app.core.logger import logger
 from app.db.database import db
 from app.schemas.config import (
     BaseConfigSchema,
@@ -15,6 +20,9 @@ from app.schemas.config import (
 
 COLLECTION_NAME = "system_settings"
 DOC_ID = "app_config"
+REDIS_KEY_CONFIG_VERSION = "config:version"
+REDIS_CHANNEL_CONFIG = "config:changed"
+CONFIG_LISTENER_RETRY_SECONDS = 5.0
 
 
 class DbConfig(BaseModel):
@@ -179,17 +187,6 @@ def set_value_sync(
     )
 
 
-def _get_nested(data: dict[str, Any], key_path: str) -> Any:
-    """
-    按点分路径从字典取值
-    """
-    for key in key_path.strip().split("."):
-        if not isinstance(data, dict) or key not in data:
-            return None
-        data = data[key]
-    return data
-
-
 def _set_nested(data: dict[str, Any], key_path: str, value: Any) -> None:
     """
     按点分路径向字典写单键
@@ -203,90 +200,218 @@ def _set_nested(data: dict[str, Any], key_path: str, value: Any) -> None:
     cur[parts[-1]] = value
 
 
+def _flatten(data: dict[str, Any], prefix: str = "") -> dict[str, Any]:
+    """
+    将嵌套字典展开为点分路径 → 值（包含中间层级）
+    """
+    flat: dict[str, Any] = {}
+    for key, value in data.items():
+        path = f"{prefix}{key}"
+        flat[path] = value
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f"{path}."))
+    return flat
+
+
 class DbConfigManager:
     """
-    数据库配置管理器
+    数据库配置管理器：进程内缓存校验后的 DbConfig 与点分路径索引，读取无需访问 MongoDB；
+    写入后递增 Redis 中的版本号并广播，其他 worker 收到后从数据库重新加载
     """
 
-    __slots__ = ("_cache", "_db_name")
+    __slots__ = ("_cache", "_flat", "_digest", "_db_name", "_version", "_listener")
 
     def __init__(self, db_name: str | None = None) -> None:
         self._cache: DbConfig | None = None
+        self._flat: dict[str, Any] = {}
+        self._digest: str | None = None
         self._db_name = db_name or cfg.mongodb.db_name
+        self._version = 0
+        self._listener: asyncio.Task | None = None
+
+    @property
+    def version(self) -> int:
+        """
+        当前进程已加载的配置版本号
+        """
+        return self._version
+
+    @property
+    def etag(self) -> str | None:
+        """
+        已缓存配置的强 ETag（内容摘要，随配置变更而变化），未加载时为 None
+        """
+        return f'"config-{self._digest}"' if self._digest else None
 
     async def get(self) -> DbConfig:
+        """
+        返回缓存的配置，未加载时从数据库读取
+
+        返回的实例在进程内共享，修改前请先 model_copy
+        """
+        if self._cache is None:
+            return await self.reload()
+        return self._cache
+
+    async def reload(self) -> DbConfig:
         """
         从数据库读取配置并缓存
         """
-        self._cache = await get_config(db_name=self._db_name)
+        self._apply(await get_config(db_name=self._db_name))
+        assert self._cache is not None
         return self._cache
 
     def get_sync(self) -> DbConfig:
         """
         从数据库同步读取配置并缓存
         """
-        self._cache = get_config_sync(db_name=self._db_name)
+        self._apply(get_config_sync(db_name=self._db_name))
+        assert self._cache is not None
         return self._cache
 
     async def set(self, data: DbConfig | dict[str, Any]) -> None:
         """
-        将配置写入数据库并更新缓存
+        将配置写入数据库、更新缓存并通知其他 worker
         """
         if not isinstance(data, DbConfig):
             data = DbConfig.model_validate(data)
         await set_config(data, db_name=self._db_name)
-        self._cache = data
+        self._apply(data)
+        await self._broadcast()
 
     def set_sync(self, data: DbConfig | dict[str, Any]) -> None:
         """
-        将配置同步写入数据库并更新缓存
+        将配置同步写入数据库并更新缓存（不广播，其他 worker 在下次同步版本时生效）
         """
         if not isinstance(data, DbConfig):
             data = DbConfig.model_validate(data)
         set_config_sync(data, db_name=self._db_name)
-        self._cache = data
+        self._apply(data)
 
     async def get_value(self, key_path: str) -> Any:
         """
-        按点分路径取值
+        按点分路径取值（返回副本，修改不影响缓存）
         """
         if self._cache is None:
-            await self.get()
-        d = self._cache.model_dump()
-        return _get_nested(d, key_path)
+            await self.reload()
+        return deepcopy(self._flat.get(key_path.strip()))
 
     def get_value_sync(self, key_path: str) -> Any:
         """
-        按点分路径同步取值
+        按点分路径同步取值（返回副本，修改不影响缓存）
         """
         if self._cache is None:
             self.get_sync()
-        assert self._cache is not None
-        d = self._cache.model_dump()
-        return _get_nested(d, key_path)
+        return deepcopy(self._flat.get(key_path.strip()))
 
     async def set_value(self, key_path: str, value: Any) -> None:
         """
-        按点分路径写单键并同步到数据库
+        按点分路径写单键、同步到数据库并通知其他 worker
         """
         await set_value(key_path, value, db_name=self._db_name)
         if self._cache is not None:
-            d = self._cache.model_dump()
-            _set_nested(d, key_path, value)
-            self._cache = DbConfig.model_validate(d)
+            self._apply(self._with_value(self._cache, key_path, value))
+        await self._broadcast()
 
     def set_value_sync(self, key_path: str, value: Any) -> None:
         """
-        按点分路径同步写单键并同步到数据库
+        按点分路径同步写单键并同步到数据库（不广播）
         """
         set_value_sync(key_path, value, db_name=self._db_name)
         if self._cache is not None:
-            d = self._cache.model_dump()
-            _set_nested(d, key_path, value)
-            self._cache = DbConfig.model_validate(d)
+            self._apply(self._with_value(self._cache, key_path, value))
 
     def invalidate(self) -> None:
         """
         清空缓存
         """
         self._cache = None
+        self._flat = {}
+        self._digest = None
+
+    async def start_listener(self) -> None:
+        """
+        订阅配置变更广播
+        """
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop_listener(self) -> None:
+        """
+        停止订阅配置变更广播
+        """
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+    def _apply(self, data: DbConfig) -> None:
+        """
+        替换缓存，重建点分路径索引与内容摘要
+        """
+        self._flat = _flatten(data.model_dump())
+        content = dumps(data.model_dump(mode="json"), option=OPT_SORT_KEYS)
+        self._digest = sha1(content).hexdigest()[:20]
+        self._cache = data
+
+    @staticmethod
+    def _with_value(data: DbConfig, key_path: str, value: Any) -> DbConfig:
+        d = data.model_dump()
+        _set_nested(d, key_path, value)
+        return DbConfig.model_validate(d)
+
+    async def _broadcast(self) -> None:
+        """
+        递增配置版本号并广播给所有 worker
+        """
+        try:
+            redis_client = db.get_redis()
+            version = await redis_client.incr(REDIS_KEY_CONFIG_VERSION)
+            self._version = max(self._version, version)
+            await redis_client.publish(REDIS_CHANNEL_CONFIG, version)
+        except Exception as exc:
+            logger.warning(f"【Config】广播配置变更失败: {exc}")
+
+    async def _sync_version(self, version: int) -> None:
+        """
+        版本号比本地新时从数据库重新加载
+        """
+        if version <= self._version:
+            return
+        await self.reload()
+        self._version = max(self._version, version)
+        logger.info(f"【Config】配置已同步（版本 {version}）")
+
+    async def _listen(self) -> None:
+        """
+        订阅配置变更频道，断线后自动重连
+        """
+        while True:
+            pubsub = None
+            try:
+                redis_client = db.get_redis()
+                pubsub = redis_client.pubsub()
+                await pubsub.subscribe(REDIS_CHANNEL_CONFIG)
+                # 订阅建立前（或断线期间）可能错过了广播，按版本号补齐
+                remote = await redis_client.get(REDIS_KEY_CONFIG_VERSION)
+                await self._sync_version(int(remote or 0))
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        await self._sync_version(int(message["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning(f"【Config】配置订阅中断，稍后重连: {exc}")
+            finally:
+                if pubsub is not None:
+                    try:
+                        await pubsub.aclose()
+                    except Exception:
+                        pass
+            await asyncio.sleep(CONFIG_LISTENER_RETRY_SECONDS)
+
+
+db_config = DbConfigManager()
@@ -1,4 +1,308 @@
+import asyncio
+from pathlib import Path, PurePosixPath
+from typing import Any, AsyncIterator
+
+from p115client import check_response
+from pymongo.errors import DuplicateKeyError
+
+from app.core.concurrency import AdaptiveConcurrencyLimiter
+from app.core.config import cfg
+from app.core.lock import (
+    FILES_WRITE_LOCK_TTL_SECONDS,
+    REDIS_KEY_FILES_WRITE_LOCK,
+    redis_lock,
+)
+from app.core.logger import logger
+from app.core.metrics import metrics
+from app.core.p115 import PooledP115Client
+from app.core.p115pool import p115_pool
+from app.db.config import db_config
+from app.models.file import File
+from app.services.file import FileService
+
+
+def _write_strm(path: Path, content: str, overwrite: bool) -> bool:
+    if path.exists() and not overwrite:
+        return False
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content, encoding="utf-8")
+    return True
+
+
 class StrmSyncHelper:
     """
     STRM 文件同步类
     """
+
+    __slots__ = ("_list_limiter", "_task")
+
+    def __init__(self) -> None:
+        self._task: asyncio.Task | None = None
+        self._list_limiter = AdaptiveConcurrencyLimiter(
+            "sync.list",
+            initial=cfg.sync.list_concurrency_initial,
+            min_limit=cfg.sync.list_concurrency_min,
+            max_limit=cfg.sync.list_concurrency_max,
+            latency_target=cfg.sync.list_latency_target,
+            error_threshold=cfg.sync.list_error_threshold,
+        )
+
+    @property
+    def list_concurrency(self) -> int:
+        """
+        当前目录列表并发上限
+        """
+        return self._list_limiter.limit
+
+    @staticmethod
+    def build_strm_url(strm_base_url: str, pick_code: str) -> str:
+        """
+        生成写入 STRM 文件的播放地址，指向后端 /strm/{pick_code} 跳转接口
+
+        :param strm_base_url: 配置中的 STRM 文件基础地址
+        :param pick_code: 115 提取码
+        :return: 播放地址
+        """
+        return f"{strm_base_url.rstrip('/')}{cfg.app.api_v1_prefix}/strm/{pick_code}"
+
+    async def list_page(self, cid: int, offset: int) -> dict[str, Any]:
+        """
+        列出目录的一页（多账号调度，受令牌桶限流与自适应并发控制）
+
+        :param cid: 目录 ID
+        :param offset: 偏移量
+        :return: fs_files 响应
+        """
+        payload = {
+            "cid": cid,
+            "offset": offset,
+            "limit": cfg.sync.list_page_size,
+            "show_dir": 1,
+        }
+
+        async def fetch(client: PooledP115Client) -> dict[str, Any]:
+            resp = await client.fs_files(payload, async_=True)
+            check_response(resp)
+            return resp
+
+        async with self._list_limiter.slot():
+            return await p115_pool.call("list", "fs_files", fetch)
+
+    async def resolve_dir_id(self, path: str) -> int:
+        """
+        由网盘路径获取目录 ID
+
+        :param path: 网盘目录路径
+        :return: 目录 ID
+        """
+
+        async def fetch(client: PooledP115Client) -> dict[str, Any]:
+            resp = await client.fs_dir_getid(path, async_=True)
+            check_response(resp)
+            return resp
+
+        resp = await p115_pool.call("list", "fs_dir_getid", fetch)
+        dir_id = int(resp.get("id") or 0)
+        if not dir_id and path.strip("/"):
+            raise FileNotFoundError(f"网盘目录不存在: {path}")
+        return dir_id
+
+    async def iter_tree(
+        self, cid: int, path: str = "/"
+    ) -> AsyncIterator[tuple[str, dict[str, Any]]]:
+        """
+        广度优先并发遍历目录树，逐条产出文件（不含目录）条目
+
+        并发度由自适应控制器决定：115 响应健康时逐步提高，遇到限流时减半。
+
+        :param cid: 根目录 ID
+        :param path: 根目录的网盘路径
+        :return: (所在目录路径, 文件条目) 异步迭代器，条目为 fs_files 原始字段
+        """
+        pending: asyncio.Queue[tuple[int, int, str]] = asyncio.Queue()
+        output: asyncio.Queue[
+            tuple[str, dict[str, Any]] | BaseException
+        ] = asyncio.Queue(maxsize=cfg.sync.list_page_size * 4)
+        await pending.put((cid, 0, path))
+
+        async def worker() -> None:
+            while True:
+                dir_id, offset, dir_path = await pending.get()
+                try:
+                    resp = await self.list_page(dir_id, offset)
+                    next_offset = offset + cfg.sync.list_page_size
+                    if next_offset < int(resp.get("count", 0)):
+                        await pending.put((dir_id, next_offset, dir_path))
+                    for item in resp.get("data", []):
+                        if "fid" in item:
+                            await output.put((dir_path, item))
+                        else:
+                            await pending.put(
+                                (
+                                    int(item["cid"]),
+                                    0,
+                                    str(PurePosixPath(dir_path) / item["n"]),
+                                )
+                            )
+                except Exception as exc:
+                    await output.put(exc)
+                finally:
+                    pending.task_done()
+
+        workers = [
+            asyncio.create_task(worker()) for _ in range(cfg.sync.list_concurrency_max)
+        ]
+        joiner = asyncio.create_task(pending.join())
+        try:
+            while True:
+                getter = asyncio.create_task(output.get())
+                done, _ = await asyncio.wait(
+                    {getter, joiner}, return_when=asyncio.FIRST_COMPLETED
+                )
+                if getter not in done:
+                    getter.cancel()
+                    break
+                item = getter.result()
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+            while not output.empty():
+                item = output.get_nowait()
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            joiner.cancel()
+            for task in workers:
+                task.cancel()
+
+    @property
+    def running(self) -> bool:
+        """
+        本进程是否正在执行全量同步
+        """
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> bool:
+        """
+        在后台启动全量同步
+
+        :return: 是否已启动（本进程已有同步在执行时为 False）
+        """
+        if self.running:
+            return False
+        self._task = asyncio.create_task(self.full_sync())
+        return True
+
+    async def stop(self) -> None:
+        """
+        取消本进程正在执行的全量同步（释放同步锁）
+        """
+        if not self.running:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+    async def full_sync(self) -> dict[str, int] | None:
+        """
+        全量同步：遍历全量同步路径下的媒体文件，生成 .strm 文件并写入文件索引
+
+        与统计重建共用 files 写入锁，多 worker 间互斥；已入库的文件由 pick_code
+        过滤器快速判定，新文件经 FileService 入库，同时更新存在性过滤器与统计汇总。
+
+        :return: 各项计数，其他进程持有写入锁或配置不完整时返回 None
+        """
+        config = await db_config.get()
+        base_url = config.base.strm_base_url
+        media_dir = config.storage.local_media_library_dir
+        root = config.full_sync.path
+        if not (base_url and media_dir and root):
+            logger.warning("【全量同步】未配置 STRM 基础地址、本地媒体库目录或同步路径")
+            return None
+
+        async with redis_lock(
+            REDIS_KEY_FILES_WRITE_LOCK, FILES_WRITE_LOCK_TTL_SECONDS
+        ) as acquired:
+            if not acquired:
+                logger.info("【全量同步】其他进程正在写入文件索引，跳过")
+                return None
+            try:
+                counts = await self._sync_tree(
+                    root,
+                    base_url,
+                    Path(media_dir),
+                    config.full_sync.overwrite_mode == "always",
+                    config.full_sync.min_file_size or 0,
+                    {ext.lower().lstrip(".") for ext in config.base.user_rmt_mediaext},
+                    config.full_sync.detail_log,
+                )
+            except Exception as exc:
+                logger.error(f"【全量同步】同步失败: {exc}")
+                metrics.incr("sync.full.failed")
+                return None
+        logger.info(
+            f"【全量同步】完成: 生成 {counts['written']} 个 STRM，"
+            f"跳过 {counts['skipped']} 个，新入库 {counts['indexed']} 个"
+        )
+        return counts
+
+    async def _sync_tree(
+        self,
+        root: str,
+        base_url: str,
+        media_dir: Path,
+        overwrite: bool,
+        min_size: int,
+        exts: set[str],
+        detail_log: bool,
+    ) -> dict[str, int]:
+        counts = {"written": 0, "skipped": 0, "indexed": 0}
+        root_path = PurePosixPath("/") / root.strip("/")
+        cid = await self.resolve_dir_id(str(root_path))
+        async for dir_path, item in self.iter_tree(cid, str(root_path)):
+            name = item.get("n", "")
+            cloud_path = PurePosixPath(dir_path) / name
+            size = int(item.get("s") or 0)
+            if cloud_path.suffix[1:].lower() not in exts or size < min_size:
+                continue
+            relative = cloud_path.relative_to(root_path)
+            local_path = media_dir / relative.with_suffix(".strm")
+            pick_code = item.get("pc", "")
+            written = await asyncio.to_thread(
+                _write_strm,
+                local_path,
+                self.build_strm_url(base_url, pick_code),
+                overwrite,
+            )
+            counts["written" if written else "skipped"] += 1
+            if written and detail_log:
+                logger.info(f"【全量同步】生成 STRM: {local_path}")
+            if await FileService.pick_code_exists(pick_code):
+                continue
+            file = File(
+                file_id=int(item["fid"]),
+                parent_id=int(item.get("cid") or 0),
+                name=name,
+                sha1=(item.get("sha") or "").upper(),
+                size=size,
+                pick_code=pick_code,
+                ctime=int(item.get("tp") or 0),
+                mtime=int(item.get("te") or 0),
+                path=str(cloud_path),
+                local_path=str(local_path),
+            )
+            try:
+                await FileService.add_file(file)
+            except DuplicateKeyError:
+                # 同一路径的文件已被替换（重新上传后提取码变化），以新文件为准
+                await FileService.replace_file(file)
+            counts["indexed"] += 1
+        metrics.incr("sync.full.strm_written", counts["written"])
+        metrics.incr("sync.full.indexed", counts["indexed"])
+        return counts
+
+
+strm_sync_helper = StrmSyncHelper()
@@ -27,6 +27,7 @@ class File(Document):
             IndexModel([("file_id", ASCENDING)], unique=True),
             IndexModel([("sha1", ASCENDING)]),
             IndexModel([("pick_code", ASCENDING)]),
+            IndexModel([("parent_id", ASCENDING), ("name", ASCENDING)]),
             IndexModel([("path", ASCENDING)], unique=True),
             IndexModel([("local_path", ASCENDING)], unique=True),
         ]
@@ -3,14 +3,58 @@ from datetime import datetime
 from pydantic import BaseModel, ConfigDict, Field
 
 
+class P115AccountStatus(BaseModel):
+    """
+    115 账号（多账号调度）状态
+    """
+
+    account: str = Field(..., description="账号标识，default 为默认账号")
+    app: str | None = Field(default=None, description="登入设备/应用")
+    updated_at: datetime | None = Field(default=None, description="登入时间（UTC）")
+    quarantined_seconds: float = Field(
+        default=0, description="被限流隔离的剩余秒数，0 表示可调度"
+    )
+
+
 class P115StatusResponse(BaseModel):
     """
     115 登入状态响应
     """
 
-    logged_in: bool = Field(..., description="是否已登入")
+    logged_in: bool = Field(..., description="默认账号是否已登入")
     app: str | None = Field(default=None, description="登入设备/应用")
     updated_at: datetime | None = Field(default=None, description="登入时间（UTC）")
+    accounts: list[P115AccountStatus] = Field(
+        default_factory=list, description="全部已登入账号"
+    )
+
+
+class P115HealthEvent(BaseModel):
+    """
+    115 cookies 健康检查失败记录
+    """
+
+    at: datetime = Field(..., description="探测时间（UTC）")
+    state: str = Field(..., description="探测结果：degraded / invalid")
+    error: str = Field(default="", description="失败原因")
+
+
+class P115HealthResponse(BaseModel):
+    """
+    115 账号 cookies 健康状态
+    """
+
+    account: str = Field(..., description="账号标识")
+    state: str = Field(
+        ..., description="健康状态：unknown / healthy / degraded / invalid"
+    )
+    checked_at: datetime | None = Field(default=None, description="最近探测时间")
+    last_ok_at: datetime | None = Field(default=None, description="最近成功时间")
+    consecutive_failures: int = Field(default=0, description="连续失败次数")
+    last_error: str | None = Field(default=None, description="最近失败原因")
+    history: list[P115HealthEvent] = Field(
+        default_factory=list, description="最近失败历史（新在前）"
+    )
 
 
 class P115QrcodeTokenResponse(BaseModel):
@@ -0,0 +1,62 @@
+from datetime import datetime
+
+from pydantic import BaseModel, Field
+
+
+class StatsExtensionItem(BaseModel):
+    """
+    扩展名统计项
+    """
+
+    extension: str = Field(..., description="扩展名（小写，无点）")
+    count: int = Field(default=0, description="文件数")
+    size: int = Field(default=0, description="总字节数")
+
+
+class StatsSizeBucket(BaseModel):
+    """
+    文件大小直方图分桶
+    """
+
+    label: str = Field(..., description="分桶区间，如 1GB-4GB")
+    count: int = Field(default=0, description="文件数")
+    size: int = Field(default=0, description="总字节数")
+
+
+class StatsDirectoryItem(BaseModel):
+    """
+    目录统计项
+    """
+
+    path: str = Field(..., description="网盘目录路径")
+    count: int = Field(default=0, description="目录下（递归）文件数")
+    size: int = Field(default=0, description="目录下（递归）总字节数")
+
+
+class StatsOverviewResponse(BaseModel):
+    """
+    媒体库统计概览
+    """
+
+    total_files: int = Field(default=0, description="文件总数")
+    total_size: int = Field(default=0, description="总字节数")
+    updated_at: datetime | None = Field(default=None, description="汇总更新时间")
+    extensions: list[StatsExtensionItem] = Field(
+        default_factory=list, description="扩展名分布（按文件数降序）"
+    )
+    size_histogram: list[StatsSizeBucket] = Field(
+        default_factory=list, description="文件大小直方图"
+    )
+    largest_directories: list[StatsDirectoryItem] = Field(
+        default_factory=list, description="最大目录（按大小降序）"
+    )
+
+
+class StatsSnapshot(BaseModel):
+    """
+    每日快照
+    """
+
+    date: str = Field(..., description="日期（YYYY-MM-DD）")
+    total_files: int = Field(default=0, description="文件总数")
+    total_size: int = Field(default=0, description="总字节数")
@@ -0,0 +1,59 @@
+from typing import Any
+
+from pydantic import BaseModel, Field
+
+
+class FilterStatsResponse(BaseModel):
+    """
+    存在性过滤器统计
+    """
+
+    name: str = Field(..., description="过滤器名称（sha1 / pick_code）")
+    ready: bool = Field(..., description="是否已构建完成")
+    capacity: int = Field(..., description="预期元素数量")
+    count: int = Field(..., description="已写入元素数（含增量）")
+    estimated_count: int | None = Field(
+        default=None, description="按位图填充率估算的元素数"
+    )
+    size_bits: int = Field(..., description="位图大小（位）")
+    hashes: int = Field(..., description="哈希函数个数")
+    memory_bytes: int = Field(..., description="Redis 中位图占用字节数")
+    fill_ratio: float = Field(..., description="位图填充率")
+    target_error_rate: float = Field(..., description="目标误判率")
+    false_positive_rate: float = Field(..., description="按填充率计算的当前误判率")
+    expected_false_positive_rate: float = Field(
+        ..., description="按元素数计算的理论误判率"
+    )
+    built_at: str | None = Field(default=None, description="最近一次重建时间")
+
+
+class TimingStats(BaseModel):
+    """
+    数值分布统计（最近样本窗口）
+    """
+
+    count: int = Field(default=0, description="累计样本数")
+    avg: float | None = Field(default=None, description="平均值")
+    max: float | None = Field(default=None, description="最大值")
+    p50: float | None = Field(default=None, description="P50")
+    p95: float | None = Field(default=None, description="P95")
+    p99: float | None = Field(default=None, description="P99")
+
+
+class MetricsResponse(BaseModel):
+    """
+    当前 worker 进程的运行指标
+    """
+
+    pid: int = Field(..., description="进程 ID（指标按进程独立统计）")
+    counters: dict[str, int] = Field(default_factory=dict, description="计数器")
+    gauges: dict[str, float] = Field(default_factory=dict, description="瞬时值")
+    timings: dict[str, TimingStats] = Field(
+        default_factory=dict, description="耗时/数值分布"
+    )
+    strm: dict[str, Any] = Field(
+        default_factory=dict, description="STRM 下载链接解析与合并统计"
+    )
+    caches: dict[str, dict[str, Any]] = Field(
+        default_factory=dict, description="各命名空间两级缓存命中率"
+    )
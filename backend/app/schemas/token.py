@@ -7,9 +7,27 @@ class Token(BaseModel):
     """
 
     access_token: str = Field(..., description="访问令牌")
+    refresh_token: str | None = Field(default=None, description="刷新令牌")
     token_type: str = Field(default="bearer", description="令牌类型")
 
 
+class RefreshTokenRequest(BaseModel):
+    """
+    刷新令牌请求
+    """
+
+    refresh_token: str = Field(..., description="刷新令牌")
+
+
+class StreamToken(BaseModel):
+    """
+    SSE 令牌响应
+    """
+
+    token: str = Field(..., description="短期令牌，作为 token 查询参数传入 SSE 接口")
+    expires_in: int = Field(..., description="有效期（秒）")
+
+
 class TokenPayload(BaseModel):
     """
     JWT 载荷
@@ -0,0 +1,75 @@
+from app.core.bloom import file_filter
+from app.models.file import File
+from app.services.stats import StatsService
+
+
+class FileService:
+    """
+    文件索引相关业务逻辑
+    """
+
+    @staticmethod
+    async def sha1_exists(sha1: str) -> bool:
+        """
+        判断 sha1 是否已入库。过滤器否定时直接返回，不访问 MongoDB。
+
+        :param sha1: 文件 SHA1
+        :return: 是否存在
+        """
+        if not await file_filter.might_contain_sha1(sha1):
+            return False
+        return await File.find_one(File.sha1 == sha1.upper()) is not None
+
+    @staticmethod
+    async def pick_code_exists(pick_code: str) -> bool:
+        """
+        判断 pick_code 是否已入库。过滤器否定时直接返回，不访问 MongoDB。
+
+        :param pick_code: 115 提取码
+        :return: 是否存在
+        """
+        if not await file_filter.might_contain_pick_code(pick_code):
+            return False
+        return await File.find_one(File.pick_code == pick_code) is not None
+
+    @staticmethod
+    async def add_file(file: File) -> File:
+        """
+        写入文件索引并同步更新存在性过滤器与统计汇总。
+
+        :param file: 文件文档
+        :return: 写入后的文件文档
+        """
+        await file.insert()
+        if not file.is_dir:
+            await file_filter.add_file(file.sha1, file.pick_code)
+            await StatsService.record_files([file])
+        return file
+
+    @staticmethod
+    async def replace_file(file: File) -> File:
+        """
+        删除与新文件 file_id、路径或本地路径冲突的旧索引后写入新文件。
+
+        :param file: 文件文档
+        :return: 写入后的文件文档
+        """
+        conflicts: list[dict] = [{"file_id": file.file_id}, {"path": file.path}]
+        if file.local_path:
+            conflicts.append({"local_path": file.local_path})
+        stale = await File.find({"$or": conflicts}).to_list()
+        for old in stale:
+            await FileService.remove_file(old)
+        return await FileService.add_file(file)
+
+    @staticmethod
+    async def remove_file(file: File) -> None:
+        """
+        删除文件索引并回退统计汇总（过滤器在每日重建时清理）。
+
+        :param file: 文件文档
+        :return: None
+        """
+        await file.delete()
+        if not file.is_dir:
+            await StatsService.record_files([file], sign=-1)
@@ -0,0 +1,361 @@
+import asyncio
+from bisect import bisect_right
+from collections import defaultdict
+from pathlib import PurePosixPath
+from typing import Any, Iterable
+
+from pymongo import ASCENDING, DESCENDING, UpdateOne
+
+from app.core.config import cfg
+from app.core.lock import (
+    FILES_WRITE_LOCK_TTL_SECONDS,
+    REDIS_KEY_FILES_WRITE_LOCK,
+    redis_lock,
+)
+from app.core.logger import logger
+from app.db.database import db
+from app.models.file import File
+from app.utils.timezone import TimezoneUtils
+
+
+FILES_COLLECTION_NAME = "files"
+ROLLUP_COLLECTION_NAME = "stats_rollup"
+DIRS_COLLECTION_NAME = "stats_dirs"
+DAILY_COLLECTION_NAME = "stats_daily"
+TOTAL_DOC_ID = "total"
+
+# 文件大小直方图分桶边界（字节），共 len(SIZE_BUCKETS) + 1 个桶
+SIZE_BUCKETS: tuple[int, ...] = (
+    1 << 20,
+    100 << 20,
+    1 << 30,
+    4 << 30,
+    10 << 30,
+    20 << 30,
+    50 << 30,
+)
+SIZE_BUCKET_LABELS: tuple[str, ...] = (
+    "<1MB",
+    "1MB-100MB",
+    "100MB-1GB",
+    "1GB-4GB",
+    "4GB-10GB",
+    "10GB-20GB",
+    "20GB-50GB",
+    ">=50GB",
+)
+
+
+_rebuild_task: asyncio.Task | None = None
+
+
+def _coll(name: str):
+    return db.get_mongo_client()[cfg.mongodb.db_name][name]
+
+
+def _extension(name: str) -> str:
+    suffix = PurePosixPath(name).suffix
+    return suffix[1:].lower() if suffix else ""
+
+
+def _size_bucket(size: int) -> int:
+    return bisect_right(SIZE_BUCKETS, size)
+
+
+def _ancestor_dirs(path: str) -> list[str]:
+    parents = PurePosixPath(path).parents
+    return [str(p) for p in parents if str(p) not in ("/", ".")]
+
+
+class _Totals:
+    """
+    汇总增量累加器：总量、扩展名、大小分桶与各级目录的 (文件数, 大小)
+    """
+
+    __slots__ = ("total", "ext", "buckets", "dirs")
+
+    def __init__(self) -> None:
+        self.total = {"files": 0, "size": 0}
+        self.ext: dict[str, list[int]] = defaultdict(lambda: [0, 0])
+        self.buckets: dict[int, list[int]] = defaultdict(lambda: [0, 0])
+        self.dirs: dict[str, list[int]] = defaultdict(lambda: [0, 0])
+
+    def add(self, name: str, size: int, path: str, sign: int) -> None:
+        self.total["files"] += sign
+        self.total["size"] += sign * size
+        for acc in (
+            self.ext[_extension(name)],
+            self.buckets[_size_bucket(size)],
+            *(self.dirs[d] for d in _ancestor_dirs(path)),
+        ):
+            acc[0] += sign
+            acc[1] += sign * size
+
+
+class StatsService:
+    """
+    媒体库统计：同步流程维护汇总文档，接口只读取预计算结果
+    """
+
+    @staticmethod
+    async def ensure_indexes() -> None:
+        """
+        创建统计集合索引。
+
+        :return: None
+        """
+        await StatsService._ensure_dir_indexes(DIRS_COLLECTION_NAME)
+
+    @staticmethod
+    async def _ensure_dir_indexes(name: str) -> None:
+        await _coll(name).create_index([("depth", ASCENDING), ("size", DESCENDING)])
+        await _coll(name).create_index([("size", DESCENDING)])
+
+    @staticmethod
+    async def record_files(files: Iterable[File], sign: int = 1) -> None:
+        """
+        按文件增量更新汇总文档（同步流程入库 / 删除后调用）。
+
+        :param files: 文件文档
+        :param sign: 1 为新增，-1 为删除
+        :return: None
+        """
+        totals = _Totals()
+        for file in files:
+            if not file.is_dir:
+                totals.add(file.name, file.size, file.path, sign)
+        if not totals.total["files"]:
+            return
+        await StatsService._apply(
+            totals, ROLLUP_COLLECTION_NAME, DIRS_COLLECTION_NAME
+        )
+
+    @staticmethod
+    async def ensure_rollups() -> None:
+        """
+        启动时检查汇总是否存在，不存在（首次部署）时后台从 files 集合重建。
+
+        :return: None
+        """
+        global _rebuild_task
+        try:
+            exists = await _coll(ROLLUP_COLLECTION_NAME).count_documents(
+                {"_id": TOTAL_DOC_ID}, limit=1
+            )
+        except Exception as exc:
+            logger.warning(f"【Stats】检查汇总状态失败: {exc}")
+            return
+        if not exists:
+            _rebuild_task = asyncio.create_task(StatsService.rebuild())
+
+    @staticmethod
+    async def rebuild() -> dict[str, int] | None:
+        """
+        从 files 集合全量重建汇总文档（首次部署或汇总漂移后执行）。
+
+        先写入临时集合再原子替换，重建期间接口仍读取旧汇总；与全量同步共用
+        files 写入锁，避免重建窗口内的增量更新丢失。
+
+        :return: 文件总数与总大小，其他进程持有写入锁时返回 None
+        """
+        async with redis_lock(
+            REDIS_KEY_FILES_WRITE_LOCK, FILES_WRITE_LOCK_TTL_SECONDS
+        ) as acquired:
+            if not acquired:
+                logger.info("【Stats】其他进程正在写入文件索引，跳过重建")
+                return None
+            totals = _Totals()
+            batch_size = cfg.filter.rebuild_batch_size
+            cursor = (
+                _coll(FILES_COLLECTION_NAME)
+                .find({"is_dir": False}, {"_id": 0, "name": 1, "size": 1, "path": 1})
+                .batch_size(batch_size)
+            )
+            while batch := await cursor.to_list(length=batch_size):
+                for doc in batch:
+                    totals.add(
+                        doc.get("name", ""), doc.get("size", 0), doc["path"], 1
+                    )
+
+            rollup_tmp = f"{ROLLUP_COLLECTION_NAME}_rebuild"
+            dirs_tmp = f"{DIRS_COLLECTION_NAME}_rebuild"
+            await _coll(rollup_tmp).drop()
+            await _coll(dirs_tmp).drop()
+            await StatsService._apply(totals, rollup_tmp, dirs_tmp)
+            await _coll(rollup_tmp).rename(ROLLUP_COLLECTION_NAME, dropTarget=True)
+            if totals.dirs:
+                await StatsService._ensure_dir_indexes(dirs_tmp)
+                await _coll(dirs_tmp).rename(DIRS_COLLECTION_NAME, dropTarget=True)
+            else:
+                await _coll(DIRS_COLLECTION_NAME).delete_many({})
+        logger.info(
+            f"【Stats】汇总重建完成: files={totals.total['files']} "
+            f"size={totals.total['size']}"
+        )
+        return dict(totals.total)
+
+    @staticmethod
+    async def _apply(totals: _Totals, rollup_name: str, dirs_name: str) -> None:
+        now = TimezoneUtils.now_utc()
+        rollup_ops = [
+            UpdateOne(
+                {"_id": TOTAL_DOC_ID},
+                {"$inc": totals.total, "$set": {"updated_at": now}},
+                upsert=True,
+            )
+        ]
+        rollup_ops.extend(
+            UpdateOne(
+                {"_id": f"ext:{ext}"},
+                {
+                    "$inc": {"count": count, "size": size},
+                    "$set": {"kind": "ext", "key": ext},
+                },
+                upsert=True,
+            )
+            for ext, (count, size) in totals.ext.items()
+        )
+        rollup_ops.extend(
+            UpdateOne(
+                {"_id": f"size:{bucket}"},
+                {
+                    "$inc": {"count": count, "size": size},
+                    "$set": {
+                        "kind": "size",
+                        "key": SIZE_BUCKET_LABELS[bucket],
+                        "bucket": bucket,
+                    },
+                },
+                upsert=True,
+            )
+            for bucket, (count, size) in totals.buckets.items()
+        )
+        dir_ops = [
+            UpdateOne(
+                {"_id": path},
+                {
+                    "$inc": {"count": count, "size": size},
+                    "$set": {"depth": path.count("/")},
+                },
+                upsert=True,
+            )
+            for path, (count, size) in totals.dirs.items()
+        ]
+        await _coll(rollup_name).bulk_write(rollup_ops, ordered=False)
+        if dir_ops:
+            await _coll(dirs_name).bulk_write(dir_ops, ordered=False)
+
+    @staticmethod
+    async def get_overview(
+        dir_depth: int | None = None, dir_limit: int = 10
+    ) -> dict[str, Any]:
+        """
+        读取汇总统计：总量、扩展名分布、大小直方图与最大目录。
+
+        :param dir_depth: 仅统计指定层级的目录（根下第一层为 1），None 不限制
+        :param dir_limit: 返回的最大目录数
+        :return: 统计字典
+        """
+        total: dict[str, Any] = {}
+        extensions: list[dict[str, Any]] = []
+        buckets: dict[int, dict[str, Any]] = {}
+        async for doc in _coll(ROLLUP_COLLECTION_NAME).find():
+            kind = doc.get("kind")
+            if doc["_id"] == TOTAL_DOC_ID:
+                total = doc
+            elif kind == "ext" and doc.get("count", 0) > 0:
+                extensions.append(
+                    {
+                        "extension": doc["key"],
+                        "count": doc["count"],
+                        "size": doc["size"],
+                    }
+                )
+            elif kind == "size":
+                buckets[doc["bucket"]] = doc
+        extensions.sort(key=lambda e: e["count"], reverse=True)
+        histogram = [
+            {
+                "label": label,
+                "count": buckets.get(i, {}).get("count", 0),
+                "size": buckets.get(i, {}).get("size", 0),
+            }
+            for i, label in enumerate(SIZE_BUCKET_LABELS)
+        ]
+
+        directories: list[dict[str, Any]] = []
+        if dir_limit > 0:
+            query = {} if dir_depth is None else {"depth": dir_depth}
+            cursor = (
+                _coll(DIRS_COLLECTION_NAME)
+                .find(query)
+                .sort("size", DESCENDING)
+                .limit(dir_limit)
+            )
+            directories = [
+                {"path": d["_id"], "count": d["count"], "size": d["size"]}
+                async for d in cursor
+            ]
+        return {
+            "total_files": total.get("files", 0),
+            "total_size": total.get("size", 0),
+            "updated_at": total.get("updated_at"),
+            "extensions": extensions,
+            "size_histogram": histogram,
+            "largest_directories": directories,
+        }
+
+    @staticmethod
+    async def get_growth(days: int = 30) -> list[dict[str, Any]]:
+        """
+        读取最近 days 天的每日快照，按日期升序。
+
+        :param days: 天数
+        :return: 快照列表
+        """
+        cursor = (
+            _coll(DAILY_COLLECTION_NAME)
+            .find({}, {"extensions": 0})
+            .sort("_id", DESCENDING)
+            .limit(days)
+        )
+        snapshots = [
+            {
+                "date": d["_id"],
+                "total_files": d.get("total_files", 0),
+                "total_size": d.get("total_size", 0),
+            }
+            async for d in cursor
+        ]
+        snapshots.reverse()
+        return snapshots
+
+    @staticmethod
+    async def write_daily_snapshot() -> None:
+        """
+        将当前汇总写入当日快照（按项目时区取日期，重复执行覆盖当日）。
+
+        :return: None
+        """
+        overview = await StatsService.get_overview(dir_limit=0)
+        date = TimezoneUtils.now_local(cfg.app.timezone).date().isoformat()
+        await _coll(DAILY_COLLECTION_NAME).update_one(
+            {"_id": date},
+            {
+                "$set": {
+                    "total_files": overview["total_files"],
+                    "total_size": overview["total_size"],
+                    "extensions": {
+                        e["extension"] or "-": e["count"]
+                        for e in overview["extensions"]
+                    },
+                    "size_histogram": [b["count"] for b in overview["size_histogram"]],
+                    "created_at": TimezoneUtils.now_utc(),
+                }
+            },
+            upsert=True,
+        )
+        logger.info(
+            f"【Stats】已写入 {date} 快照: files={overview['total_files']} "
+            f"size={overview['total_size']}"
+        )
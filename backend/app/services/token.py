@@ -0,0 +1,141 @@
+import secrets
+from hashlib import sha256
+from time import time
+
+from app.core.config import cfg
+from app.core.logger import logger
+from app.core.metrics import metrics
+from app.db.database import db
+
+
+REDIS_KEY_REFRESH_TOKEN_PREFIX = "auth:refresh:token"
+REDIS_KEY_REFRESH_USER_PREFIX = "auth:refresh:user"
+REDIS_KEY_REFRESH_EXPIRY = "auth:refresh:expiry"
+REFRESH_SWEEP_BATCH_SIZE = 500
+
+
+def _digest(token: str) -> str:
+    return sha256(token.encode("utf-8")).hexdigest()
+
+
+class RefreshTokenService:
+    """
+    刷新令牌：Redis 只保存令牌摘要
+
+    - auth:refresh:token:{digest} → 用户 ID，带 TTL
+    - auth:refresh:user:{user_id}：该用户有效令牌的有序集合，分数为过期时间戳
+    - auth:refresh:expiry：全部令牌的有序集合（成员 user_id:digest），供定时清理按分数扫描
+    """
+
+    @staticmethod
+    async def issue(user_id: str) -> str:
+        """
+        为用户签发刷新令牌。
+
+        :param user_id: 用户 ID
+        :return: 刷新令牌明文（仅返回给客户端一次）
+        """
+        token = secrets.token_urlsafe(32)
+        digest = _digest(token)
+        ttl = cfg.auth.refresh_token_expire_days * 86400
+        expires_at = time() + ttl
+        pipe = db.get_redis().pipeline(transaction=True)
+        pipe.set(f"{REDIS_KEY_REFRESH_TOKEN_PREFIX}:{digest}", user_id, ex=ttl)
+        pipe.zadd(f"{REDIS_KEY_REFRESH_USER_PREFIX}:{user_id}", {digest: expires_at})
+        pipe.expire(f"{REDIS_KEY_REFRESH_USER_PREFIX}:{user_id}", ttl)
+        pipe.zadd(REDIS_KEY_REFRESH_EXPIRY, {f"{user_id}:{digest}": expires_at})
+        await pipe.execute()
+        metrics.incr("auth.refresh.issued")
+        return token
+
+    @staticmethod
+    async def rotate(token: str) -> tuple[str, str] | None:
+        """
+        使用刷新令牌换取新令牌，旧令牌立即作废（一次性使用）。
+
+        :param token: 刷新令牌明文
+        :return: (用户 ID, 新刷新令牌)，令牌无效或已使用时返回 None
+        """
+        user_id = await RefreshTokenService.revoke(token)
+        if user_id is None:
+            metrics.incr("auth.refresh.rejected")
+            return None
+        metrics.incr("auth.refresh.rotated")
+        return user_id, await RefreshTokenService.issue(user_id)
+
+    @staticmethod
+    async def revoke(token: str) -> str | None:
+        """
+        吊销刷新令牌。
+
+        :param token: 刷新令牌明文
+        :return: 令牌所属用户 ID，令牌无效时返回 None
+        """
+        digest = _digest(token)
+        redis = db.get_redis()
+        # GETDEL 保证并发使用同一令牌时只有一个请求成功
+        user_id = await redis.getdel(f"{REDIS_KEY_REFRESH_TOKEN_PREFIX}:{digest}")
+        if user_id is None:
+            return None
+        pipe = redis.pipeline(transaction=False)
+        pipe.zrem(f"{REDIS_KEY_REFRESH_USER_PREFIX}:{user_id}", digest)
+        pipe.zrem(REDIS_KEY_REFRESH_EXPIRY, f"{user_id}:{digest}")
+        await pipe.execute()
+        return user_id
+
+    @staticmethod
+    async def revoke_all(user_id: str) -> int:
+        """
+        吊销用户的全部刷新令牌（修改密码、禁用账号时调用）。
+
+        :param user_id: 用户 ID
+        :return: 吊销的令牌数
+        """
+        redis = db.get_redis()
+        user_key = f"{REDIS_KEY_REFRESH_USER_PREFIX}:{user_id}"
+        digests = await redis.zrange(user_key, 0, -1)
+        if not digests:
+            return 0
+        pipe = redis.pipeline(transaction=False)
+        pipe.delete(
+            *(f"{REDIS_KEY_REFRESH_TOKEN_PREFIX}:{digest}" for digest in digests)
+        )
+        pipe.zrem(
+            REDIS_KEY_REFRESH_EXPIRY, *(f"{user_id}:{digest}" for digest in digests)
+        )
+        pipe.delete(user_key)
+        await pipe.execute()
+        metrics.incr("auth.refresh.revoked_all")
+        return len(digests)
+
+    @staticmethod
+    async def cleanup_expired(batch_size: int = REFRESH_SWEEP_BATCH_SIZE) -> int:
+        """
+        按过期时间分批清理索引中已过期的刷新令牌（令牌键本身由 TTL 过期）。
+
+        :param batch_size: 每批清理条数
+        :return: 清理的令牌数
+        """
+        redis = db.get_redis()
+        now = time()
+        removed = 0
+        while True:
+            members = await redis.zrangebyscore(
+                REDIS_KEY_REFRESH_EXPIRY, "-inf", now, start=0, num=batch_size
+            )
+            if not members:
+                break
+            pipe = redis.pipeline(transaction=False)
+            for member in members:
+                user_id, _, digest = member.rpartition(":")
+                pipe.zrem(f"{REDIS_KEY_REFRESH_USER_PREFIX}:{user_id}", digest)
+                pipe.delete(f"{REDIS_KEY_REFRESH_TOKEN_PREFIX}:{digest}")
+            pipe.zrem(REDIS_KEY_REFRESH_EXPIRY, *members)
+            await pipe.execute()
+            removed += len(members)
+            if len(members) < batch_size:
+                break
+        if removed:
+            metrics.incr("auth.refresh.expired", removed)
+            logger.info(f"已清理 {removed} 个过期刷新令牌")
+        return removed
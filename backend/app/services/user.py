@@ -1,13 +1,26 @@
 import secrets
+from typing import Any
 
 from beanie import PydanticObjectId
 
+from app.core.cache import TwoTierCache
+from app.core.config import cfg
 from app.core.logger import logger
 from app.core.security import SecurityCore
+from app.services.token import RefreshTokenService
 from app.utils.timezone import TimezoneUtils
 from app.models.user import User
 
 
+# 已认证用户缓存（按用户 ID），用户信息变更时广播失效
+user_cache: TwoTierCache[dict[str, Any]] = TwoTierCache(
+    "users",
+    ttl=cfg.auth.user_cache_ttl_seconds,
+    local_ttl=cfg.auth.user_cache_local_ttl_seconds,
+    beta=0,
+)
+
+
 class UserService:
     """
     用户相关业务逻辑
@@ -29,10 +42,11 @@ class UserService:
         :param role: 角色（admin / user）
         :param is_active: 是否启用
         :return: 创建的用户文档
+        :raises ExecutorSaturatedError: 密码哈希线程池已满时
         """
         user = User(
             username=username,
-            hashed_password=SecurityCore.hash_password(password),
+            hashed_password=await SecurityCore.hash_password_async(password),
             role="admin" if role == "admin" else "user",
             is_active=is_active,
         )
@@ -49,6 +63,30 @@ class UserService:
         """
         return await User.get(PydanticObjectId(user_id))
 
+    @staticmethod
+    async def get_principal(user_id: str) -> User | None:
+        """
+        获取已认证请求的当前用户（两级缓存，避免每个请求都读 MongoDB）。
+
+        返回的文档仅用于鉴权与只读展示，修改用户请使用 update_user。
+        缓存中不含密码哈希，返回文档的 hashed_password 为空串，不可用于校验密码或保存。
+
+        :param user_id: 用户 ID 字符串
+        :return: 用户文档或 None
+        """
+        data = await UserService._load_principal(user_id)
+        if data is None:
+            return None
+        return User.model_validate({**data, "hashed_password": ""})
+
+    @staticmethod
+    @user_cache.cached(lambda user_id: user_id)
+    async def _load_principal(user_id: str) -> dict[str, Any] | None:
+        user = await UserService.get_user_by_id(user_id)
+        if user is None:
+            return None
+        return user.model_dump(mode="json", exclude={"hashed_password"})
+
     @staticmethod
     async def list_users() -> list[User]:
         """
@@ -87,6 +125,7 @@ class UserService:
         :param role: 新角色 admin/user（可选）
         :param is_active: 是否启用（可选）
         :return: 更新后的用户文档或 None（用户不存在时）
+        :raises ExecutorSaturatedError: 密码哈希线程池已满时
         """
         user = await UserService.get_user_by_id(user_id)
         if not user:
@@ -94,13 +133,16 @@ class UserService:
         if username is not None:
             user.username = username
         if password is not None:
-            user.hashed_password = SecurityCore.hash_password(password)
+            user.hashed_password = await SecurityCore.hash_password_async(password)
         if role is not None:
             user.role = "admin" if role == "admin" else "user"
         if is_active is not None:
             user.is_active = is_active
         user.updated_at = TimezoneUtils.now_utc()
         await user.save()
+        await user_cache.invalidate(user_id)
+        if password is not None or is_active is False:
+            await RefreshTokenService.revoke_all(user_id)
         return user
 
     @staticmethod
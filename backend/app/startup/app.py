@@ -1,7 +1,8 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import ORJSONResponse
 
+from app.core.concurrency import ExecutorSaturatedError
 from app.core.config import cfg
 from app.api.v1.router import v1_router
 from app.middleware.logging import RequestLoggingMiddleware
@@ -30,6 +31,21 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
 
+    @app.exception_handler(ExecutorSaturatedError)
+    async def executor_saturated_handler(
+        request: Request, exc: ExecutorSaturatedError
+    ) -> ORJSONResponse:
+        """
+        专用线程池已满时快速失败，返回 503 并提示客户端稍后重试。
+
+        :return: 503 响应
+        """
+        return ORJSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"detail": str(exc)},
+            headers={"Retry-After": "1"},
+        )
+
     app.include_router(v1_router, prefix=cfg.app.api_v1_prefix)
 
     @app.get("/health")
@@ -31,6 +31,7 @@ def run_reload() -> None:
                 "8999",
                 "--reload-dir",
                 str(_BACKEND_DIR),
+                "--no-proxy-headers",
             ],
             cwd=_BACKEND_DIR,
         )
@@ -47,6 +48,8 @@ def create_server() -> UvicornServer:
         "port": 8999,
         "reload": cfg.app.debug,
         "timeout_graceful_shutdown": 60,
+        # 客户端 IP 由应用按 AUTH_TRUSTED_PROXIES 解析（app.api.deps.get_client_ip）
+        "proxy_headers": False,
     }
     if not cfg.app.debug:
         config_kwargs["workers"] = cpu_count() * 2 + 1
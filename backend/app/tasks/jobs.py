@@ -1,4 +1,8 @@
+from app.core.bloom import file_filter
 from app.core.logger import logger
+from app.core.p115health import cookie_health
+from app.services.stats import StatsService
+from app.services.token import RefreshTokenService
 
 
 async def cleanup_expired_tokens():
@@ -8,7 +12,7 @@ async def cleanup_expired_tokens():
     :return: None
     """
     logger.info("执行: cleanup_expired_tokens")
-    # TODO: 实现
+    await RefreshTokenService.cleanup_expired()
 
 
 async def daily_stats_report():
@@ -18,4 +22,24 @@ async def daily_stats_report():
     :return: None
     """
     logger.info("执行: daily_stats_report")
-    # TODO: 实现
+    await StatsService.write_daily_snapshot()
+
+
+async def rebuild_file_filters():
+    """
+    从 files 集合重建 sha1 / pick_code 过滤器，清除已删除文件留下的位，每天 04:00 执行。
+
+    :return: None
+    """
+    logger.info("执行: rebuild_file_filters")
+    await file_filter.rebuild()
+
+
+async def check_p115_cookies():
+    """
+    探测 115 账号 cookies 是否有效并预热账号信息缓存，按配置间隔执行。
+
+    :return: None
+    """
+    logger.debug("执行: check_p115_cookies")
+    await cookie_health.check_all()
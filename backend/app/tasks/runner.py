@@ -5,6 +5,7 @@ from apscheduler import AsyncScheduler
 from apscheduler.triggers.cron import CronTrigger
 from apscheduler.triggers.interval import IntervalTrigger
 
+from app.core.config import cfg
 from app.core.logger import logger
 from app.tasks import jobs
 
@@ -71,12 +72,23 @@ class TaskRunner:
             jobs.cleanup_expired_tokens,
             hours=1,
         )
+        await self.add_interval(
+            "check_p115_cookies",
+            jobs.check_p115_cookies,
+            minutes=cfg.p115.health_check_minutes,
+        )
         await self.add_cron(
             "daily_stats_report",
             jobs.daily_stats_report,
             hour=2,
             minute=0,
         )
+        await self.add_cron(
+            "rebuild_file_filters",
+            jobs.rebuild_file_filters,
+            hour=4,
+            minute=0,
+        )
         logger.info("定时任务已注册")
 
     async def start_background(self) -> None:
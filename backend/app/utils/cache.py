@@ -0,0 +1,68 @@
+from collections import OrderedDict
+from time import monotonic
+from typing import Generic, Hashable, TypeVar
+
+
+V = TypeVar("V")
+
+
+class TTLCache(Generic[V]):
+    """
+    进程内 LRU 缓存，每个条目独立过期
+    """
+
+    __slots__ = ("_data", "maxsize", "ttl")
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0) -> None:
+        self._data: OrderedDict[Hashable, tuple[float, V]] = OrderedDict()
+        self.maxsize = maxsize
+        self.ttl = ttl
+
+    def get(self, key: Hashable) -> V | None:
+        """
+        读取未过期的值并标记为最近使用
+
+        :param key: 键
+        :return: 值，不存在或已过期时返回 None
+        """
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at <= monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: V, ttl: float | None = None) -> None:
+        """
+        写入值，超出容量时淘汰最久未使用的条目
+
+        :param key: 键
+        :param value: 值
+        :param ttl: 过期秒数，不传则使用默认 ttl
+        """
+        self._data[key] = (monotonic() + (self.ttl if ttl is None else ttl), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Hashable) -> V | None:
+        """
+        删除并返回值
+
+        :param key: 键
+        :return: 值，不存在时返回 None
+        """
+        item = self._data.pop(key, None)
+        return None if item is None else item[1]
+
+    def clear(self) -> None:
+        """
+        清空缓存
+        """
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
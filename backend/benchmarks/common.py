@@ -0,0 +1,50 @@
+from time import perf_counter_ns
+from typing import Callable
+
+
+def percentile(samples: list[float], q: float) -> float:
+    """
+    计算分位数（最近秩）
+
+    :param samples: 样本
+    :param q: 分位（0~1）
+    :return: 分位数，无样本时为 0
+    """
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def report_latency(name: str, samples: list[float]) -> None:
+    """
+    打印延迟分布（秒 → 毫秒）
+
+    :param name: 场景名
+    :param samples: 每次请求耗时（秒）
+    """
+    print(
+        f"{name:<40} n={len(samples):<6} "
+        f"p50={percentile(samples, 0.50) * 1000:8.2f}ms "
+        f"p99={percentile(samples, 0.99) * 1000:8.2f}ms "
+        f"max={max(samples, default=0) * 1000:8.2f}ms"
+    )
+
+
+def bench_ns(name: str, func: Callable[[], object], number: int) -> float:
+    """
+    测量同步函数的单次耗时，取 5 轮中最快的一轮
+
+    :param name: 场景名
+    :param func: 无参函数
+    :param number: 每轮调用次数
+    :return: ns/op
+    """
+    best = float("inf")
+    for _ in range(5):
+        start = perf_counter_ns()
+        for _ in range(number):
+            func()
+        best = min(best, (perf_counter_ns() - start) / number)
+    print(f"{name:<40} {best:10.1f} ns/op")
+    return best
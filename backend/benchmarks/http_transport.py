@@ -0,0 +1,137 @@
+"""
+HttpTransport 基准：本地桩服务器模拟 115 接口与慢速下载流
+
+1. 连接复用：每次请求新建 AsyncClient（接入连接池前的行为）对比共享连接池
+2. 连接池隔离：长时间占用连接的代理流与接口调用共用 / 分开连接池时，
+   接口调用的延迟分布
+
+运行：cd backend && python -m benchmarks.http_transport
+"""
+
+import asyncio
+from time import perf_counter
+
+from httpx import AsyncClient
+
+from app.core.config import cfg
+from app.core.http import HttpTransport
+from benchmarks.common import report_latency
+
+
+API_BODY = b'{"state": true, "data": []}'
+STREAM_CHUNK = b"\0" * 16384
+STREAM_CHUNKS = 30
+STREAM_INTERVAL = 0.1
+REQUESTS = 500
+CONCURRENCY = 20
+POOL_SIZE = 16
+
+
+async def _handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    try:
+        while True:
+            head = await reader.readuntil(b"\r\n\r\n")
+            path = head.split(b" ", 2)[1]
+            if path.startswith(b"/stream"):
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\n"
+                    b"Content-Type: application/octet-stream\r\n"
+                    b"Content-Length: %d\r\n\r\n" % (len(STREAM_CHUNK) * STREAM_CHUNKS)
+                )
+                for _ in range(STREAM_CHUNKS):
+                    writer.write(STREAM_CHUNK)
+                    await writer.drain()
+                    await asyncio.sleep(STREAM_INTERVAL)
+            else:
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\n"
+                    b"Content-Type: application/json\r\n"
+                    b"Content-Length: %d\r\n\r\n" % len(API_BODY) + API_BODY
+                )
+                await writer.drain()
+    except (asyncio.IncompleteReadError, ConnectionError, asyncio.CancelledError):
+        pass
+    finally:
+        writer.close()
+
+
+async def _run_concurrently(
+    total: int, concurrency: int, call
+) -> tuple[list[float], float]:
+    latencies: list[float] = []
+    queue: asyncio.Queue[int] = asyncio.Queue()
+    for i in range(total):
+        queue.put_nowait(i)
+
+    async def worker() -> None:
+        while not queue.empty():
+            queue.get_nowait()
+            start = perf_counter()
+            await call()
+            latencies.append(perf_counter() - start)
+
+    start = perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, perf_counter() - start
+
+
+async def bench_reuse(base_url: str) -> None:
+    async def fresh_client() -> None:
+        async with AsyncClient() as client:
+            (await client.get(f"{base_url}/api")).json()
+
+    transport = HttpTransport()
+    await transport.open()
+
+    async def pooled() -> None:
+        await transport.request(url=f"{base_url}/api", parse=True)
+
+    try:
+        for name, call in (("新建客户端/请求", fresh_client), ("共享连接池", pooled)):
+            latencies, elapsed = await _run_concurrently(REQUESTS, CONCURRENCY, call)
+            report_latency(name, latencies)
+            print(f"{'':<40} {REQUESTS / elapsed:8.0f} req/s")
+    finally:
+        await transport.close()
+
+
+async def bench_isolation(base_url: str) -> None:
+    cfg.http.max_connections = POOL_SIZE
+    cfg.http.stream_max_connections = POOL_SIZE
+    for isolated in (False, True):
+        transport = HttpTransport()
+        await transport.open()
+        stream_client = transport.stream_client if isolated else transport.client
+
+        async def play() -> None:
+            async with stream_client.stream("GET", f"{base_url}/stream") as resp:
+                async for _ in resp.aiter_raw():
+                    pass
+
+        async def api() -> None:
+            await transport.request(url=f"{base_url}/api", parse=True)
+
+        try:
+            streams = [asyncio.create_task(play()) for _ in range(POOL_SIZE)]
+            await asyncio.sleep(0.2)
+            latencies, _ = await _run_concurrently(100, 4, api)
+            await asyncio.gather(*streams)
+        finally:
+            await transport.close()
+        name = "独立流连接池" if isolated else "共用连接池"
+        report_latency(f"{POOL_SIZE} 路代理流期间接口调用（{name}）", latencies)
+
+
+async def main() -> None:
+    server = await asyncio.start_server(_handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    base_url = f"http://127.0.0.1:{port}"
+    async with server:
+        print("== 连接复用 ==")
+        await bench_reuse(base_url)
+        print("== 连接池隔离 ==")
+        await bench_isolation(base_url)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
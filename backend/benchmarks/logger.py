@@ -0,0 +1,128 @@
+"""
+LoggerManager 调用方热路径微基准（ns/op）
+
+before 为优化前的调用路径（每次调用按配置计算级别、构造 Path 取调用者模块名、
+在调用线程拼接消息并同步输出控制台），after 为当前 LoggerManager。
+两者的文件写入均替换为空操作，只比较调用线程上的开销；控制台输出到 os.devnull。
+
+运行：cd backend && python -m benchmarks.logger
+"""
+
+import logging
+import os
+import sys
+import threading
+from pathlib import Path
+from typing import Dict
+
+from app.core.config import cfg
+from app.core.logger import REQUEST_ID_CTX_VAR, ColorFormatter, LoggerManager
+from benchmarks.common import bench_ns
+
+
+NUMBER = 100000
+
+
+class _NullFileHandler:
+    def write_log(self, *args, **kwargs) -> None:
+        pass
+
+
+class _LegacyLogger:
+    """
+    优化前的 LoggerManager 调用路径
+    """
+
+    _loggers: Dict[str, logging.Logger] = {}
+    _default_log_file = "app.log"
+    _lock = threading.Lock()
+    _file_handler = _NullFileHandler()
+    _devnull = open(os.devnull, "w")
+
+    @staticmethod
+    def _get_caller_name() -> str:
+        try:
+            frame = sys._getframe(3)
+            filepath = Path(frame.f_code.co_filename)
+            name = filepath.stem
+            if name == "__init__" and len(filepath.parts) >= 2:
+                name = filepath.parts[-2]
+            return name
+        except (AttributeError, ValueError):
+            return "unknown"
+
+    def _get_or_create_console_logger(self, name: str) -> logging.Logger:
+        if name in self._loggers:
+            return self._loggers[name]
+        with self._lock:
+            if name in self._loggers:
+                return self._loggers[name]
+            _logger = logging.getLogger(f"benchmark.legacy.{name}")
+            _logger.setLevel(self._get_log_level())
+            _logger.handlers.clear()
+            console = logging.StreamHandler(self._devnull)
+            console.setFormatter(ColorFormatter(cfg.log.console_format))
+            _logger.addHandler(console)
+            _logger.propagate = False
+            self._loggers[name] = _logger
+            return _logger
+
+    @staticmethod
+    def _get_log_level() -> int:
+        if cfg.app.debug:
+            return logging.DEBUG
+        return getattr(logging, cfg.log.level.upper(), logging.INFO)
+
+    def _log(self, method: str, msg: str, *args, **kwargs):
+        method_level = getattr(logging, method.upper(), logging.INFO)
+        if method_level < self._get_log_level():
+            return
+        caller_name = self._get_caller_name()
+        request_id = REQUEST_ID_CTX_VAR.get()
+        if args:
+            try:
+                message = msg % args
+            except (TypeError, ValueError):
+                message = f"{msg} {' '.join(str(a) for a in args)}"
+        else:
+            message = msg
+        formatted = f"[{request_id}] {caller_name} - {message}"
+        log_file = cfg.log.log_dir / self._default_log_file
+        self._file_handler.write_log(method.upper(), formatted, log_file, **kwargs)
+        _logger = self._get_or_create_console_logger(caller_name)
+        if hasattr(_logger, method):
+            getattr(_logger, method)(formatted, **kwargs)
+
+    def info(self, msg: str, *args, **kwargs):
+        self._log("info", msg, *args, **kwargs)
+
+    def debug(self, msg: str, *args, **kwargs):
+        self._log("debug", msg, *args, **kwargs)
+
+
+def main() -> None:
+    cfg.app.debug = False
+    cfg.log.level = "INFO"
+    LoggerManager._level = logging.INFO
+    LoggerManager._file_handler = _NullFileHandler()
+    before, after = _LegacyLogger(), LoggerManager()
+
+    for name, legacy, current in (
+        (
+            "过滤掉的 debug",
+            lambda: before.debug("【STRM】命中缓存 %s", "abc"),
+            lambda: after.debug("【STRM】命中缓存 %s", "abc"),
+        ),
+        (
+            "输出的 info（带参数）",
+            lambda: before.info("【STRM】解析下载地址 %s 耗时 %.3f", "abc", 0.1),
+            lambda: after.info("【STRM】解析下载地址 %s 耗时 %.3f", "abc", 0.1),
+        ),
+    ):
+        old = bench_ns(f"{name}（before）", legacy, NUMBER)
+        new = bench_ns(f"{name}（after）", current, NUMBER)
+        print(f"{'':<40} {old / new:10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+登录突发负载测试：经 ASGITransport 直接驱动应用，并发登录期间持续探测另一个接口的延迟
+
+对比 bcrypt 在事件循环内同步执行（接入专用线程池前的行为）与在有界线程池中执行时，
+/health 的延迟分布，以及线程池饱和时快速失败（503）的次数。
+
+需要 .env 中配置的 MongoDB 与 Redis 可用；运行期间创建一个临时用户，结束后删除。
+
+运行：cd backend && python -m benchmarks.login_burst
+"""
+
+import asyncio
+import secrets
+from collections import Counter
+from time import perf_counter
+
+from httpx import ASGITransport, AsyncClient
+
+from app.core.config import cfg
+from app.core.security import SecurityCore, password_executor
+from app.db.database import db
+from app.db.secret_key import ensure_secret_key
+from app.services.token import RefreshTokenService
+from app.services.user import UserService
+from app.startup.app import app
+from benchmarks.common import report_latency
+
+
+LOGINS = 64
+LOGIN_CONCURRENCY = 16
+PROBE_INTERVAL = 0.01
+PROBE_PATH = "/health"
+
+
+async def _inline_verify(plain: str, hashed: str) -> bool:
+    return SecurityCore.verify_password(plain, hashed)
+
+
+async def _probe(client: AsyncClient, stop: asyncio.Event) -> list[float]:
+    """
+    按固定间隔探测，延迟从计划发出时刻算起：事件循环被阻塞时探测请求
+    根本发不出去，只计请求本身耗时会漏掉这段停顿
+
+    :param client: 应用客户端
+    :param stop: 停止信号
+    :return: 每次探测的延迟（秒）
+    """
+    latencies: list[float] = []
+    due = perf_counter()
+    while True:
+        await client.get(PROBE_PATH)
+        latencies.append(perf_counter() - due)
+        if stop.is_set():
+            return latencies
+        due += PROBE_INTERVAL
+        await asyncio.sleep(max(0.0, due - perf_counter()))
+
+
+async def _burst(client: AsyncClient, username: str, password: str) -> Counter:
+    statuses: Counter = Counter()
+    remaining = LOGINS
+
+    async def worker() -> None:
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            resp = await client.post(
+                f"{cfg.app.api_v1_prefix}/auth/login",
+                json={"username": username, "password": password},
+            )
+            statuses[resp.status_code] += 1
+
+    await asyncio.gather(*(worker() for _ in range(LOGIN_CONCURRENCY)))
+    return statuses
+
+
+async def _scenario(
+    client: AsyncClient, name: str, username: str, password: str
+) -> None:
+    stop = asyncio.Event()
+    probe = asyncio.create_task(_probe(client, stop))
+    start = perf_counter()
+    statuses = await _burst(client, username, password)
+    elapsed = perf_counter() - start
+    stop.set()
+    report_latency(f"{PROBE_PATH}（{name}）", await probe)
+    print(
+        f"{'':<40} 登录 {LOGINS / elapsed:6.1f}/s  "
+        + "  ".join(f"{code}×{count}" for code, count in sorted(statuses.items()))
+    )
+
+
+async def main() -> None:
+    await db.connect()
+    cfg.set_secret_key(await ensure_secret_key(db.get_mongo_client()))
+    # 只测 bcrypt 对事件循环的影响，放开登录尝试次数限制
+    cfg.auth.login_user_limit = cfg.auth.login_ip_limit = LOGINS * 4
+    username, password = f"bench-{secrets.token_hex(4)}", secrets.token_urlsafe(16)
+    user = await UserService.create_user(username, password)
+    verify = SecurityCore.verify_password_async
+    transport = ASGITransport(app=app)
+    try:
+        async with AsyncClient(transport=transport, base_url="http://bench") as client:
+            stop = asyncio.Event()
+            probe = asyncio.create_task(_probe(client, stop))
+            await asyncio.sleep(1.0)
+            stop.set()
+            report_latency(f"{PROBE_PATH}（空闲）", await probe)
+            SecurityCore.verify_password_async = staticmethod(_inline_verify)
+            await _scenario(client, "事件循环内 bcrypt", username, password)
+            SecurityCore.verify_password_async = verify
+            await _scenario(
+                client,
+                f"线程池 {cfg.auth.hash_workers}+{cfg.auth.hash_queue_size}",
+                username,
+                password,
+            )
+    finally:
+        SecurityCore.verify_password_async = verify
+        await RefreshTokenService.revoke_all(str(user.id))
+        await user.delete()
+        password_executor.shutdown()
+        await db.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
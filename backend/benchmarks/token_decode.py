@@ -0,0 +1,43 @@
+"""
+JWT 解码微基准：已认证请求热路径上 decode_access_token 的单次 CPU 开销
+
+对比每次都经 python-jose 验签解析（缓存前的行为）与命中已验签令牌缓存时的 ns/op。
+
+运行：cd backend && python -m benchmarks.token_decode
+"""
+
+from jose import jwt
+
+from app.core import security
+from app.core.config import cfg
+from app.core.security import ALGORITHM, SecurityCore
+from benchmarks.common import bench_ns
+
+
+NUMBER = 20000
+
+
+def main() -> None:
+    cfg.set_secret_key("benchmark-secret-key")
+    token = SecurityCore.create_access_token("65f000000000000000000000")
+    key = cfg.get_secret_key()
+
+    def uncached() -> None:
+        jwt.decode(token, key, algorithms=[ALGORITHM])
+
+    def miss() -> None:
+        security._verified_tokens.clear()
+        SecurityCore.decode_access_token(token)
+
+    def hit() -> None:
+        SecurityCore.decode_access_token(token)
+
+    before = bench_ns("jose 验签解析（无缓存）", uncached, NUMBER)
+    bench_ns("decode_access_token 未命中", miss, NUMBER)
+    SecurityCore.decode_access_token(token)
+    after = bench_ns("decode_access_token 命中", hit, NUMBER)
+    print(f"{'每个已认证请求节省':<40} {before - after:10.1f} ns ({before / after:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
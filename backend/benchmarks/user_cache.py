@@ -0,0 +1,71 @@
+"""
+已认证用户解析基准：每个鉴权请求读 MongoDB 与两级缓存（Redis / 进程内）的延迟对比
+
+需要 .env 中配置的 MongoDB 与 Redis 可用；运行期间创建一个临时用户，结束后删除。
+
+运行：cd backend && python -m benchmarks.user_cache
+"""
+
+import asyncio
+import secrets
+from time import perf_counter
+
+from app.core.config import cfg
+from app.db.database import db
+from app.services.user import UserService, user_cache
+from benchmarks.common import report_latency
+
+
+REQUESTS = 2000
+CONCURRENCY = 50
+
+
+async def _measure(call, user_id: str) -> list[float]:
+    latencies: list[float] = []
+    remaining = REQUESTS
+
+    async def worker() -> None:
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            start = perf_counter()
+            await call(user_id)
+            latencies.append(perf_counter() - start)
+
+    await asyncio.gather(*(worker() for _ in range(CONCURRENCY)))
+    return latencies
+
+
+async def main() -> None:
+    await db.connect()
+    user = await UserService.create_user(
+        f"bench-{secrets.token_hex(4)}", secrets.token_urlsafe(16)
+    )
+    user_id = str(user.id)
+    local = user_cache._local
+    try:
+        report_latency(
+            "MongoDB（无缓存）", await _measure(UserService.get_user_by_id, user_id)
+        )
+        user_cache._local = None
+        await UserService.get_principal(user_id)
+        report_latency(
+            "Redis 缓存", await _measure(UserService.get_principal, user_id)
+        )
+        user_cache._local = local
+        await UserService.get_principal(user_id)
+        report_latency(
+            f"两级缓存（进程内 {cfg.auth.user_cache_local_ttl_seconds}s）",
+            await _measure(UserService.get_principal, user_id),
+        )
+        cached = await db.get_redis().get(user_cache.redis_key(user_id))
+        print(f"缓存条目含密码哈希: {'hashed_password' in (cached or '')}")
+    finally:
+        user_cache._local = local
+        await user_cache.invalidate(user_id)
+        await user.delete()
+        await db.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,78 @@
+import asyncio
+from datetime import timedelta
+
+import pytest
+from fastapi import HTTPException, Request
+
+from app.api import deps
+from app.core.config import cfg
+from app.core.security import STREAM_TOKEN_SCOPE, SecurityCore
+
+
+class FakeUser:
+    id = "u1"
+    role = "admin"
+    is_active = True
+
+
+@pytest.fixture(autouse=True)
+def principal(monkeypatch: pytest.MonkeyPatch) -> None:
+    async def get_principal(user_id: str) -> FakeUser | None:
+        return FakeUser() if user_id == "u1" else None
+
+    monkeypatch.setattr(deps.UserService, "get_principal", get_principal)
+
+
+def test_stream_token_only_opens_streams():
+    token = SecurityCore.create_access_token(
+        "u1", timedelta(seconds=60), scope=STREAM_TOKEN_SCOPE
+    )
+
+    assert asyncio.run(deps.get_stream_admin(token)).id == "u1"
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(deps.get_current_user(token))
+    assert exc_info.value.status_code == 401
+
+
+def test_access_token_cannot_open_streams():
+    token = SecurityCore.create_access_token("u1")
+
+    assert asyncio.run(deps.get_current_user(token)).id == "u1"
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(deps.get_stream_admin(token))
+    assert exc_info.value.status_code == 401
+
+
+def _request(peer: str, headers: dict[str, str] | None = None) -> Request:
+    return Request(
+        {
+            "type": "http",
+            "client": (peer, 50000),
+            "headers": [
+                (k.lower().encode(), v.encode()) for k, v in (headers or {}).items()
+            ],
+        }
+    )
+
+
+@pytest.mark.parametrize(
+    ("peer", "headers", "expected"),
+    [
+        ("203.0.113.9", {"X-Forwarded-For": "198.51.100.1"}, "203.0.113.9"),
+        ("203.0.113.9", {"X-Real-IP": "198.51.100.1"}, "203.0.113.9"),
+        ("10.0.0.2", {"X-Forwarded-For": "198.51.100.1"}, "198.51.100.1"),
+        (
+            "10.0.0.2",
+            {"X-Forwarded-For": "6.6.6.6, 198.51.100.1, 10.0.0.3"},
+            "198.51.100.1",
+        ),
+        ("10.0.0.2", {"X-Real-IP": "198.51.100.1"}, "198.51.100.1"),
+        ("10.0.0.2", {}, "10.0.0.2"),
+    ],
+)
+def test_client_ip_trusts_forwarded_headers_only_from_proxies(
+    monkeypatch: pytest.MonkeyPatch, peer: str, headers: dict, expected: str
+):
+    monkeypatch.setattr(cfg.auth, "trusted_proxies", ["10.0.0.0/8"])
+
+    assert deps.get_client_ip(_request(peer, headers)) == expected
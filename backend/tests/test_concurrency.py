@@ -0,0 +1,79 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.core.concurrency import BoundedExecutor, ExecutorSaturatedError
+
+
+def test_bounded_executor_rejects_when_saturated():
+    executor = BoundedExecutor("test.pool", max_workers=1, max_queue=1)
+    release = threading.Event()
+
+    async def run() -> list:
+        running = [
+            asyncio.create_task(executor.run("op", release.wait)) for _ in range(2)
+        ]
+        await asyncio.sleep(0.05)
+        assert executor.pending == 2
+        with pytest.raises(ExecutorSaturatedError):
+            await executor.run("op", release.wait)
+        release.set()
+        return await asyncio.gather(*running)
+
+    try:
+        assert asyncio.run(run()) == [True, True]
+        assert executor.pending == 0
+    finally:
+        release.set()
+        executor.shutdown()
+
+
+def test_bounded_executor_keeps_event_loop_responsive():
+    executor = BoundedExecutor("test.pool", max_workers=1, max_queue=0)
+    release = threading.Event()
+
+    async def run() -> int:
+        blocked = asyncio.create_task(executor.run("op", release.wait))
+        ticks = 0
+        for _ in range(10):
+            await asyncio.sleep(0.001)
+            ticks += 1
+        release.set()
+        await blocked
+        return ticks
+
+    try:
+        assert asyncio.run(run()) == 10
+    finally:
+        release.set()
+        executor.shutdown()
+
+
+def test_bounded_executor_holds_slot_until_cancelled_call_finishes():
+    executor = BoundedExecutor("test.pool", max_workers=1, max_queue=0)
+    release = threading.Event()
+
+    async def run() -> None:
+        blocked = asyncio.create_task(executor.run("op", release.wait))
+        await asyncio.sleep(0.05)
+        blocked.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await blocked
+        # 调用方已取消，但线程仍在执行，名额不能归还
+        assert executor.pending == 1
+        with pytest.raises(ExecutorSaturatedError):
+            await executor.run("op", release.wait)
+        release.set()
+        for _ in range(100):
+            if executor.pending == 0:
+                break
+            await asyncio.sleep(0.01)
+        assert executor.pending == 0
+        assert await executor.run("op", lambda: True)
+
+    try:
+        asyncio.run(run())
+    finally:
+        release.set()
+        executor.shutdown()
@@ -0,0 +1,15 @@
+import asyncio
+
+from app.db.config import DbConfig, DbConfigManager
+
+
+def test_get_value_returns_copies():
+    manager = DbConfigManager("test")
+    manager._apply(DbConfig())
+    expected = list(DbConfig().base.user_rmt_mediaext)
+
+    manager.get_value_sync("base.user_rmt_mediaext").append(".evil")
+    asyncio.run(manager.get_value("base"))["user_rmt_mediaext"].clear()
+
+    assert manager.get_value_sync("base.user_rmt_mediaext") == expected
+    assert manager._cache.base.user_rmt_mediaext == expected
@@ -0,0 +1,83 @@
+import logging
+from pathlib import Path
+
+import pytest
+
+from app.core.config import cfg
+from app.core.logger import LogEntry, LogMessage, NonBlockingFileHandler
+
+
+@pytest.fixture
+def handler(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(cfg.log, "write_timeout", 0.05)
+    monkeypatch.setattr(cfg.log, "file_format", "%(message)s")
+    # 绕过单例，使用独立的写入线程与队列
+    instance = object.__new__(NonBlockingFileHandler)
+    instance.__init__()
+    yield instance
+    instance.shutdown()
+
+
+def test_shutdown_drains_queued_entries(handler, tmp_path: Path):
+    log_file = tmp_path / "app.log"
+    for i in range(200):
+        handler._write_queue.put_nowait(
+            LogEntry(logging.INFO, f"line {i}", log_file)
+        )
+
+    handler.shutdown()
+
+    assert log_file.read_text(encoding="utf-8").splitlines() == [
+        f"line {i}" for i in range(200)
+    ]
+
+
+def test_failed_batch_is_retried_per_record(
+    handler, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    log_file = tmp_path / "app.log"
+    write_records = handler._write_records
+
+    def flaky(file_path: Path, records: list) -> None:
+        if len(records) > 1:
+            raise OSError("disk hiccup")
+        write_records(file_path, records)
+
+    monkeypatch.setattr(handler, "_write_records", flaky)
+    entries = [LogEntry(logging.INFO, f"r{i}", log_file) for i in range(3)]
+    batch = [(log_file, handler._create_log_record(entry)) for entry in entries]
+
+    handler._write_batch(batch)
+
+    assert log_file.read_text(encoding="utf-8").splitlines() == ["r0", "r1", "r2"]
+
+
+def test_unwritable_records_fall_back_to_stderr(
+    handler, tmp_path: Path, monkeypatch: pytest.MonkeyPatch, capsys
+):
+    log_file = tmp_path / "app.log"
+
+    def broken(file_path: Path, records: list) -> None:
+        raise OSError("read-only file system")
+
+    monkeypatch.setattr(handler, "_write_records", broken)
+    record = handler._create_log_record(LogEntry(logging.ERROR, "kept", log_file))
+
+    handler._write_batch([(log_file, record), (log_file, record)])
+
+    assert capsys.readouterr().err.count("kept") == 2
+
+
+def test_mutable_args_are_formatted_at_call_time():
+    items = ["a"]
+    message = LogMessage("items=%s n=%d", (items, 1), "rid", "test")
+    items.append("b")
+
+    assert str(message) == "[rid] test - items=['a'] n=1"
+
+
+def test_immutable_args_are_formatted_lazily():
+    message = LogMessage("%s 耗时 %.3f", ("abc", 0.1), "rid", "test")
+
+    assert message._text is None
+    assert str(message) == "[rid] test - abc 耗时 0.100"
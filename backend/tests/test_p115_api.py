@@ -0,0 +1,70 @@
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import Request, Response
+
+from app.api.v1.endpoints import p115 as endpoint
+
+
+def _request(if_none_match: str | None = None) -> Request:
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+    return Request({"type": "http", "headers": headers})
+
+
+@pytest.fixture
+def pool(monkeypatch: pytest.MonkeyPatch) -> list[dict]:
+    state = [{"account": "default", "quarantined_seconds": 30.0}]
+
+    async def stats() -> list[dict]:
+        return [dict(item) for item in state]
+
+    monkeypatch.setattr(type(endpoint.p115_pool), "stats", staticmethod(stats))
+    return state
+
+
+def _at(monkeypatch: pytest.MonkeyPatch, ts: float) -> None:
+    moment = datetime.fromtimestamp(ts, tz=timezone.utc)
+    monkeypatch.setattr(endpoint.TimezoneUtils, "now_utc", staticmethod(lambda: moment))
+
+
+def test_status_etag_survives_quarantine_countdown(
+    monkeypatch: pytest.MonkeyPatch, pool: list[dict]
+):
+    _at(monkeypatch, 1000.0)
+    etag = endpoint._status_etag(pool)
+
+    _at(monkeypatch, 1010.2)
+    pool[0]["quarantined_seconds"] = 19.8
+
+    assert endpoint._status_etag(pool) == etag
+    pool[0]["quarantined_seconds"] = 0
+    assert endpoint._status_etag(pool) != etag
+
+
+def test_status_revalidation_skips_building_the_body(
+    monkeypatch: pytest.MonkeyPatch, pool: list[dict]
+):
+    calls: list[int] = []
+
+    async def get_status() -> dict:
+        calls.append(1)
+        return {"logged_in": True, "app": "qandroid", "accounts": []}
+
+    monkeypatch.setattr(
+        type(endpoint.p115_manager), "get_status", lambda _: get_status()
+    )
+    _at(monkeypatch, 1000.0)
+
+    async def run():
+        response = Response()
+        first = await endpoint.get_status(_request(), response, None)
+        etag = response.headers["etag"]
+        second = await endpoint.get_status(_request(etag), Response(), None)
+        return first, second
+
+    first, second = asyncio.run(run())
+
+    assert first.logged_in is True
+    assert second.status_code == 304
+    assert calls == [1]
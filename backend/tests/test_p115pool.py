@@ -0,0 +1,37 @@
+import asyncio
+
+import pytest
+
+from app.core import p115pool
+from app.core.config import cfg
+from app.core.p115pool import P115ClientPool
+
+
+def test_hedged_call_takes_a_token_per_request(monkeypatch: pytest.MonkeyPatch):
+    acquired: list[str] = []
+    sent: list[str] = []
+
+    async def pick(self, bucket, exclude=None):
+        return "default", object()
+
+    async def acquire(self, bucket, *, wait=True, timeout=None, account="default"):
+        acquired.append(account)
+
+    async def slow_call(client) -> str:
+        sent.append("call")
+        await asyncio.sleep(0.2 if len(sent) == 1 else 0)
+        return "ok"
+
+    monkeypatch.setattr(P115ClientPool, "pick", pick)
+    monkeypatch.setattr(type(p115pool.rate_limiter), "acquire", acquire)
+    monkeypatch.setattr(cfg.p115, "hedge_enabled", True)
+    monkeypatch.setattr(cfg.p115, "hedge_default_delay", 0.01)
+    monkeypatch.setattr(cfg.p115, "hedge_min_delay", 0.01)
+
+    result = asyncio.run(
+        P115ClientPool().call("info", "test_hedge", slow_call, idempotent=True)
+    )
+
+    assert result == "ok"
+    assert len(sent) == 2
+    assert acquired == ["default", "default"]
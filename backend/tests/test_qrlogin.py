@@ -0,0 +1,122 @@
+import asyncio
+
+import pytest
+
+from app.core import lock, qrlogin
+from app.core.qrlogin import QrcodeLoginWatcher
+
+
+class FakeRedis:
+    def __init__(self, subscribers: int) -> None:
+        self.subscribers = subscribers
+        self.store: dict[str, str] = {}
+        self.released: list[str] = []
+
+    async def pubsub_numsub(self, *channels: str) -> list[tuple[str, int]]:
+        return [(channel, self.subscribers) for channel in channels]
+
+    async def set(self, key: str, value: str, nx: bool = False, ex: int = 0) -> bool:
+        if nx and key in self.store:
+            return False
+        self.store[key] = value
+        return True
+
+    async def eval(self, script: str, numkeys: int, key: str, token: str, *args):
+        if self.store.get(key) != token:
+            return 0
+        if script == lock._RELEASE_LOCK_SCRIPT:
+            del self.store[key]
+            self.released.append(key)
+        return 1
+
+
+def _patch(monkeypatch: pytest.MonkeyPatch, redis: FakeRedis) -> list[dict]:
+    polled: list[dict] = []
+
+    async def poll_qrcode_status(payload: dict) -> dict:
+        polled.append(payload)
+        return {"status": 0, "msg": ""}
+
+    async def publish(uid: str, state: dict) -> None:
+        pass
+
+    monkeypatch.setattr(type(qrlogin.db), "get_redis", lambda self: redis)
+    monkeypatch.setattr(
+        qrlogin.P115Manager, "poll_qrcode_status", staticmethod(poll_qrcode_status)
+    )
+    monkeypatch.setattr(QrcodeLoginWatcher, "_publish", staticmethod(publish))
+    monkeypatch.setattr(qrlogin, "QRCODE_POLL_MIN_INTERVAL_SECONDS", 0.01)
+    monkeypatch.setattr(qrlogin, "QRCODE_IDLE_GRACE_SECONDS", 0.05)
+    return polled
+
+
+PAYLOAD = {"time": 0, "sign": "s"}
+
+
+async def _start(watcher: QrcodeLoginWatcher, uid: str) -> asyncio.Task:
+    await watcher.ensure_poller({**PAYLOAD, "uid": uid}, "qandroid", "default")
+    return watcher._pollers[uid]
+
+
+def test_poller_stops_when_nobody_is_watching(monkeypatch: pytest.MonkeyPatch):
+    redis = FakeRedis(subscribers=0)
+    polled = _patch(monkeypatch, redis)
+
+    async def run() -> None:
+        await asyncio.wait_for(await _start(QrcodeLoginWatcher(), "u1"), 2)
+
+    asyncio.run(run())
+    assert 0 < len(polled) < 20
+    assert redis.released == [f"{qrlogin.REDIS_KEY_QRCODE_POLLER_PREFIX}:u1"]
+    assert redis.store == {}
+
+
+def test_poller_keeps_polling_while_subscribed(monkeypatch: pytest.MonkeyPatch):
+    redis = FakeRedis(subscribers=1)
+    polled = _patch(monkeypatch, redis)
+
+    async def run() -> None:
+        task = await _start(QrcodeLoginWatcher(), "u2")
+        await asyncio.sleep(0.2)
+        assert not task.done()
+        redis.subscribers = 0
+        await asyncio.wait_for(task, 2)
+
+    asyncio.run(run())
+    assert len(polled) > 10
+
+
+def test_poller_leaves_a_lock_taken_over_by_another_process(
+    monkeypatch: pytest.MonkeyPatch,
+):
+    redis = FakeRedis(subscribers=1)
+    _patch(monkeypatch, redis)
+    lock_key = f"{qrlogin.REDIS_KEY_QRCODE_POLLER_PREFIX}:u3"
+
+    async def run() -> None:
+        task = await _start(QrcodeLoginWatcher(), "u3")
+        await asyncio.sleep(0.05)
+        # 锁过期后被其他进程抢到
+        redis.store[lock_key] = "other"
+        await asyncio.wait_for(task, 2)
+
+    asyncio.run(run())
+    assert redis.store == {lock_key: "other"}
+    assert redis.released == []
+
+
+def test_stop_cancels_pollers_and_releases_locks(monkeypatch: pytest.MonkeyPatch):
+    redis = FakeRedis(subscribers=1)
+    _patch(monkeypatch, redis)
+    watcher = QrcodeLoginWatcher()
+
+    async def run() -> list[asyncio.Task]:
+        tasks = [await _start(watcher, uid) for uid in ("u4", "u5")]
+        await asyncio.sleep(0.05)
+        await asyncio.wait_for(watcher.stop(), 2)
+        return tasks
+
+    tasks = asyncio.run(run())
+    assert all(task.cancelled() for task in tasks)
+    assert watcher._pollers == {}
+    assert redis.store == {}
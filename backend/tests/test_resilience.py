@@ -0,0 +1,72 @@
+import asyncio
+
+import pytest
+from httpx import ConnectError, HTTPStatusError, Request, Response
+
+from app.core.config import cfg
+from app.core.resilience import ResilienceGuard, is_upstream_failure
+
+
+class P115LikeError(OSError):
+    """
+    模拟 p115client 的调用方错误（P115OSError 子类均为 OSError）
+    """
+
+
+def _status_error(status_code: int) -> HTTPStatusError:
+    request = Request("GET", "https://webapi.115.com/files")
+    return HTTPStatusError(
+        "error", request=request, response=Response(status_code, request=request)
+    )
+
+
+@pytest.mark.parametrize(
+    "exc",
+    [
+        TimeoutError(),
+        asyncio.TimeoutError(),
+        ConnectError("refused"),
+        _status_error(502),
+        _status_error(429),
+        P115LikeError(405, {"state": False, "errno": 405}),
+    ],
+)
+def test_upstream_failures_count(exc: BaseException):
+    assert is_upstream_failure(exc)
+
+
+@pytest.mark.parametrize(
+    "exc",
+    [
+        P115LikeError(2, {"state": False, "error": "文件不存在"}),
+        P115LikeError(80, {"state": False, "errno": 99, "error": "请重新登录"}),
+        _status_error(404),
+        ValueError("bad pick_code"),
+    ],
+)
+def test_caller_errors_do_not_count(exc: BaseException):
+    assert not is_upstream_failure(exc)
+
+
+def test_caller_errors_never_open_the_breaker(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(cfg.p115, "breaker_failure_threshold", 2)
+    monkeypatch.setattr(cfg.p115, "hedge_enabled", False)
+    guard = ResilienceGuard("test")
+
+    async def not_found() -> None:
+        raise P115LikeError(2, {"state": False, "error": "文件不存在"})
+
+    async def timed_out() -> None:
+        raise TimeoutError()
+
+    async def run() -> None:
+        for _ in range(5):
+            with pytest.raises(P115LikeError):
+                await guard.call("download_url", not_found)
+        assert guard.breaker("download_url").state == "closed"
+        for _ in range(2):
+            with pytest.raises(TimeoutError):
+                await guard.call("download_url", timed_out)
+        assert guard.breaker("download_url").state == "open"
+
+    asyncio.run(run())
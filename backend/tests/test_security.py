@@ -0,0 +1,44 @@
+from datetime import timedelta
+
+import pytest
+from jose import JWTError
+
+from app.core import security
+from app.core.config import cfg
+from app.core.security import SecurityCore
+
+
+@pytest.fixture(autouse=True)
+def secret_key() -> None:
+    cfg.set_secret_key("test-secret-key")
+
+
+def test_verified_token_is_served_from_cache(monkeypatch: pytest.MonkeyPatch):
+    token = SecurityCore.create_access_token("u1")
+    assert SecurityCore.decode_access_token(token)["sub"] == "u1"
+
+    def fail(*args, **kwargs):
+        raise AssertionError("cached token was verified again")
+
+    monkeypatch.setattr(security.jwt, "decode", fail)
+    claims = SecurityCore.decode_access_token(token)
+    claims["sub"] = "tampered"
+    assert SecurityCore.decode_access_token(token)["sub"] == "u1"
+
+
+def test_key_rotation_invalidates_cached_tokens():
+    token = SecurityCore.create_access_token("u1")
+    SecurityCore.decode_access_token(token)
+
+    cfg.set_secret_key("rotated-secret-key")
+
+    with pytest.raises(JWTError):
+        SecurityCore.decode_access_token(token)
+
+
+def test_expired_tokens_are_not_cached():
+    token = SecurityCore.create_access_token("u1", timedelta(seconds=-1))
+
+    with pytest.raises(JWTError):
+        SecurityCore.decode_access_token(token)
+    assert len(security._verified_tokens) == 0
@@ -0,0 +1,25 @@
+from app.services.stats import SIZE_BUCKET_LABELS, _Totals
+
+
+def test_totals_accumulate_extension_bucket_and_ancestor_dirs():
+    totals = _Totals()
+    totals.add("a.MKV", 2 << 30, "/media/tv/show/a.MKV", 1)
+    totals.add("b.srt", 10, "/media/tv/show/b.srt", 1)
+    totals.add("c.mp4", 5 << 20, "/media/movie/c.mp4", 1)
+
+    assert totals.total == {"files": 3, "size": (2 << 30) + 10 + (5 << 20)}
+    assert totals.ext["mkv"] == [1, 2 << 30]
+    assert totals.ext["srt"] == [1, 10]
+    assert totals.buckets[SIZE_BUCKET_LABELS.index("1GB-4GB")] == [1, 2 << 30]
+    assert totals.dirs["/media"] == [3, totals.total["size"]]
+    assert totals.dirs["/media/tv/show"] == [2, (2 << 30) + 10]
+    assert "/" not in totals.dirs
+
+
+def test_totals_removal_cancels_addition():
+    totals = _Totals()
+    totals.add("a.mkv", 100, "/media/a.mkv", 1)
+    totals.add("a.mkv", 100, "/media/a.mkv", -1)
+
+    assert totals.total == {"files": 0, "size": 0}
+    assert totals.dirs["/media"] == [0, 0]
@@ -0,0 +1,111 @@
+import asyncio
+
+import pytest
+
+from app.core.p115pool import P115NotLoggedInError
+from app.core.ratelimit import RateLimitExceeded
+from app.core.strm import DownloadUrlResolveError, DownloadUrlResolver, ProxyStream
+
+
+def _roundtrip(exc: BaseException) -> None:
+    marker = DownloadUrlResolver._failure_marker(exc)
+    DownloadUrlResolver._raise_published_failure(marker)
+
+
+def test_rate_limited_holder_lets_waiters_resolve_themselves():
+    _roundtrip(RateLimitExceeded("download", 1.0))
+    _roundtrip(asyncio.CancelledError())
+
+
+def test_holder_failures_propagate_to_waiters():
+    with pytest.raises(P115NotLoggedInError, match="未登入"):
+        _roundtrip(P115NotLoggedInError("未登入"))
+    with pytest.raises(DownloadUrlResolveError, match="boom: x"):
+        _roundtrip(ValueError("boom: x"))
+
+
+def test_resolve_coalesces_per_wait_mode(monkeypatch: pytest.MonkeyPatch):
+    calls: list[bool] = []
+
+    async def get_cached(self, key: str) -> None:
+        return None
+
+    async def resolve_shared(self, key, pick_code, user_agent, wait=True) -> str:
+        calls.append(wait)
+        await asyncio.sleep(0.01)
+        if not wait:
+            raise RateLimitExceeded("download", 1.0)
+        return "https://cdn.example/file?t=0"
+
+    monkeypatch.setattr(DownloadUrlResolver, "get_cached", get_cached)
+    monkeypatch.setattr(DownloadUrlResolver, "_resolve_shared", resolve_shared)
+    resolver = DownloadUrlResolver()
+
+    async def run() -> list:
+        return await asyncio.gather(
+            resolver.resolve("abc", "ua", wait=False),
+            resolver.resolve("abc", "ua"),
+            resolver.resolve("abc", "ua"),
+            return_exceptions=True,
+        )
+
+    prefetch, play, joined = asyncio.run(run())
+
+    assert isinstance(prefetch, RateLimitExceeded)
+    assert play == joined == "https://cdn.example/file?t=0"
+    assert sorted(calls) == [False, True]
+
+
+class FakeUpstream:
+    status_code = 206
+    headers = {"content-range": "bytes 0-3/4", "x-internal": "1"}
+
+    def __init__(self) -> None:
+        self.closed = 0
+
+    async def aiter_raw(self):
+        for chunk in (b"ab", b"cd"):
+            yield chunk
+
+    async def aclose(self) -> None:
+        self.closed += 1
+
+
+class FakeProxy:
+    def __init__(self) -> None:
+        self.released: list[str | None] = []
+
+    async def _renew(self, pick_code: str, lease: str) -> None:
+        pass
+
+    async def _release(self, pick_code: str, lease: str | None) -> None:
+        self.released.append(lease)
+
+
+def test_proxy_stream_releases_once_when_never_iterated():
+    proxy, upstream = FakeProxy(), FakeUpstream()
+    stream = ProxyStream(proxy, "abc", upstream, "lease", 0.0)
+
+    async def run() -> None:
+        stream.iter_bytes()
+        await stream.close()
+        await stream.close()
+
+    asyncio.run(run())
+    assert stream.headers == {"content-range": "bytes 0-3/4"}
+    assert upstream.closed == 1
+    assert proxy.released == ["lease"]
+
+
+def test_proxy_stream_releases_once_after_full_relay():
+    proxy, upstream = FakeProxy(), FakeUpstream()
+    stream = ProxyStream(proxy, "abc", upstream, None, 0.0)
+
+    async def run() -> bytes:
+        body = b"".join([chunk async for chunk in stream.iter_bytes()])
+        await stream.close()
+        return body
+
+    assert asyncio.run(run()) == b"abcd"
+    assert upstream.closed == 1
+    assert proxy.released == [None]
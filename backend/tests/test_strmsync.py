@@ -0,0 +1,186 @@
+import asyncio
+from typing import Any
+
+import pytest
+
+import app.helpers.strmsync as strmsync
+from app.core.concurrency import AdaptiveConcurrencyLimiter
+from app.core.config import cfg
+
+
+class ThrottledError(Exception):
+    """
+    模拟 115 限流响应（405 / 429）
+    """
+
+    def __init__(self, status_code: int) -> None:
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+class FakeFsFilesClient:
+    """
+    按目录树返回分页结果的假 fs_files 客户端，每次调用注入固定延迟
+    """
+
+    def __init__(
+        self,
+        tree: dict[int, list[dict[str, Any]]],
+        latency: float,
+        throttle: dict[int, int] | None = None,
+    ) -> None:
+        self.tree = tree
+        self.latency = latency
+        self.throttle = throttle or {}
+        self.calls = 0
+        self.inflight = 0
+        self.max_inflight = 0
+
+    async def fs_files(self, payload: dict[str, Any], async_: bool = True) -> dict:
+        self.calls += 1
+        self.inflight += 1
+        self.max_inflight = max(self.max_inflight, self.inflight)
+        try:
+            await asyncio.sleep(self.latency)
+            cid = payload["cid"]
+            if cid in self.throttle:
+                raise ThrottledError(self.throttle[cid])
+            items = self.tree.get(cid, [])
+            offset, limit = payload["offset"], payload["limit"]
+            return {
+                "state": True,
+                "count": len(items),
+                "data": items[offset : offset + limit],
+            }
+        finally:
+            self.inflight -= 1
+
+
+class FakePool:
+    """
+    直接把假客户端交给调用方的账号池
+    """
+
+    def __init__(self, client: FakeFsFilesClient) -> None:
+        self.client = client
+
+    async def call(self, bucket: str, endpoint: str, func, **_: Any) -> Any:
+        return await func(self.client)
+
+
+def _make_tree(dirs: int, files_per_dir: int) -> dict[int, list[dict[str, Any]]]:
+    tree: dict[int, list[dict[str, Any]]] = {
+        0: [{"cid": str(i), "n": f"dir{i}"} for i in range(1, dirs + 1)]
+    }
+    for i in range(1, dirs + 1):
+        tree[i] = [
+            {
+                "fid": str(i * 1000 + j),
+                "cid": str(i),
+                "n": f"f{j}.mkv",
+                "pc": f"pc{i}x{j}",
+            }
+            for j in range(files_per_dir)
+        ]
+    return tree
+
+
+@pytest.fixture
+def sync_cfg(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(cfg.sync, "list_page_size", 2)
+    monkeypatch.setattr(cfg.sync, "list_concurrency_initial", 2)
+    monkeypatch.setattr(cfg.sync, "list_concurrency_min", 1)
+    monkeypatch.setattr(cfg.sync, "list_concurrency_max", 16)
+    monkeypatch.setattr(cfg.sync, "list_latency_target", 0.5)
+    monkeypatch.setattr(cfg.sync, "list_error_threshold", 0.1)
+    return cfg.sync
+
+
+def _limiter(initial: int = 4) -> AdaptiveConcurrencyLimiter:
+    return AdaptiveConcurrencyLimiter(
+        "test.list",
+        initial=initial,
+        min_limit=1,
+        max_limit=16,
+        latency_target=0.5,
+        error_threshold=0.1,
+        window=5,
+    )
+
+
+def test_limiter_additive_increase_when_healthy():
+    limiter = _limiter()
+    for _ in range(3 * limiter.window):
+        limiter.record(0.01)
+    assert limiter.limit == 7
+
+
+def test_limiter_holds_when_latency_exceeds_target():
+    limiter = _limiter()
+    for _ in range(limiter.window):
+        limiter.record(2.0)
+    assert limiter.limit == 4
+
+
+@pytest.mark.parametrize("status_code", [405, 429])
+def test_limiter_halves_on_throttle(status_code: int):
+    limiter = _limiter(initial=8)
+
+    async def run() -> None:
+        with pytest.raises(ThrottledError):
+            async with limiter.slot():
+                raise ThrottledError(status_code)
+
+    asyncio.run(run())
+    assert limiter.limit == 4
+    assert limiter.inflight == 0
+
+
+def test_iter_tree_raises_concurrency_under_healthy_latency(
+    monkeypatch: pytest.MonkeyPatch, sync_cfg
+):
+    client = FakeFsFilesClient(_make_tree(dirs=40, files_per_dir=3), latency=0.005)
+    monkeypatch.setattr(strmsync, "p115_pool", FakePool(client))
+    helper = strmsync.StrmSyncHelper()
+
+    async def run() -> list[tuple[str, dict[str, Any]]]:
+        return [entry async for entry in helper.iter_tree(0, "/media")]
+
+    entries = asyncio.run(run())
+
+    assert len(entries) == 40 * 3
+    assert ("/media/dir7", "f2.mkv") in {(p, item["n"]) for p, item in entries}
+    # 40 个子目录各 2 页 + 根目录 20 页，共 100 次调用，每 20 次健康样本加 1
+    assert client.calls == 100
+    assert helper.list_concurrency == sync_cfg.list_concurrency_initial + 5
+    assert client.max_inflight > sync_cfg.list_concurrency_initial
+
+
+@pytest.mark.parametrize("status_code", [405, 429])
+def test_iter_tree_halves_concurrency_on_throttle(
+    monkeypatch: pytest.MonkeyPatch, sync_cfg, status_code: int
+):
+    monkeypatch.setattr(cfg.sync, "list_concurrency_initial", 8)
+    client = FakeFsFilesClient(
+        _make_tree(dirs=1, files_per_dir=1), latency=0.005, throttle={1: status_code}
+    )
+    monkeypatch.setattr(strmsync, "p115_pool", FakePool(client))
+    helper = strmsync.StrmSyncHelper()
+
+    async def run() -> None:
+        async for _ in helper.iter_tree(0):
+            pass
+
+    with pytest.raises(ThrottledError):
+        asyncio.run(run())
+    assert helper.list_concurrency == 4
+
+
+def test_write_strm_respects_overwrite(tmp_path):
+    target = tmp_path / "show" / "S01" / "e01.strm"
+
+    assert strmsync._write_strm(target, "http://a/1", overwrite=False)
+    assert not strmsync._write_strm(target, "http://a/2", overwrite=False)
+    assert target.read_text(encoding="utf-8") == "http://a/1"
+    assert strmsync._write_strm(target, "http://a/3", overwrite=True)
+    assert target.read_text(encoding="utf-8") == "http://a/3"
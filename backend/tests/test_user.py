@@ -0,0 +1,130 @@
+import asyncio
+
+import pytest
+from beanie import PydanticObjectId
+from fastapi import HTTPException
+from orjson import loads as json_loads
+
+from app.api import deps
+from app.core.cache import TwoTierCache
+from app.core.security import SecurityCore
+from app.db.database import db
+from app.models.user import User
+from app.services import user as user_service
+from app.services.user import UserService, user_cache
+
+
+class FakeRedis:
+    def __init__(self) -> None:
+        self.store: dict[str, str] = {}
+
+    async def get(self, key: str) -> str | None:
+        return self.store.get(key)
+
+    async def delete(self, *keys: str) -> int:
+        return sum(self.store.pop(key, None) is not None for key in keys)
+
+    async def publish(self, channel: str, message: str) -> int:
+        return 0
+
+    def pipeline(self, transaction: bool = True) -> "FakeRedis":
+        self.ops: list = []
+        return self
+
+    def set(self, key: str, value: str, ex: int = 0) -> None:
+        self.ops.append(lambda: self.store.__setitem__(key, value))
+
+    def incr(self, key: str) -> None:
+        self.ops.append(lambda: None)
+
+    def expire(self, key: str, ttl: int) -> None:
+        self.ops.append(lambda: None)
+
+    async def execute(self) -> list:
+        return [op() for op in self.ops]
+
+
+def test_principal_cache_never_holds_password_hash(monkeypatch: pytest.MonkeyPatch):
+    stored: dict[str, dict] = {}
+    user_id = str(PydanticObjectId())
+
+    async def get_user_by_id(_: str) -> User:
+        return User.model_construct(
+            id=PydanticObjectId(user_id),
+            username="alice",
+            hashed_password="$2b$12$secret",
+            role="admin",
+            is_active=True,
+        )
+
+    async def get_or_load(self, key: str, loader) -> dict | None:
+        if key not in stored:
+            stored[key] = await loader()
+        return stored[key]
+
+    monkeypatch.setattr(UserService, "get_user_by_id", staticmethod(get_user_by_id))
+    monkeypatch.setattr(TwoTierCache, "get_or_load", get_or_load)
+
+    data = asyncio.run(UserService._load_principal(user_id))
+
+    assert stored[user_id] is data
+    assert "hashed_password" not in data
+    assert data["username"] == "alice"
+    assert data["role"] == "admin"
+
+
+def test_disabled_user_is_rejected_on_next_request(monkeypatch: pytest.MonkeyPatch):
+    # 缓存键只含用户 ID：update_user 在保存后立即清除 Redis 与本进程条目并广播，
+    # 下一次请求必然回源读到禁用状态
+    user_id = str(PydanticObjectId())
+    stored = User.model_construct(
+        id=PydanticObjectId(user_id),
+        username="bob",
+        hashed_password="$2b$12$secret",
+        role="user",
+        is_active=True,
+    )
+    loads: list[str] = []
+
+    async def get_user_by_id(uid: str) -> User:
+        loads.append(uid)
+        return stored.model_copy()
+
+    async def save(self: User) -> User:
+        stored.is_active = self.is_active
+        return self
+
+    async def revoke_all(uid: str) -> None:
+        pass
+
+    redis = FakeRedis()
+    monkeypatch.setattr(type(db), "get_redis", lambda self: redis)
+    monkeypatch.setattr(UserService, "get_user_by_id", staticmethod(get_user_by_id))
+    # 未初始化 Beanie 时 model_validate 不可用
+    monkeypatch.setattr(
+        User,
+        "model_validate",
+        classmethod(lambda cls, data: cls.model_construct(**data)),
+    )
+    monkeypatch.setattr(User, "save", save)
+    monkeypatch.setattr(
+        user_service.RefreshTokenService, "revoke_all", staticmethod(revoke_all)
+    )
+    token = SecurityCore.create_access_token(user_id)
+
+    async def run() -> None:
+        assert (await deps.get_current_user(token)).is_active
+        assert (await deps.get_current_user(token)).is_active
+        assert len(loads) == 1
+        await UserService.update_user(user_id, is_active=False)
+        with pytest.raises(HTTPException) as exc_info:
+            await deps.get_current_user(token)
+        assert exc_info.value.status_code == 401
+        # 其他 worker 的本进程条目已由广播清除，只剩 Redis 这一层
+        user_cache.invalidate_local()
+        with pytest.raises(HTTPException):
+            await deps.get_current_user(token)
+
+    asyncio.run(run())
+    entry = json_loads(redis.store[user_cache.redis_key(user_id)])
+    assert entry["v"]["is_active"] is False
@@ -12,9 +12,17 @@ import {
   apiP115QrcodePoll,
   apiP115QrcodeConfirm,
   apiP115Logout,
+  apiStreamToken,
+  openP115QrcodeStream,
+  supportsQrcodeStream,
+  type P115QrcodeState,
+  type P115QrcodeToken,
   type P115Status,
 } from '@/lib/api'
 
+/** SSE 断线后换新令牌重连的最大次数 */
+const STREAM_MAX_RETRIES = 3
+
 const APP_OPTIONS = [
   { value: 'qandroid', label: 'Android' },
   { value: 'ios', label: 'iOS' },
@@ -178,6 +186,7 @@ export function P115LoginCard({ isDark, isMobile }: { isDark: boolean; isMobile:
   const [loggingOut, setLoggingOut] = useState(false)
 
   const pollTimerRef = useRef<ReturnType<typeof setInterval> | null>(null)
+  const streamRef = useRef<EventSource | null>(null)
 
   const loadStatus = useCallback(async () => {
     if (!token) return
@@ -196,10 +205,11 @@ export function P115LoginCard({ isDark, isMobile }: { isDark: boolean; isMobile:
     loadStatus()
   }, [loadStatus])
 
-  // cleanup poll and blob URL on unmount
+  // cleanup poll, stream and blob URL on unmount
   useEffect(() => {
     return () => {
       if (pollTimerRef.current) clearInterval(pollTimerRef.current)
+      streamRef.current?.close()
       if (qrImageUrl) URL.revokeObjectURL(qrImageUrl)
     }
   }, []) // eslint-disable-line react-hooks/exhaustive-deps
@@ -209,8 +219,67 @@ export function P115LoginCard({ isDark, isMobile }: { isDark: boolean; isMobile:
       clearInterval(pollTimerRef.current)
       pollTimerRef.current = null
     }
+    if (streamRef.current) {
+      streamRef.current.close()
+      streamRef.current = null
+    }
   }, [])
 
+  /** 处理 SSE 推送的扫码状态（确认后服务端已自动登入） */
+  const handleStreamState = async (state: P115QrcodeState) => {
+    if (state.status === 0) {
+      return
+    }
+    if (state.status === 1) {
+      setQrStatus('scanned')
+      setQrMsg('已扫码，请在手机上确认')
+      return
+    }
+    stopPoll()
+    if (state.status !== 2) {
+      setQrStatus('expired')
+      setQrMsg('二维码已过期，请重新获取')
+      return
+    }
+    if (!state.logged_in) {
+      setQrStatus('error')
+      setQrMsg(state.msg || '登入失败')
+      return
+    }
+    setQrStatus('confirmed')
+    setQrMsg('已确认，正在登入…')
+    await loadStatus()
+    setQrImageUrl(null)
+    setQrStatus('')
+    setQrMsg('')
+  }
+
+  /**
+   * 以 SSE 订阅扫码状态；断线时 EventSource 会带着已过期的令牌自动重连，
+   * 因此改为关闭后换新令牌重建
+   */
+  const startStream = async (qr: P115QrcodeToken, app: string, retries: number) => {
+    if (!token) return
+    const { token: streamToken } = await apiStreamToken(token)
+    const source = openP115QrcodeStream(streamToken, qr, app, handleStreamState, () => {
+      source.close()
+      if (streamRef.current !== source) return
+      streamRef.current = null
+      if (retries >= STREAM_MAX_RETRIES) {
+        setQrStatus('error')
+        setQrMsg('订阅扫码状态失败')
+        return
+      }
+      setTimeout(() => {
+        startStream(qr, app, retries + 1).catch(() => {
+          setQrStatus('error')
+          setQrMsg('订阅扫码状态失败')
+        })
+      }, 1000)
+    })
+    streamRef.current = source
+  }
+
   const handleGetQrcode = async () => {
     if (!token) return
     stopPoll()
@@ -225,7 +294,12 @@ export function P115LoginCard({ isDark, isMobile }: { isDark: boolean; isMobile:
       setQrStatus('waiting')
       setQrMsg('请用 115 客户端扫描二维码')
 
-      // start polling
+      if (supportsQrcodeStream()) {
+        await startStream(t, selectedApp, 0)
+        return
+      }
+
+      // 原生端无 EventSource，回退到轮询
       pollTimerRef.current = setInterval(async () => {
         try {
           const result = await apiP115QrcodePoll(token, t.uid, t.time, t.sign)
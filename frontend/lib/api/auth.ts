@@ -1,4 +1,4 @@
-import { getApiUrl } from './client'
+import { authFetch, getApiUrl } from './client'
 
 const BASE = getApiUrl()
 
@@ -28,3 +28,20 @@ export async function apiLogin(username: string, password: string): Promise<Toke
   }
   return res.json()
 }
+
+export interface StreamTokenResponse {
+  token: string
+  expires_in: number
+}
+
+/**
+ * 获取短期 SSE 令牌（EventSource 无法携带 Authorization 头，以 token 查询参数传入）
+ */
+export async function apiStreamToken(token: string): Promise<StreamTokenResponse> {
+  const res = await authFetch(token, '/api/v1/auth/stream-token', { method: 'POST' })
+  if (!res.ok) {
+    const err = await res.json().catch(() => ({ detail: res.statusText }))
+    throw new Error(err.detail || '获取 SSE 令牌失败')
+  }
+  return res.json()
+}
@@ -4,8 +4,8 @@
 
 export { getApiUrl, authFetch } from './client'
 
-export type { TokenResponse } from './auth'
-export { apiLogin } from './auth'
+export type { TokenResponse, StreamTokenResponse } from './auth'
+export { apiLogin, apiStreamToken } from './auth'
 
 export type { UserResponse } from './user'
 export {
@@ -23,6 +23,7 @@ export type {
   P115Status,
   P115QrcodeToken,
   P115PollResult,
+  P115QrcodeState,
   P115Dashboard,
   P115UserInfo,
   P115StorageInfo,
@@ -38,5 +39,7 @@ export {
   apiP115QrcodeImage,
   apiP115QrcodePoll,
   apiP115QrcodeConfirm,
+  openP115QrcodeStream,
+  supportsQrcodeStream,
   apiP115Logout,
 } from './p115'
@@ -1,4 +1,4 @@
-import { authFetch } from './client'
+import { authFetch, getApiUrl } from './client'
 
 export interface P115Status {
   logged_in: boolean
@@ -18,6 +18,11 @@ export interface P115PollResult {
   msg: string
 }
 
+/** SSE 推送的扫码状态，扫码确认后服务端自动登入，logged_in 表示是否成功 */
+export interface P115QrcodeState extends P115PollResult {
+  logged_in: boolean
+}
+
 /** 115 容量项（size + size_format） */
 export interface P115SizeItem {
   size: number
@@ -136,6 +141,38 @@ export async function apiP115QrcodePoll(
   return res.json()
 }
 
+/**
+ * 当前环境是否支持 EventSource（Web 支持，原生端不支持时回退到轮询）
+ */
+export function supportsQrcodeStream(): boolean {
+  return typeof EventSource !== 'undefined'
+}
+
+/**
+ * 订阅扫码状态（SSE），扫码确认后由服务端自动完成登入；调用方负责 close
+ */
+export function openP115QrcodeStream(
+  streamToken: string,
+  qr: P115QrcodeToken,
+  app: string,
+  onState: (state: P115QrcodeState) => void,
+  onError: () => void
+): EventSource {
+  const params = new URLSearchParams({
+    token: streamToken,
+    uid: qr.uid,
+    time: String(qr.time),
+    sign: qr.sign,
+    app,
+  })
+  const source = new EventSource(`${getApiUrl()}/api/v1/p115/qrcode/stream?${params}`)
+  source.addEventListener('status', (e) => {
+    onState(JSON.parse((e as MessageEvent).data))
+  })
+  source.onerror = onError
+  return source
+}
+
 /**
  * 确认扫码登入
  */